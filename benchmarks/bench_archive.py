@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark the incremental archive index over years of daily runs
+
+Appends synthetic daily runs to a fresh archive and reports the update
+time of early and late runs (bounded by the index segment size, however
+long the history grows), the archive size, and for sample queries how
+many bytes the search page fetches compared with the whole archive.
+
+    python benchmarks/bench_archive.py --runs 1095 --articles 10
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import contextlib
+import io
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from news_agent.core.archive import ArchiveIndex, tokenize  # noqa: E402
+
+SOURCES = ['Reuters', 'AP News', 'BBC', 'CNN', 'The Verge', 'Bloomberg', 'TechCrunch', 'Wired']
+
+
+def make_run(day: int, count: int, vocabulary, rng: random.Random):
+    """Synthetic articles of one daily run"""
+    return [{
+        'title': ' '.join(rng.choice(vocabulary) for _ in range(9)).capitalize(),
+        'source': rng.choice(SOURCES),
+        'link': f"https://example.com/{day}/{index}",
+        'date': f"{rng.randint(1, 23)} hours ago",
+        'snippet': ' '.join(rng.choice(vocabulary) for _ in range(30)).capitalize() + '.',
+    } for index in range(count)]
+
+
+def directory_bytes(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+def fetched_bytes(archive: ArchiveIndex, query: str, results) -> int:
+    """Bytes the search page downloads for a query: meta, term shards and hit chunks"""
+    paths = {archive.meta_path}
+    # Segments are read newest first, down to the one holding the oldest hit
+    newest = (archive._load_meta()['docs'] - 1) // archive.segment_size
+    oldest = min(results) // archive.segment_size if results else 0
+    for segment in range(newest, oldest - 1, -1):
+        paths.update(archive._shard_path(f"{segment}/{term[:archive.prefix_length]}") for term in tokenize(query))
+    paths.update(archive._chunk_path(hit_id // archive.chunk_size) for hit_id in results)
+    return sum(os.path.getsize(path) for path in paths if os.path.exists(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the incremental archive index")
+    parser.add_argument('--runs', type=int, default=1095, help='Daily runs to append (default: 1095, three years)')
+    parser.add_argument('--articles', type=int, default=10, help='Articles per run (default: 10)')
+    parser.add_argument('--vocabulary', type=int, default=20000, help='Distinct words (default: 20000)')
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    # Zipf-like word frequencies, as in real headlines
+    words = [f"{rng.choice('bcdfghjklmnprstvw')}{rng.choice('aeiou')}{index:x}" for index in range(args.vocabulary)]
+    vocabulary = [word for rank, word in enumerate(words, 1) for _ in range(max(1, 200 // rank))] + words
+
+    directory = tempfile.mkdtemp(prefix='bench_archive_')
+    try:
+        archive = ArchiveIndex(os.path.join(directory, 'archive'))
+        page = os.path.join(directory, 'page.html')
+        timings = []
+        start_time = time.time() - args.runs * 86400
+        for day in range(args.runs):
+            articles = make_run(day, args.articles, vocabulary, rng)
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                archive.add_run('benchmark', page, articles, run_at=start_time + day * 86400)
+            timings.append(time.perf_counter() - start)
+
+        window = max(1, min(30, args.runs // 10))
+        early = sum(timings[:window]) / window
+        late = sum(timings[-window:]) / window
+        total = directory_bytes(archive.archive_dir)
+        index_bytes = directory_bytes(os.path.join(archive.archive_dir, 'terms'))
+        print(f"runs:              {args.runs} x {args.articles} articles")
+        print(f"update, first {window}:   {early * 1000:.1f} ms/run")
+        print(f"update, last {window}:    {late * 1000:.1f} ms/run")
+        print(f"archive size:      {total / 1024:.0f} KB ({index_bytes / 1024:.0f} KB of term shards)")
+
+        for query in (words[0], f"{words[1]} {words[5][:2]}", words[500], f"{words[50]} {words[60]}"):
+            start = time.perf_counter()
+            results = archive.search(query, limit=50)
+            elapsed = time.perf_counter() - start
+            # Ids of the hits, to size the record chunks the page would load
+            hit_ids = []
+            for record in results:
+                day, index = (int(part) for part in record['link'].rsplit('/', 2)[1:])
+                hit_ids.append(day * args.articles + index)
+            fetched = fetched_bytes(archive, query, hit_ids)
+            print(f"query {query!r:<16} {len(results):>3} hits, {elapsed * 1000:6.1f} ms, "
+                  f"fetches {fetched / 1024:.0f} KB ({fetched / total:.1%} of the archive)")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark the memory held per article, dict articles vs. Article
+
+Parses synthetic SerpAPI result pages the way the searcher does and
+measures with tracemalloc what the resulting articles keep alive once the
+parsed pages are gone: the seven-key dicts earlier versions built, and
+the slotted Article with interned sources and None for missing fields.
+
+    python benchmarks/bench_article_memory.py --articles 10000
+"""
+
+import os
+import sys
+import gc
+import json
+import random
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from news_agent.core.article import Article  # noqa: E402
+
+SOURCES = ['Reuters', 'AP News', 'BBC', 'CNN', 'The Verge', 'Bloomberg', 'TechCrunch', 'Wired',
+           'Financial Times', 'The Guardian', 'Ars Technica', 'Axios']
+WORDS = ('model launch research market policy chip energy climate startup security data '
+         'report growth study regulators investors quarter open source release').split()
+
+
+def make_pages(count: int, page_size: int, rng: random.Random):
+    """SerpAPI-shaped JSON pages; some results lack a snippet, date or image"""
+    pages = []
+    for start in range(0, count, page_size):
+        results = []
+        for index in range(start, min(count, start + page_size)):
+            result = {
+                'title': ' '.join(rng.choice(WORDS) for _ in range(10)).capitalize(),
+                'link': f"https://example.com/news/{index}",
+                'source': rng.choice(SOURCES),
+                'thumbnail': f"https://example.com/thumbs/{index}.jpg",
+            }
+            if index % 4:
+                result['snippet'] = ' '.join(rng.choice(WORDS) for _ in range(30)).capitalize() + '.'
+            if index % 3:
+                result['date'] = f"{rng.randint(1, 23)} hours ago"
+            if index % 2:
+                result['image'] = f"https://example.com/images/{index}.jpg"
+            results.append(result)
+        pages.append(json.dumps({'news_results': results}))
+    return pages
+
+
+def as_dict(article):
+    """The dict the searcher built before Article"""
+    return {
+        'title': article.get('title', 'No title'),
+        'link': article.get('link', ''),
+        'snippet': article.get('snippet', 'No description'),
+        'date': article.get('date', 'No date'),
+        'source': article.get('source', 'Unknown source'),
+        'image': article.get('image', ''),
+        'thumbnail': article.get('thumbnail', '')
+    }
+
+
+def retained_bytes(pages, build) -> int:
+    """Bytes still allocated for the built articles after the parsed pages are dropped"""
+    gc.collect()
+    tracemalloc.start()
+    articles = []
+    for page in pages:
+        articles.extend(build(result) for result in json.loads(page)['news_results'])
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del articles
+    return retained
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the memory held per article")
+    parser.add_argument('--articles', type=int, default=10000, help='Articles to build (default: 10000)')
+    parser.add_argument('--page-size', type=int, default=100, help='Results per SerpAPI page (default: 100)')
+    args = parser.parse_args()
+
+    pages = make_pages(args.articles, args.page_size, random.Random(5))
+    before = retained_bytes(pages, as_dict)
+    after = retained_bytes(pages, Article.from_dict)
+
+    sample = json.loads(pages[0])['news_results'][1]
+    print(f"articles:            {args.articles}")
+    print(f"container only:      dict {sys.getsizeof(as_dict(sample))} B, "
+          f"Article {sys.getsizeof(Article.from_dict(sample))} B")
+    print(f"retained, dicts:     {before / args.articles:7.0f} B/article ({before / 1024 / 1024:.1f} MB)")
+    print(f"retained, Article:   {after / args.articles:7.0f} B/article ({after / 1024 / 1024:.1f} MB)")
+    print(f"saved:               {1 - after / before:.0%}")
+
+
+if __name__ == '__main__':
+    main()
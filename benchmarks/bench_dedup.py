@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark near-duplicate story detection
+
+Generates synthetic news results in which each story is syndicated by a few
+outlets with small edits, then measures clustering time and pairwise
+precision/recall against the known stories. A brute-force pairwise
+comparison on a sample shows how the LSH stage scales.
+
+    python benchmarks/bench_dedup.py --articles 3000
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+from itertools import combinations
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from news_agent.core.dedup import StoryDeduplicator, jaccard, shingles  # noqa: E402
+
+SOURCES = ['Reuters', 'AP News', 'BBC', 'CNN', 'The Verge', 'Bloomberg', 'TechCrunch', 'Wired']
+
+
+def make_articles(count: int, rng: random.Random):
+    """Synthetic articles and the story id of each"""
+    vocabulary = [f"w{i}" for i in range(5000)]
+    articles, stories = [], []
+    story = 0
+    while len(articles) < count:
+        title = rng.sample(vocabulary, 10)
+        snippet = rng.sample(vocabulary, 25)
+        for _ in range(rng.choice([1, 1, 1, 2, 3, 5])):
+            words_title, words_snippet = list(title), list(snippet)
+            # Outlets retitle slightly and cut or reword the snippet
+            words_title[rng.randrange(len(words_title))] = rng.choice(vocabulary)
+            words_snippet = words_snippet[:rng.randint(20, 25)]
+            words_snippet[rng.randrange(len(words_snippet))] = rng.choice(vocabulary)
+            articles.append({
+                'title': ' '.join(words_title),
+                'snippet': ' '.join(words_snippet),
+                'source': rng.choice(SOURCES),
+                'link': f"https://example.com/{len(articles)}",
+            })
+            stories.append(story)
+        story += 1
+    return articles[:count], stories[:count]
+
+
+def pairs_of(clusters):
+    return {pair for members in clusters for pair in combinations(sorted(members), 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark near-duplicate story detection")
+    parser.add_argument('--articles', type=int, default=3000, help='Synthetic articles (default: 3000)')
+    parser.add_argument('--threshold', type=float, default=0.5, help='Jaccard threshold (default: 0.5)')
+    parser.add_argument('--brute-sample', type=int, default=1000,
+                        help='Articles compared pairwise for the scaling baseline (default: 1000)')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    articles, stories = make_articles(args.articles, rng)
+    deduplicator = StoryDeduplicator(args.threshold)
+
+    start = time.perf_counter()
+    clusters = deduplicator.clusters(articles)
+    elapsed = time.perf_counter() - start
+
+    expected = {}
+    for index, story in enumerate(stories):
+        expected.setdefault(story, []).append(index)
+    found, truth = pairs_of(clusters), pairs_of(expected.values())
+    precision = len(found & truth) / len(found) if found else 1.0
+    recall = len(found & truth) / len(truth) if truth else 1.0
+
+    print(f"articles:        {len(articles)}")
+    print(f"stories:         {len(expected)}")
+    print(f"clusters:        {len(clusters)}")
+    print(f"lsh bands/rows:  {deduplicator.bands}/{deduplicator.rows}")
+    print(f"minhash + lsh:   {elapsed * 1000:.1f} ms ({elapsed / len(articles) * 1e6:.0f} us/article)")
+    print(f"pair precision:  {precision:.3f}")
+    print(f"pair recall:     {recall:.3f}")
+
+    # Exhaustive comparison on a sample, extrapolated quadratically
+    sample = min(args.brute_sample, len(articles))
+    sets = [shingles(f"{a['title']} {a['snippet']}") for a in articles[:sample]]
+    start = time.perf_counter()
+    for first, second in combinations(range(sample), 2):
+        jaccard(sets[first], sets[second])
+    brute = time.perf_counter() - start
+    projected = brute * (len(articles) / sample) ** 2
+    print(f"pairwise ({sample}): {brute * 1000:.1f} ms, projected for {len(articles)}: {projected * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+Offline end-to-end benchmark of NewsAgent.run
+
+Starts local stand-ins for SerpAPI (news and image search) and for several
+image origins, replaces Gemini with a fake chat model, then runs the whole
+pipeline for each article count in a fresh process: once cold (empty caches)
+and once warm (same caches). Wall time per stage, peak RSS, bytes
+transferred and request counts are written to a JSON file.
+
+    python benchmarks/bench_e2e.py --sizes 10,100,1000
+    python benchmarks/bench_e2e.py --baseline old.json --threshold 0.2
+
+With ``--baseline`` the run fails (exit code 1) when a stage or the total
+got slower than the baseline by more than the threshold.
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import zlib
+import random
+import struct
+import argparse
+import tempfile
+import threading
+import subprocess
+import contextlib
+from types import SimpleNamespace
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SOURCES = ['Reuters', 'AP News', 'BBC', 'CNN', 'The Verge', 'Bloomberg', 'TechCrunch', 'Wired']
+WORDS = [f"term{i}" for i in range(3000)]
+
+
+# --- Stand-in services -----------------------------------------------------
+
+def make_image(width: int, height: int, size: int) -> bytes:
+    """A decodable JPEG of the given pixel size, padded to ``size`` bytes"""
+    try:
+        from PIL import Image
+        buffer = io.BytesIO()
+        Image.new('RGB', (width, height), (40, 90, 160)).save(buffer, 'JPEG', quality=85)
+        data = buffer.getvalue()
+    except ImportError:
+        # Headers only: enough for format sniffing and size probing
+        sof = b'\xff\xc0' + struct.pack('>HBHHB', 11, 8, height, width, 1) + b'\x01\x11\x00'
+        data = b'\xff\xd8' + sof + b'\xff\xd9'
+    # Decoders ignore bytes after the end-of-image marker
+    return data + b'\0' * max(0, size - len(data))
+
+
+class StandIns:
+    """SerpAPI and image origin stand-ins served from background threads"""
+
+    def __init__(self, serp_latency: float, image_latency: float, image_bytes: int,
+                 failure_rate: float, origins: int, duplicate_every: int):
+        self.serp_latency = serp_latency
+        self.image_latency = image_latency
+        self.failure_rate = failure_rate
+        self.duplicate_every = duplicate_every
+        self.image = make_image(1200, 800, image_bytes)
+        self.counts = {'serp_requests': 0, 'image_requests': 0, 'image_bytes': 0}
+        self._lock = threading.Lock()
+        self._servers = []
+
+        self.serp_url = self._serve('127.0.0.1', self._serp_handler()) + '/search'
+        # Distinct loopback addresses act as distinct hosts for per-host limits
+        self.origins = [self._serve(f"127.0.0.{2 + i}", self._image_handler()) for i in range(origins)]
+
+    def _serve(self, address: str, handler) -> str:
+        server = ThreadingHTTPServer((address, 0), handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self._servers.append(server)
+        return f"http://{address}:{server.server_port}"
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counts[key] += amount
+
+    def article(self, index: int):
+        """Deterministic article; every ``duplicate_every``-th one syndicates its predecessor"""
+        story = index - 1 if self.duplicate_every and index % self.duplicate_every == self.duplicate_every - 1 else index
+        rng = random.Random(story)
+        title = ' '.join(rng.sample(WORDS, 10))
+        snippet = ' '.join(rng.sample(WORDS, 25))
+        origin = self.origins[index % len(self.origins)]
+        return {
+            'title': title if story == index else f"{title} - {SOURCES[index % len(SOURCES)]}",
+            'link': f"https://news.example/{index}?utm_source=serp",
+            'snippet': snippet,
+            'date': '1 hour ago',
+            'source': SOURCES[index % len(SOURCES)],
+            'thumbnail': f"{origin}/img/thumb-{index}.jpg",
+        }
+
+    def _serp_handler(self):
+        stand_ins = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                stand_ins._count('serp_requests')
+                time.sleep(stand_ins.serp_latency)
+                query = {key: values[0] for key, values in parse_qs(urlsplit(self.path).query).items()}
+                if query.get('tbm') == 'isch':
+                    seed = zlib.crc32(query.get('q', '').encode())
+                    data = {'images_results': [
+                        {
+                            'original': f"{stand_ins.origins[(seed + i) % len(stand_ins.origins)]}/img/hr-{seed}-{i}.jpg",
+                            'original_width': 1200,
+                            'original_height': 800,
+                        }
+                        for i in range(3)
+                    ]}
+                else:
+                    start, num = int(query.get('start', 0)), int(query.get('num', 10))
+                    data = {'news_results': [stand_ins.article(i) for i in range(start, start + num)]}
+                body = json.dumps(data).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def _image_handler(self):
+        stand_ins = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                stand_ins._count('image_requests')
+                time.sleep(stand_ins.image_latency)
+                if random.Random(self.path).random() < stand_ins.failure_rate:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                # Unique trailing bytes keep every URL a distinct blob in the store
+                body = stand_ins.image + self.path.encode()
+                stand_ins._count('image_bytes', len(body))
+                self.send_response(200)
+                self.send_header('Content-Type', 'image/jpeg')
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('ETag', '"bench"')
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def close(self) -> None:
+        for server in self._servers:
+            server.shutdown()
+
+
+class FakeChatModel:
+    """Stands in for Gemini: sleeps like a remote call and returns canned HTML"""
+
+    def __init__(self, latency: float, per_kchar: float):
+        self.latency = latency
+        self.per_kchar = per_kchar
+        self.calls = 0
+        self.prompt_chars = 0
+        self._lock = threading.Lock()
+
+    def invoke(self, prompt: str):
+        with self._lock:
+            self.calls += 1
+            self.prompt_chars += len(prompt)
+        time.sleep(self.latency + self.per_kchar * len(prompt) / 1000)
+        return SimpleNamespace(content=f"<p>Offline summary of a {len(prompt)}-character prompt.</p>")
+
+
+# --- One measured run (child process) --------------------------------------
+
+def instrument(agent, timings):
+    """
+    Wrap the pipeline stages of an agent to accumulate their wall time
+
+    Returns a function that removes the wrappers again.
+    """
+    stages = {
+        'cleanup': (agent, 'cleanup_images'),
+        'fetch_news': (agent.searcher, 'fetch_news'),
+        'dedup': (agent.deduplicator, 'dedupe'),
+        'summary': (agent.ai_summarizer, 'generate_news_summary'),
+        'images': (agent.image_pipeline, 'resolve'),
+        'variants': (agent.image_variants, 'process'),
+        'render': (agent.web_generator, 'write_html_page'),
+    }
+    wrapped = []
+    for name, (owner, method) in stages.items():
+        if owner is None:
+            continue
+        original = getattr(owner, method)
+
+        def timed(*args, _original=original, _name=name, **kwargs):
+            start = time.perf_counter()
+            try:
+                return _original(*args, **kwargs)
+            finally:
+                timings[_name] = timings.get(_name, 0.0) + time.perf_counter() - start
+
+        setattr(owner, method, timed)
+        wrapped.append((owner, method))
+
+    def restore():
+        for owner, method in wrapped:
+            delattr(owner, method)
+
+    return restore
+
+
+def peak_rss_mb() -> float:
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_child(articles: int, llm_latency: float, llm_per_kchar: float) -> dict:
+    from news_agent.core.agent import NewsAgent
+
+    llm = FakeChatModel(llm_latency, llm_per_kchar)
+    result = {'articles': articles}
+    with contextlib.redirect_stdout(io.StringIO()):
+        agent = NewsAgent(asset_mode='external', llm=llm)
+    for phase in ('cold', 'warm'):
+        timings = {}
+        restore = instrument(agent, timings)
+        http_before = agent.http.stats()
+        calls_before = llm.calls
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            agent.run('benchmark topic', articles, output_file=f"page_{phase}.html")
+        wall = time.perf_counter() - start
+
+        requests, transferred, errors = 0, 0, 0
+        for host, stats in agent.http.stats().items():
+            before = http_before.get(host, {})
+            requests += stats['requests'] - before.get('requests', 0)
+            transferred += stats['bytes'] - before.get('bytes', 0)
+            errors += stats['errors'] - before.get('errors', 0)
+        result[phase] = {
+            'wall_s': round(wall, 4),
+            'stages_s': {name: round(value, 4) for name, value in timings.items()},
+            'http_requests': requests,
+            'http_errors': errors,
+            'bytes_transferred': transferred,
+            'llm_calls': llm.calls - calls_before,
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+        }
+        restore()
+    if agent.image_variants:
+        agent.image_variants.close()
+    return result
+
+
+# --- Driver ----------------------------------------------------------------
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def compare(results: dict, baseline: dict, threshold: float, min_seconds: float):
+    """Regressions of the current results against a baseline file"""
+    previous = {run['articles']: run for run in baseline.get('runs', [])}
+    regressions = []
+    for run in results['runs']:
+        old = previous.get(run['articles'])
+        if not old:
+            continue
+        for phase in ('cold', 'warm'):
+            pairs = [('total', run[phase]['wall_s'], old[phase]['wall_s'])]
+            pairs += [
+                (stage, seconds, old[phase]['stages_s'].get(stage))
+                for stage, seconds in run[phase]['stages_s'].items()
+            ]
+            for name, current, before in pairs:
+                if before is None:
+                    continue
+                if current > before * (1 + threshold) and current - before > min_seconds:
+                    regressions.append(
+                        f"{run['articles']} articles, {phase} {name}: {before:.3f}s -> {current:.3f}s"
+                    )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark of NewsAgent.run")
+    parser.add_argument('--sizes', default='10,100,1000', help='Article counts to run (default: 10,100,1000)')
+    parser.add_argument('--output', default=os.path.join(ROOT, 'benchmarks', 'results', 'e2e.json'),
+                        help='Results file (default: benchmarks/results/e2e.json)')
+    parser.add_argument('--baseline', help='Earlier results file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Allowed slowdown vs. the baseline, as a fraction (default: 0.2)')
+    parser.add_argument('--min-regression-s', type=float, default=0.05,
+                        help='Ignore slowdowns smaller than this many seconds (default: 0.05)')
+    parser.add_argument('--serp-latency-ms', type=float, default=50, help='SerpAPI stand-in latency (default: 50)')
+    parser.add_argument('--image-latency-ms', type=float, default=30, help='Image origin latency (default: 30)')
+    parser.add_argument('--image-kb', type=int, default=150, help='Size of every served image (default: 150)')
+    parser.add_argument('--image-failure-rate', type=float, default=0.1,
+                        help='Fraction of image URLs answering 404 (default: 0.1)')
+    parser.add_argument('--origins', type=int, default=4, help='Distinct image hosts (default: 4)')
+    parser.add_argument('--duplicate-every', type=int, default=7,
+                        help='Every Nth article syndicates the previous story (0 disables, default: 7)')
+    parser.add_argument('--llm-latency-ms', type=float, default=300, help='Fake model latency per call (default: 300)')
+    parser.add_argument('--llm-ms-per-kchar', type=float, default=2,
+                        help='Extra fake model latency per 1000 prompt characters (default: 2)')
+    parser.add_argument('--no-variants', action='store_true',
+                        help='Skip resized image variants (CPU-bound; dominates on small machines)')
+    parser.add_argument('--child', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        result = run_child(args.child, args.llm_latency_ms / 1000, args.llm_ms_per_kchar / 1000)
+        print(json.dumps(result))
+        return 0
+
+    stand_ins = StandIns(
+        serp_latency=args.serp_latency_ms / 1000,
+        image_latency=args.image_latency_ms / 1000,
+        image_bytes=args.image_kb * 1024,
+        failure_rate=args.image_failure_rate,
+        origins=max(1, args.origins),
+        duplicate_every=args.duplicate_every,
+    )
+    results = {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'config': {key: value for key, value in vars(args).items() if key not in ('child', 'output', 'baseline')},
+        'runs': [],
+    }
+
+    try:
+        for size in [int(size) for size in args.sizes.split(',') if size.strip()]:
+            with tempfile.TemporaryDirectory(prefix='news-agent-bench-') as workdir:
+                env = dict(
+                    os.environ,
+                    SERPAPI_API_KEY='offline',
+                    GOOGLE_API_KEY='offline',
+                    NEWS_AGENT_SERPAPI_URL=stand_ins.serp_url,
+                    NEWS_AGENT_CACHE_DIR=os.path.join(workdir, 'cache'),
+                )
+                if args.no_variants:
+                    env['NEWS_AGENT_IMAGE_VARIANTS'] = '0'
+                counts_before = dict(stand_ins.counts)
+                child = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), '--child', str(size)] + sys.argv[1:],
+                    cwd=workdir, env=env, capture_output=True, text=True
+                )
+                if child.returncode != 0:
+                    print(child.stderr, file=sys.stderr)
+                    print(f"❌ Run with {size} articles failed")
+                    return 1
+                run = json.loads(child.stdout.strip().splitlines()[-1])
+                run['server'] = {key: stand_ins.counts[key] - counts_before[key] for key in stand_ins.counts}
+                results['runs'].append(run)
+                print(f"{size:>6} articles  cold {run['cold']['wall_s']:7.2f}s  warm {run['warm']['wall_s']:7.2f}s  "
+                      f"requests {run['cold']['http_requests']:>5}/{run['warm']['http_requests']:<5}  "
+                      f"peak RSS {run['warm']['peak_rss_mb']:.0f} MB")
+                for stage, seconds in sorted(run['cold']['stages_s'].items(), key=lambda item: -item[1]):
+                    print(f"{'':>16}{stage:<12}{seconds:7.2f}s  (warm {run['warm']['stages_s'].get(stage, 0):.2f}s)")
+    finally:
+        stand_ins.close()
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"📄 Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.threshold, args.min_regression_s)
+        if regressions:
+            print(f"❌ {len(regressions)} regressions over {args.threshold:.0%}:")
+            for regression in regressions:
+                print(f"   {regression}")
+            return 1
+        print(f"✅ No regressions over {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
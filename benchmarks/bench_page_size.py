@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark generated page size with and without minification
+
+Renders one page of synthetic articles in every asset mode, plain and
+minified, and reports raw, gzip and (if the optional brotli package is
+installed) brotli bytes plus render time. The shared asset files of
+'external' mode are reported separately since browsers cache them.
+
+    python benchmarks/bench_page_size.py --articles 100
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from news_agent.core.web_generator import WebGenerator  # noqa: E402
+from news_agent.core import assets  # noqa: E402
+from news_agent.utils.compression import brotli_available, compress  # noqa: E402
+
+SOURCES = ['Reuters', 'AP News', 'BBC', 'CNN', 'The Verge', 'Bloomberg', 'TechCrunch', 'Wired']
+WORDS = ('model launch research market policy chip energy climate startup security data '
+         'report growth study regulators investors quarter open source release').split()
+
+
+def make_page_input(count: int, rng: random.Random):
+    """Synthetic articles, summary, images and variants for one page"""
+    images_dir = os.path.join(os.getcwd(), 'news_images')
+    articles, image_urls, variants = [], [], {}
+    for index in range(count):
+        articles.append({
+            'title': ' '.join(rng.choice(WORDS) for _ in range(10)).capitalize(),
+            'link': f"https://example.com/news/{index}",
+            'source': rng.choice(SOURCES),
+            'date': f"{rng.randint(1, 12)} hours ago",
+            'snippet': ' '.join(rng.choice(WORDS) for _ in range(35)).capitalize() + '.',
+        })
+        if index % 5 == 4:
+            image_urls.append('')
+            continue
+        blob = f"{rng.getrandbits(128):032x}"
+        path = os.path.join(images_dir, f"{blob}.jpg")
+        image_urls.append(path)
+        variants[path] = {'variants': [
+            {'path': os.path.join(images_dir, 'variants', f"{blob}_w{width}.webp"),
+             'width': width, 'height': width * 9 // 16}
+            for width in (320, 640, 960, 1280)
+        ]}
+    summary = "\n".join(
+        f"<h3>Theme {theme}</h3>\n<ul>\n" + "\n".join(
+            f"    <li><strong>{rng.choice(WORDS).title()}:</strong> "
+            f"{' '.join(rng.choice(WORDS) for _ in range(20))}</li>"
+            for _ in range(4)
+        ) + "\n</ul>"
+        for theme in range(1, 5)
+    )
+    return articles, summary, image_urls, variants
+
+
+def sizes(data: bytes):
+    """Raw, gzip and brotli sizes of a payload (brotli None if unavailable)"""
+    brotli_data = compress(data, 'br')
+    return len(data), len(compress(data, 'gzip')), len(brotli_data) if brotli_data is not None else None
+
+
+def fmt(size):
+    return f"{size:>9,}" if size is not None else f"{'-':>9}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark generated page size with and without minification")
+    parser.add_argument('--articles', type=int, default=100, help='Articles on the page (default: 100)')
+    parser.add_argument('--runs', type=int, default=5, help='Renders timed per mode (default: 5)')
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    articles, summary, image_urls, variants = make_page_input(args.articles, rng)
+    image_handler = SimpleNamespace(download_images=True)
+
+    print(f"articles: {args.articles}, brotli: {'yes' if brotli_available() else 'not installed'}")
+    print(f"{'mode':<20}{'raw':>9}{'gzip':>9}{'brotli':>9}{'render ms':>11}")
+    results = {}
+    for asset_mode in WebGenerator.ASSET_MODES:
+        for minify in (False, True):
+            generator = WebGenerator(image_handler, asset_mode, minify=minify)
+            timings = []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                page = generator.generate_html_page('benchmark', articles, summary, image_urls, variants)
+                timings.append(time.perf_counter() - start)
+            label = f"{asset_mode}{' minified' if minify else ''}"
+            results[label] = sizes(page.encode('utf-8'))
+            raw, gz, br = results[label]
+            print(f"{label:<20}{fmt(raw)}{fmt(gz)}{fmt(br)}{min(timings) * 1000:>11.1f}")
+
+    for minify in (False, True):
+        css = assets.MIN_PAGE_CSS if minify else assets.PAGE_CSS
+        js = assets.MIN_PAGE_JS if minify else assets.PAGE_JS
+        raw, gz, br = (sum(filter(None, column)) if any(v is not None for v in column) else None
+                       for column in zip(sizes(css.encode('utf-8')), sizes(js.encode('utf-8'))))
+        label = f"assets{' minified' if minify else ''}"
+        print(f"{label:<20}{fmt(raw)}{fmt(gz)}{fmt(br)}")
+
+    print()
+    for asset_mode in WebGenerator.ASSET_MODES:
+        before, after = results[asset_mode], results[f"{asset_mode} minified"]
+        print(f"{asset_mode}: raw {before[0]:,} -> {after[0]:,} bytes ({1 - after[0] / before[0]:.0%} smaller), "
+              f"gzip {before[1]:,} -> {after[1]:,} ({1 - after[1] / before[1]:.0%} smaller)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark cold CLI startup
+
+Runs ``news_agent.py --help`` in fresh interpreters and fails (exit code 1)
+if the median wall time exceeds the budget or if a heavy dependency such as
+LangChain is imported just to print the help text.
+
+    python benchmarks/bench_startup.py --budget-ms 300
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must only be imported once a run actually needs them
+HEAVY_MODULES = ('langchain', 'langchain_core', 'langchain_google_genai', 'PIL')
+
+
+def time_help(runs: int):
+    """Wall times of cold ``--help`` invocations, in seconds"""
+    command = [sys.executable, os.path.join(ROOT, 'news_agent.py'), '--help']
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, stdout=subprocess.DEVNULL, check=True)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def heavy_imports():
+    """Heavy top-level packages imported while printing the help text"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', os.path.join(ROOT, 'news_agent.py'), '--help'],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True
+    )
+    imported = set()
+    for line in result.stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            module = line.rsplit('|', 1)[1].strip()
+            imported.add(module.split('.')[0])
+    return sorted(imported.intersection(HEAVY_MODULES))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cold CLI startup")
+    parser.add_argument('--runs', type=int, default=7, help='Fresh interpreters to time (default: 7)')
+    parser.add_argument('--budget-ms', type=float, default=300,
+                        help='Maximum median startup time in milliseconds (default: 300)')
+    args = parser.parse_args()
+
+    # Baseline: the interpreter alone, to separate our cost from Python's
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', 'pass'], check=True)
+    interpreter = time.perf_counter() - start
+
+    timings = time_help(args.runs)
+    median = statistics.median(timings)
+    heavy = heavy_imports()
+
+    print(f"interpreter:     {interpreter * 1000:.0f} ms")
+    print(f"--help median:   {median * 1000:.0f} ms (min {min(timings) * 1000:.0f}, max {max(timings) * 1000:.0f})")
+    print(f"budget:          {args.budget_ms:.0f} ms")
+    print(f"heavy imports:   {', '.join(heavy) or 'none'}")
+
+    failed = False
+    if median * 1000 > args.budget_ms:
+        print("❌ Startup is over budget")
+        failed = True
+    if heavy:
+        print("❌ Heavy dependencies are imported at startup")
+        failed = True
+    if not failed:
+        print("✅ Startup within budget")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,7 +6,7 @@ Command-line script to run the News Agent
 import os
 import sys
 import argparse
-from news_agent import NewsAgent
+from news_agent.cli.main import parse_address, read_topics_file
 
 
 def main():
@@ -19,12 +19,19 @@ Examples:
   %(prog)s "artificial intelligence" --articles 15
   %(prog)s "climate change" -a 20 -o climate_news.html
   %(prog)s "space exploration" --no-high-res --no-download
+  %(prog)s "space exploration" --minify --precompress
+  %(prog)s "climate change" "space exploration" --output-dir pages -p 4
+  %(prog)s --topics-file topics.txt --output-dir pages
+  %(prog)s --schedule schedule.json --output-dir pages
+  %(prog)s --schedule schedule.json --output-dir pages --serve 8000
         """
     )
 
     parser.add_argument(
-        "topic",
-        help="News topic to search for"
+        "topics",
+        nargs="*",
+        metavar="topic",
+        help="News topic(s) to search for; several topics run as a batch"
     )
 
     parser.add_argument(
@@ -51,8 +58,85 @@ Examples:
         help="Don't download images locally (use remote URLs)"
     )
 
+    parser.add_argument(
+        "--assets",
+        choices=["inline", "external"],
+        help="Embed CSS/JS in each page (inline, default) or share content-hashed asset files (external)"
+    )
+
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        default=None,
+        help="Minify pages and move per-image handlers into the page script"
+    )
+
+    parser.add_argument(
+        "--precompress",
+        action="store_true",
+        default=None,
+        help="Write .gz/.br copies next to each page for static hosts"
+    )
+
+    parser.add_argument(
+        "--archive-dir",
+        help="Append published articles to a searchable archive index in this directory"
+    )
+
+    parser.add_argument(
+        "--topics-file",
+        help="File with one topic per line to run as a batch"
+    )
+
+    parser.add_argument(
+        "--output-dir",
+        help="Output directory for pages, a single topic's included (default: current directory)"
+    )
+
+    parser.add_argument(
+        "-p", "--parallel",
+        type=int,
+        help="Topics processed at once in batch or schedule mode (default: 4)"
+    )
+
+    parser.add_argument(
+        "--schedule",
+        help="Keep running and refresh the topics of this JSON schedule on their intervals"
+    )
+
+    parser.add_argument(
+        "--serve",
+        type=parse_address,
+        metavar="[HOST:]PORT",
+        help="Serve the topic pages over HTTP, regenerating stale ones in the background"
+    )
+
+    parser.add_argument(
+        "--metrics-json",
+        help="Write a JSON run report with stage timings and counters to this file"
+    )
+
+    parser.add_argument(
+        "--metrics-prometheus",
+        help="Write metrics in Prometheus text format to this file"
+    )
+
     args = parser.parse_args()
 
+    topics = list(args.topics)
+    if args.topics_file:
+        try:
+            topics.extend(read_topics_file(args.topics_file))
+        except OSError as e:
+            parser.error(f"cannot read topics file: {e}")
+    if args.schedule and (topics or args.output):
+        parser.error("--schedule takes its topics from the schedule file")
+    if not topics and not args.schedule:
+        parser.error("at least one topic, --topics-file or --schedule is required")
+    batch = len(topics) > 1 or bool(args.topics_file)
+    if batch and args.output:
+        parser.error("--output applies to a single topic; use --output-dir for batches")
+
     # Check environment variables
     if not os.getenv('SERPAPI_API_KEY') or not os.getenv('GOOGLE_API_KEY'):
         print("❌ Error: Missing required API keys")
@@ -60,6 +144,9 @@ Examples:
         print("   Run: source set_env.sh")
         return 1
 
+    # Imported after argument parsing so --help and usage errors stay fast
+    from news_agent import NewsAgent
+
     try:
         # Initialize agent with settings
         high_res_images = not args.no_high_res
@@ -67,11 +154,45 @@ Examples:
 
         agent = NewsAgent(
             high_res_images=high_res_images,
-            download_images=download_images
+            download_images=download_images,
+            asset_mode=args.assets,
+            metrics_json=args.metrics_json,
+            metrics_prometheus=args.metrics_prometheus,
+            minify=args.minify,
+            precompress=args.precompress,
+            archive_dir=args.archive_dir
         )
 
+        if args.schedule or args.serve:
+            from news_agent.core.scheduler import TopicScheduler, build_schedule, load_schedule
+            if args.schedule:
+                schedule = load_schedule(args.schedule, agent.settings.schedule_interval, args.articles, args.output_dir or ".")
+            else:
+                schedule = build_schedule([{"topic": topics[0], "output": os.path.join(args.output_dir or "", args.output)}]
+                                          if args.output else topics,
+                                          agent.settings.schedule_interval, args.articles, args.output_dir or ".")
+            if args.serve:
+                from news_agent.core.server import NewsServer
+                host, port = args.serve
+                NewsServer(agent, schedule, host, port, args.parallel,
+                           cache_max_bytes=int(agent.settings.serve_cache_mb * 1024 * 1024)).serve_forever()
+            else:
+                TopicScheduler(agent, schedule, args.parallel, agent.settings.schedule_jitter).run()
+            return 0
+
+        if batch:
+            results = agent.run_batch(topics, args.articles, args.output_dir or ".", args.parallel)
+            agent.write_metrics(topics=topics)
+            return 0 if all(result["status"] == "success" for result in results) else 1
+
         # Run the agent
-        filepath = agent.run(args.topic, args.articles, args.output)
+        output = args.output
+        if args.output_dir:
+            from news_agent.core.web_generator import default_page_name
+            os.makedirs(args.output_dir, exist_ok=True)
+            output = os.path.join(args.output_dir, output or default_page_name())
+        filepath = agent.run(topics[0], args.articles, output)
+        agent.write_metrics(topics=topics)
 
         if filepath:
             print(f"\n🌐 Open the generated page in your browser:")
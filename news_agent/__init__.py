@@ -2,7 +2,18 @@
 News Agent - A tool for fetching news and generating web pages
 """
 
-from .core.agent import NewsAgent
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .core.agent import NewsAgent
 
 __version__ = "1.0.0"
 __all__ = ["NewsAgent"]
+
+
+def __getattr__(name):
+    # Import the agent (and LangChain behind it) only when it is first used
+    if name == "NewsAgent":
+        from .core.agent import NewsAgent
+        return NewsAgent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
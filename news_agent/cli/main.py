@@ -4,24 +4,118 @@ Command line interface for the News Agent
 
 import os
 import argparse
-from ..core.agent import NewsAgent
+from typing import List, Tuple
+
+
+def read_topics_file(path: str) -> List[str]:
+    """
+    Read one topic per line, skipping blank lines and '#' comments
+    
+    Args:
+        path: Path to the topics file
+        
+    Returns:
+        List of topics in file order
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.strip().startswith('#')]
+
+
+def parse_address(value: str) -> Tuple[str, int]:
+    """
+    Parse a ``[HOST:]PORT`` listen address
+    
+    Args:
+        value: e.g. '8000' or '0.0.0.0:8000'
+        
+    Returns:
+        (host, port); the host defaults to 127.0.0.1
+    """
+    host, _, port = value.rpartition(':')
+    try:
+        port_number = int(port)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid address '{value}', expected [HOST:]PORT")
+    if not 0 <= port_number <= 65535:
+        raise argparse.ArgumentTypeError(f"port out of range: {port_number}")
+    return host or '127.0.0.1', port_number
 
 
 def main():
     """Main function to run the news agent"""
     parser = argparse.ArgumentParser(description='News Agent - Download latest news and generate web page')
-    parser.add_argument('topic', help='News topic to search for')
+    parser.add_argument('topics', nargs='*', metavar='topic', help='News topic(s) to search for; several topics run as a batch')
     parser.add_argument('--articles', '-a', type=int, default=10, help='Number of articles to fetch (default: 10)')
     parser.add_argument('--output', '-o', help='Output filename (default: auto-generated)')
     parser.add_argument('--no-high-res', action='store_true', help='Disable high-resolution image search (faster but lower quality)')
     parser.add_argument('--no-download', action='store_true', help='Disable local image downloading (use remote URLs)')
+    parser.add_argument('--assets', choices=['inline', 'external'], help='Embed CSS/JS in each page (inline) or share content-hashed asset files (external)')
+    parser.add_argument('--minify', action='store_true', default=None, help='Minify pages and move per-image handlers into the page script')
+    parser.add_argument('--precompress', action='store_true', default=None, help='Write .gz/.br copies next to each page for static hosts')
+    parser.add_argument('--archive-dir', help='Append published articles to a searchable archive index in this directory')
+    parser.add_argument('--topics-file', help='File with one topic per line to run as a batch')
+    parser.add_argument('--output-dir', help="Output directory for pages, a single topic's included (default: current directory)")
+    parser.add_argument('--parallel', '-p', type=int, help='Topics processed at once in batch or schedule mode (default: 4)')
+    parser.add_argument('--schedule', help='Keep running and refresh the topics of this JSON schedule on their intervals')
+    parser.add_argument('--serve', type=parse_address, metavar='[HOST:]PORT', help='Serve the topic pages over HTTP, regenerating stale ones in the background')
+    parser.add_argument('--metrics-json', help='Write a JSON run report with stage timings and counters to this file')
+    parser.add_argument('--metrics-prometheus', help='Write metrics in Prometheus text format to this file')
     
     args = parser.parse_args()
     
+    topics = list(args.topics)
+    if args.topics_file:
+        try:
+            topics.extend(read_topics_file(args.topics_file))
+        except OSError as e:
+            parser.error(f'cannot read topics file: {e}')
+    if args.schedule and (topics or args.output):
+        parser.error('--schedule takes its topics from the schedule file')
+    if not topics and not args.schedule:
+        parser.error('at least one topic, --topics-file or --schedule is required')
+    batch = len(topics) > 1 or bool(args.topics_file)
+    if batch and args.output:
+        parser.error('--output applies to a single topic; use --output-dir for batches')
+    
+    # Imported after argument parsing so --help and usage errors stay fast
+    from ..core.agent import NewsAgent
+    
     try:
         # Initialize and run the news agent
-        agent = NewsAgent(high_res_images=not args.no_high_res, download_images=not args.no_download)
-        filepath = agent.run(args.topic, args.articles, args.output)
+        agent = NewsAgent(high_res_images=not args.no_high_res, download_images=not args.no_download,
+                          asset_mode=args.assets, metrics_json=args.metrics_json,
+                          metrics_prometheus=args.metrics_prometheus, minify=args.minify,
+                          precompress=args.precompress, archive_dir=args.archive_dir)
+        
+        if args.schedule or args.serve:
+            from ..core.scheduler import TopicScheduler, build_schedule, load_schedule
+            if args.schedule:
+                schedule = load_schedule(args.schedule, agent.settings.schedule_interval, args.articles, args.output_dir or '.')
+            else:
+                schedule = build_schedule([{'topic': topics[0], 'output': os.path.join(args.output_dir or '', args.output)}]
+                                          if args.output else topics,
+                                          agent.settings.schedule_interval, args.articles, args.output_dir or '.')
+            if args.serve:
+                from ..core.server import NewsServer
+                host, port = args.serve
+                NewsServer(agent, schedule, host, port, args.parallel,
+                           cache_max_bytes=int(agent.settings.serve_cache_mb * 1024 * 1024)).serve_forever()
+            else:
+                TopicScheduler(agent, schedule, args.parallel, agent.settings.schedule_jitter).run()
+            return 0
+        
+        if batch:
+            results = agent.run_batch(topics, args.articles, args.output_dir or '.', args.parallel)
+            agent.write_metrics(topics=topics)
+            return 0 if all(result['status'] == 'success' for result in results) else 1
+        
+        output = args.output
+        if args.output_dir:
+            from ..core.web_generator import default_page_name
+            os.makedirs(args.output_dir, exist_ok=True)
+            output = os.path.join(args.output_dir, output or default_page_name())
+        filepath = agent.run(topics[0], args.articles, output)
+        agent.write_metrics(topics=topics)
         
         if filepath:
             print(f"\n🌐 Open the generated page in your browser:")
@@ -3,7 +3,7 @@ Configuration settings for the News Agent
 """
 
 import os
-from typing import Optional
+from typing import List, Optional
 
 
 class Settings:
@@ -12,8 +12,88 @@ class Settings:
     def __init__(self):
         self.serpapi_key: Optional[str] = os.getenv('SERPAPI_API_KEY')
         self.google_api_key: Optional[str] = os.getenv('GOOGLE_API_KEY')
+        # Search endpoint; point it at a local stand-in for offline benchmarks
+        self.serpapi_url: str = os.getenv('NEWS_AGENT_SERPAPI_URL', 'https://serpapi.com/search')
         self.images_dir: str = os.path.join(os.getcwd(), 'news_images')
-        self.keep_images_days: int = 7
+        self.keep_images_days: int = int(os.getenv('NEWS_AGENT_KEEP_IMAGES_DAYS', '7'))
+        # Disk quota of news_images; images used by existing pages are never evicted
+        self.image_cache_max_mb: float = float(os.getenv('NEWS_AGENT_IMAGE_CACHE_MAX_MB', '500'))
+        # History of seen articles: entries unseen for this long are dropped, and
+        # articles without an image are searched again after the retry time
+        self.article_history_days: float = float(os.getenv('NEWS_AGENT_ARTICLE_HISTORY_DAYS', '30'))
+        self.image_retry_hours: float = float(os.getenv('NEWS_AGENT_IMAGE_RETRY_HOURS', '6'))
+        
+        # 'inline' embeds CSS/JS in each page, 'external' shares hashed asset files
+        self.asset_mode: str = os.getenv('NEWS_AGENT_ASSET_MODE', 'inline')
+        # Minified pages, and .gz/.br siblings of saved pages for static hosts
+        self.minify: bool = os.getenv('NEWS_AGENT_MINIFY', '0') == '1'
+        self.precompress: bool = os.getenv('NEWS_AGENT_PRECOMPRESS', '0') == '1'
+        
+        # Directory of the searchable archive of published articles (unset disables it)
+        self.archive_dir: Optional[str] = os.getenv('NEWS_AGENT_ARCHIVE_DIR') or None
+        
+        # Images smaller than this (in pixels) are skipped for the next candidate
+        self.image_min_width: int = int(os.getenv('NEWS_AGENT_IMAGE_MIN_WIDTH', '400'))
+        self.image_min_height: int = int(os.getenv('NEWS_AGENT_IMAGE_MIN_HEIGHT', '200'))
+        
+        # Download size limits in megabytes, per image and per run
+        self.image_max_mb: float = float(os.getenv('NEWS_AGENT_IMAGE_MAX_MB', '10'))
+        self.image_run_max_mb: float = float(os.getenv('NEWS_AGENT_IMAGE_RUN_MAX_MB', '200'))
+        
+        # Responsive image variants (requires Pillow)
+        self.image_variants: bool = os.getenv('NEWS_AGENT_IMAGE_VARIANTS', '1') != '0'
+        self.image_variant_widths: List[int] = [
+            int(width) for width in os.getenv('NEWS_AGENT_IMAGE_VARIANT_WIDTHS', '320,640,960,1280').split(',')
+            if width.strip()
+        ]
+        self.image_variant_format: str = os.getenv('NEWS_AGENT_IMAGE_VARIANT_FORMAT', 'webp')
+        self.image_variant_quality: int = int(os.getenv('NEWS_AGENT_IMAGE_VARIANT_QUALITY', '80'))
+        # 0 picks one process per CPU, at most four
+        self.image_variant_workers: int = int(os.getenv('NEWS_AGENT_IMAGE_VARIANT_WORKERS', '0'))
+        
+        # News result paging: results per SerpAPI request and pages fetched at once
+        self.news_page_size: int = int(os.getenv('NEWS_AGENT_NEWS_PAGE_SIZE', '100'))
+        self.news_page_workers: int = int(os.getenv('NEWS_AGENT_NEWS_PAGE_WORKERS', '3'))
+        
+        # Jaccard similarity of title+snippet above which articles are merged
+        # as one story (0 disables near-duplicate detection)
+        self.dedup_threshold: float = float(os.getenv('NEWS_AGENT_DEDUP_THRESHOLD', '0.5'))
+        
+        # Image resolution concurrency
+        self.image_workers: int = int(os.getenv('NEWS_AGENT_IMAGE_WORKERS', '8'))
+        self.image_per_host: int = int(os.getenv('NEWS_AGENT_IMAGE_PER_HOST', '2'))
+        
+        # Topics processed at once in batch mode
+        self.batch_parallelism: int = int(os.getenv('NEWS_AGENT_BATCH_PARALLELISM', '4'))
+        
+        # Daemon mode: refresh interval of topics that set none (seconds) and the
+        # fraction of an interval by which refreshes are randomly shifted
+        self.schedule_interval: float = float(os.getenv('NEWS_AGENT_SCHEDULE_INTERVAL', str(15 * 60)))
+        self.schedule_jitter: float = float(os.getenv('NEWS_AGENT_SCHEDULE_JITTER', '0.1'))
+        
+        # Memory budget of the server's cache of file bodies and compressed encodings
+        self.serve_cache_mb: float = float(os.getenv('NEWS_AGENT_SERVE_CACHE_MB', '64'))
+        
+        # Map-reduce summarization for large article sets (estimated tokens)
+        self.summary_map_reduce_threshold: int = int(os.getenv('NEWS_AGENT_SUMMARY_MAP_REDUCE_THRESHOLD', '6000'))
+        self.summary_chunk_tokens: int = int(os.getenv('NEWS_AGENT_SUMMARY_CHUNK_TOKENS', '2500'))
+        self.summary_workers: int = int(os.getenv('NEWS_AGENT_SUMMARY_WORKERS', '4'))
+        
+        # Persistent SerpAPI/Gemini response cache (TTLs in seconds, 0 disables a kind)
+        self.cache_dir: str = os.getenv('NEWS_AGENT_CACHE_DIR', os.path.join(os.getcwd(), '.news_agent_cache'))
+        self.news_cache_ttl: int = int(os.getenv('NEWS_AGENT_NEWS_CACHE_TTL', str(15 * 60)))
+        self.image_search_cache_ttl: int = int(os.getenv('NEWS_AGENT_IMAGE_SEARCH_CACHE_TTL', str(7 * 24 * 60 * 60)))
+        self.summary_cache_ttl: int = int(os.getenv('NEWS_AGENT_SUMMARY_CACHE_TTL', str(6 * 60 * 60)))
+        self.cache_max_mb: int = int(os.getenv('NEWS_AGENT_CACHE_MAX_MB', '64'))
+        
+        # Shared HTTP client (timeouts in seconds)
+        self.http_connect_timeout: float = float(os.getenv('NEWS_AGENT_HTTP_CONNECT_TIMEOUT', '5'))
+        self.http_read_timeout: float = float(os.getenv('NEWS_AGENT_HTTP_READ_TIMEOUT', '20'))
+        self.http_max_retries: int = int(os.getenv('NEWS_AGENT_HTTP_MAX_RETRIES', '3'))
+        
+        # Run report destinations; metrics are only recorded when one is set
+        self.metrics_json: Optional[str] = os.getenv('NEWS_AGENT_METRICS_JSON') or None
+        self.metrics_prometheus: Optional[str] = os.getenv('NEWS_AGENT_METRICS_PROMETHEUS') or None
         
     def validate(self) -> None:
         """Validate that required API keys are present"""
@@ -2,6 +2,17 @@
 Core functionality for the News Agent
 """
 
-from .agent import NewsAgent
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .agent import NewsAgent
 
 __all__ = ["NewsAgent"]
+
+
+def __getattr__(name):
+    # Import the agent (and LangChain behind it) only when it is first used
+    if name == "NewsAgent":
+        from .agent import NewsAgent
+        return NewsAgent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
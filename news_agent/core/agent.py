@@ -2,37 +2,153 @@
 Main NewsAgent class that coordinates all functionality
 """
 
+import os
+import re
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Dict, Any, Optional
 
 from .search import NewsSearcher
+from .article import Article
+from .dedup import StoryDeduplicator
+from .archive import ArchiveIndex
 from .image_handler import ImageHandler
+from .image_pipeline import ImagePipeline
+from .image_variants import ImageVariantProcessor, pillow_available
 from .ai_summarizer import AISummarizer
 from .web_generator import WebGenerator
 from ..config.settings import Settings
+from ..utils.concurrency import HostLimiter, Stage, run_stages
+from ..utils.response_cache import ResponseCache
+from ..utils.image_store import ImageStore
+from ..utils.http import HttpClient
+from ..utils.article_store import ArticleStore
+from ..utils.metrics import Metrics
 
 
 class NewsAgent:
     """Main agent that fetches news and generates web pages"""
     
-    def __init__(self, high_res_images: bool = True, download_images: bool = True):
-        """Initialize the news agent with API keys"""
+    def __init__(self, high_res_images: bool = True, download_images: bool = True,
+                 asset_mode: Optional[str] = None, llm: Optional[Any] = None,
+                 metrics_json: Optional[str] = None, metrics_prometheus: Optional[str] = None,
+                 minify: Optional[bool] = None, precompress: Optional[bool] = None,
+                 archive_dir: Optional[str] = None):
+        """
+        Initialize the news agent with API keys
+        
+        Args:
+            high_res_images: Search for high-resolution images
+            download_images: Store images locally instead of hotlinking
+            asset_mode: 'inline' or 'external' page assets (default from settings)
+            llm: Chat model replacing Gemini, e.g. a stand-in for offline benchmarks
+            metrics_json: Write a JSON run report here (default from settings)
+            metrics_prometheus: Write Prometheus text metrics here (default from settings)
+            minify: Write minified pages (default from settings)
+            precompress: Write .gz/.br siblings of pages (default from settings)
+            archive_dir: Append published articles to a searchable archive
+                index in this directory (default from settings)
+        """
         self.settings = Settings()
         self.settings.validate()
         
+        # Spans and counters are only recorded when a report is requested
+        self.metrics_json = metrics_json or self.settings.metrics_json
+        self.metrics_prometheus = metrics_prometheus or self.settings.metrics_prometheus
+        self.metrics = Metrics(enabled=bool(self.metrics_json or self.metrics_prometheus))
+        
         self.high_res_images = high_res_images
         self.download_images = download_images
         
-        # Initialize components
-        self.searcher = NewsSearcher(self.settings.serpapi_key)
+        # Initialize components; one pooled HTTP client is shared by every
+        # component so connections to SerpAPI and image hosts are reused
+        self.http = HttpClient(
+            pool_size=self.settings.image_workers * max(1, self.settings.batch_parallelism),
+            connect_timeout=self.settings.http_connect_timeout,
+            read_timeout=self.settings.http_read_timeout,
+            max_retries=self.settings.http_max_retries
+        )
+        self.metrics.add_collector(self._collect_http_metrics)
+        self.response_cache = ResponseCache(
+            self.settings.cache_dir,
+            ttls={
+                'news': self.settings.news_cache_ttl,
+                'images': self.settings.image_search_cache_ttl,
+                'summary': self.settings.summary_cache_ttl,
+            },
+            max_bytes=self.settings.cache_max_mb * 1024 * 1024
+        )
+        self.metrics.add_collector(self._collect_cache_metrics)
+        self.searcher = NewsSearcher(
+            self.settings.serpapi_key,
+            cache=self.response_cache,
+            http=self.http,
+            page_size=self.settings.news_page_size,
+            max_concurrent_pages=self.settings.news_page_workers,
+            serpapi_url=self.settings.serpapi_url,
+            metrics=self.metrics
+        )
+        self.deduplicator = (
+            StoryDeduplicator(self.settings.dedup_threshold) if self.settings.dedup_threshold > 0 else None
+        )
         self.image_handler = ImageHandler(
             self.settings.serpapi_key, 
             download_images, 
-            high_res_images
+            high_res_images,
+            host_limiter=HostLimiter(self.settings.image_per_host),
+            cache=self.response_cache,
+            image_store=ImageStore(
+                self.settings.images_dir,
+                os.path.join(self.settings.cache_dir, 'images.sqlite'),
+                temp_dir=os.path.join(self.settings.cache_dir, 'tmp')
+            ) if download_images else None,
+            http=self.http,
+            min_width=self.settings.image_min_width,
+            min_height=self.settings.image_min_height,
+            max_image_bytes=int(self.settings.image_max_mb * 1024 * 1024),
+            serpapi_url=self.settings.serpapi_url,
+            metrics=self.metrics
+        )
+        self.article_store = ArticleStore(os.path.join(self.settings.cache_dir, 'articles.sqlite'))
+        self.image_pipeline = ImagePipeline(
+            self.image_handler,
+            self.settings.image_workers,
+            article_store=self.article_store,
+            max_run_bytes=int(self.settings.image_run_max_mb * 1024 * 1024),
+            retry_hours=self.settings.image_retry_hours
+        )
+        self.image_variants: Optional[ImageVariantProcessor] = None
+        if download_images and self.settings.image_variants:
+            if pillow_available():
+                self.image_variants = ImageVariantProcessor(
+                    os.path.join(self.settings.images_dir, 'variants'),
+                    widths=self.settings.image_variant_widths,
+                    fmt=self.settings.image_variant_format,
+                    quality=self.settings.image_variant_quality,
+                    max_workers=self.settings.image_variant_workers or None
+                )
+            else:
+                print("⚠️  Pillow is not installed, responsive image variants are disabled")
+        self.ai_summarizer = AISummarizer(
+            self.settings.google_api_key,
+            cache=self.response_cache,
+            map_reduce_threshold=self.settings.summary_map_reduce_threshold,
+            chunk_tokens=self.settings.summary_chunk_tokens,
+            max_workers=self.settings.summary_workers,
+            llm=llm,
+            metrics=self.metrics
         )
-        self.ai_summarizer = AISummarizer(self.settings.google_api_key)
-        self.web_generator = WebGenerator(self.image_handler)
+        self.web_generator = WebGenerator(
+            self.image_handler, asset_mode or self.settings.asset_mode, metrics=self.metrics,
+            minify=self.settings.minify if minify is None else minify,
+            precompress=self.settings.precompress if precompress is None else precompress
+        )
+        archive_dir = archive_dir or self.settings.archive_dir
+        self.archive = ArchiveIndex(archive_dir) if archive_dir else None
     
-    def run(self, topic: str, num_articles: int = 10, output_file: Optional[str] = None) -> str:
+    def run(self, topic: str, num_articles: int = 10, output_file: Optional[str] = None,
+            cleanup_images: bool = True) -> str:
         """
         Main method to run the news agent
         
@@ -40,34 +156,243 @@ class NewsAgent:
             topic: News topic to search for
             num_articles: Number of articles to fetch
             output_file: Optional output filename
+            cleanup_images: Remove expired images and article history before running
             
         Returns:
             Path to the generated web page
         """
         print(f"🚀 Starting News Agent for topic: '{topic}'")
         print("=" * 50)
+        self.metrics.incr('runs')
+        cache_stats_before = self.response_cache.stats()
+        http_stats_before = self.http.stats()
         
         # Clean up old images if downloading is enabled
-        if self.download_images:
-            self.image_handler.cleanup_old_images(self.settings.keep_images_days)
+        if cleanup_images:
+            with self.metrics.span('stage', stage='cleanup'):
+                self.cleanup_images()
         
-        # Fetch news articles
-        news_articles = self.searcher.fetch_news(topic, num_articles)
+        # Summary and images depend only on the articles, not on each other,
+        # so they run side by side and the page is rendered once both are done
+        results = run_stages([
+            Stage('articles', lambda: self._fetch_articles(topic, num_articles)),
+            Stage('summary', lambda articles: self._summarize(topic, articles), ('articles',)),
+            Stage('images', self._resolve_images, ('articles',)),
+            Stage('variants', self._create_variants, ('images',)),
+            Stage('page', lambda articles, summary, images, variants: self._render(
+                topic, articles, summary, images, variants, output_file
+            ), ('articles', 'summary', 'images', 'variants')),
+        ], thread_name_prefix='news-stage')
+        news_articles, image_urls, filepath = results['articles'], results['images'], results['page']
         
-        # Generate AI summary
-        print("🤖 Generating AI summary...")
-        summary = self.ai_summarizer.generate_news_summary(topic, news_articles)
+        # Protect the page's images from eviction while the page exists
+        if self.image_handler.image_store:
+            self.image_handler.image_store.record_page(filepath, image_urls)
         
-        # Generate HTML page
-        print("🌐 Generating web page...")
-        html_content = self.web_generator.generate_html_page(topic, news_articles, summary)
-        
-        # Save the page
-        filepath = self.web_generator.save_web_page(html_content, output_file)
+        # Make the published articles searchable in the archive
+        if self.archive and filepath:
+            with self.metrics.span('stage', stage='archive'):
+                try:
+                    self.archive.add_run(topic, filepath, news_articles)
+                except (OSError, ValueError) as e:
+                    print(f"⚠️  Could not update the archive index: {e}")
         
         print("=" * 50)
         print(f"✅ News Agent completed successfully!")
         print(f"📄 Generated page: {filepath}")
         print(f"📊 Found {len(news_articles)} articles")
+        self._report_cache_stats(cache_stats_before)
+        self._report_http_stats(http_stats_before)
         
         return filepath
+    
+    def _fetch_articles(self, topic: str, num_articles: int) -> List[Article]:
+        """
+        Fetch the topic's articles and merge near-duplicate stories
+        
+        All pages are collected before returning: deduplication needs the
+        whole set, and the summary and image stages work on its result.
+        """
+        with self.metrics.span('stage', stage='fetch_news'):
+            news_articles = self.searcher.fetch_news(topic, num_articles)
+        
+        # Collapse syndicated copies of the same story before the expensive stages
+        if self.deduplicator:
+            with self.metrics.span('stage', stage='dedup'):
+                news_articles = self.deduplicator.dedupe(news_articles)
+        self.metrics.incr('articles', len(news_articles))
+        return news_articles
+    
+    def _summarize(self, topic: str, news_articles: List[Article]) -> str:
+        """Generate the AI summary of the articles"""
+        print("🤖 Generating AI summary...")
+        with self.metrics.span('stage', stage='summary'):
+            return self.ai_summarizer.generate_news_summary(topic, news_articles)
+    
+    def _resolve_images(self, news_articles: List[Article]) -> List[str]:
+        """Resolve (and download) article images concurrently"""
+        with self.metrics.span('stage', stage='images'):
+            return self.image_pipeline.resolve(news_articles)
+    
+    def _create_variants(self, image_urls: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Create resized variants of the downloaded images"""
+        with self.metrics.span('stage', stage='variants'):
+            return self.image_variants.process(image_urls) if self.image_variants else {}
+    
+    def _render(self, topic: str, news_articles: List[Article], summary: str, image_urls: List[str],
+                image_variants: Dict[str, Dict[str, Any]], output_file: Optional[str]) -> str:
+        """Generate the HTML page, streaming it to disk"""
+        print("🌐 Generating web page...")
+        with self.metrics.span('stage', stage='render'):
+            return self.web_generator.write_html_page(
+                topic, news_articles, summary, image_urls, output_file, image_variants
+            )
+    
+    def cleanup_images(self) -> None:
+        """Evict unreferenced images past their age or over the disk quota, and old article history"""
+        pruned = self.article_store.prune(self.settings.article_history_days)
+        if pruned:
+            print(f"🧹 Forgot {pruned} articles not seen for {self.settings.article_history_days:g} days")
+        if not self.download_images:
+            return
+        self.image_handler.cleanup_old_images(
+            self.settings.keep_images_days,
+            max_bytes=int(self.settings.image_cache_max_mb * 1024 * 1024),
+            on_evict=self.image_variants.remove if self.image_variants else None
+        )
+    
+    def run_batch(self, topics: List[str], num_articles: int = 10, output_dir: str = '.',
+                  parallelism: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Run the agent for several topics concurrently, reusing its clients
+        
+        Each topic is written to its own ``news_<topic>.html`` in ``output_dir``.
+        A failing topic is recorded and does not stop the others.
+        
+        Args:
+            topics: News topics to search for
+            num_articles: Number of articles to fetch per topic
+            output_dir: Directory receiving the pages and ``batch_status.json``
+            parallelism: Maximum topics processed at once (default from settings)
+            
+        Returns:
+            One status dict per topic, in input order, with topic, status
+            ('success' or 'failed'), filepath, error and duration
+        """
+        if not topics:
+            return []
+        
+        parallelism = max(1, parallelism or self.settings.batch_parallelism)
+        os.makedirs(output_dir, exist_ok=True)
+        print(f"🗂️  Running batch of {len(topics)} topics ({min(parallelism, len(topics))} at a time)")
+        
+        # Clean up once for the whole batch rather than from every topic
+        self.cleanup_images()
+        
+        output_files = self._batch_output_files(topics, output_dir)
+        results: List[Dict[str, Any]] = [{} for _ in topics]
+        with ThreadPoolExecutor(max_workers=min(parallelism, len(topics)), thread_name_prefix='news-topic') as pool:
+            futures = {
+                pool.submit(self._run_batch_topic, topic, num_articles, output_file): index
+                for index, (topic, output_file) in enumerate(zip(topics, output_files))
+            }
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+        
+        status_path = os.path.join(output_dir, 'batch_status.json')
+        try:
+            with open(status_path, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2, ensure_ascii=False)
+        except OSError as e:
+            print(f"⚠️  Could not write batch status: {e}")
+        
+        succeeded = sum(1 for result in results if result['status'] == 'success')
+        print("=" * 50)
+        print(f"🗂️  Batch finished: {succeeded}/{len(results)} topics succeeded")
+        for result in results:
+            if result['status'] != 'success':
+                print(f"   ❌ {result['topic']}: {result['error']}")
+        
+        return results
+    
+    def _run_batch_topic(self, topic: str, num_articles: int, output_file: str) -> Dict[str, Any]:
+        """Run one batch topic, capturing its outcome instead of raising"""
+        start = time.monotonic()
+        result: Dict[str, Any] = {'topic': topic, 'status': 'failed', 'filepath': '', 'error': ''}
+        try:
+            filepath = self.run(topic, num_articles, output_file, cleanup_images=False)
+            if filepath:
+                result.update(status='success', filepath=filepath)
+            else:
+                result['error'] = 'page could not be saved'
+        except Exception as e:
+            print(f"❌ Topic '{topic}' failed: {e}")
+            result['error'] = f"{type(e).__name__}: {e}"
+        result['duration'] = round(time.monotonic() - start, 3)
+        return result
+    
+    @staticmethod
+    def _batch_output_files(topics: List[str], output_dir: str) -> List[str]:
+        """Unique ``news_<slug>.html`` output path per topic"""
+        paths = []
+        seen: Dict[str, int] = {}
+        for topic in topics:
+            slug = re.sub(r'[^a-z0-9]+', '-', topic.lower()).strip('-') or 'topic'
+            seen[slug] = seen.get(slug, 0) + 1
+            if seen[slug] > 1:
+                slug = f"{slug}-{seen[slug]}"
+            paths.append(os.path.join(output_dir, f"news_{slug}.html"))
+        return paths
+    
+    def write_metrics(self, **extra: Any) -> None:
+        """
+        Export the spans and counters recorded so far (no-op unless enabled)
+        
+        Args:
+            **extra: Additional top-level fields of the JSON report
+        """
+        if not self.metrics.enabled:
+            return
+        try:
+            self.metrics.write(self.metrics_json, self.metrics_prometheus, **extra)
+            print(f"📈 Metrics written to {', '.join(p for p in (self.metrics_json, self.metrics_prometheus) if p)}")
+        except OSError as e:
+            print(f"⚠️  Could not write metrics: {e}")
+    
+    def _collect_http_metrics(self):
+        """HTTP client counters as metric samples"""
+        for host, counters in self.http.stats().items():
+            yield 'http_requests', {'host': host}, counters['requests']
+            yield 'http_errors', {'host': host}, counters['errors']
+            yield 'http_retries', {'host': host}, counters['retries']
+            yield 'http_bytes', {'host': host}, counters['bytes']
+            yield 'http_latency_seconds', {'host': host}, counters['latency']
+    
+    def _collect_cache_metrics(self):
+        """Response cache hits and misses as metric samples"""
+        for kind, counters in self.response_cache.stats().items():
+            yield 'cache_hits', {'kind': kind}, counters['hits']
+            yield 'cache_misses', {'kind': kind}, counters['misses']
+    
+    def _report_cache_stats(self, before: Dict[str, Dict[str, int]]) -> None:
+        """Print response cache hits and misses accumulated since ``before``"""
+        parts = []
+        for kind, counters in sorted(self.response_cache.stats().items()):
+            previous = before.get(kind, {})
+            hits = counters['hits'] - previous.get('hits', 0)
+            misses = counters['misses'] - previous.get('misses', 0)
+            if hits or misses:
+                parts.append(f"{kind} {hits} hits / {misses} misses")
+        if parts:
+            print(f"💾 Response cache: {', '.join(parts)}")
+    
+    def _report_http_stats(self, before: Dict[str, Dict[str, float]]) -> None:
+        """Print HTTP requests, retries and bytes accumulated since ``before``"""
+        totals = dict.fromkeys(('requests', 'retries', 'bytes', 'latency'), 0.0)
+        for host, counters in self.http.stats().items():
+            previous = before.get(host, {})
+            for name in totals:
+                totals[name] += counters[name] - previous.get(name, 0)
+        if totals['requests']:
+            print(f"🌐 HTTP: {int(totals['requests'])} requests, {int(totals['retries'])} retries, "
+                  f"{totals['bytes'] / 1024:.0f} KB received, {totals['latency']:.1f}s waiting")
@@ -2,43 +2,18 @@
 AI-powered news summarization functionality
 """
 
-from typing import List, Dict, Any
-from langchain_google_genai import ChatGoogleGenerativeAI
+import html
+import json
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
 
+from .article import Article, as_articles
+from ..utils.response_cache import ResponseCache
+from ..utils.metrics import Metrics
 
-class AISummarizer:
-    """Handles AI-powered news summarization using Google Gemini"""
-    
-    def __init__(self, google_api_key: str):
-        self.llm = ChatGoogleGenerativeAI(
-            model="gemini-flash-latest",
-            google_api_key=google_api_key,
-            temperature=0.7
-        )
-    
-    def generate_news_summary(self, topic: str, news_articles: List[Dict[str, Any]]) -> str:
-        """
-        Generate a summary of the news using AI
-        
-        Args:
-            topic: The news topic
-            news_articles: List of news articles
-            
-        Returns:
-            AI-generated summary of the news
-        """
-        if not news_articles:
-            return f"No recent news found about {topic}."
-        
-        # Prepare news content for AI processing
-        news_content = f"Topic: {topic}\n\nRecent News Articles:\n\n"
-        for i, article in enumerate(news_articles, 1):
-            news_content += f"{i}. {article['title']}\n"
-            news_content += f"   Source: {article['source']}\n"
-            news_content += f"   Summary: {article['snippet']}\n"
-            news_content += f"   Date: {article['date']}\n\n"
-        
-        system_prompt = """You are a news analyst. Analyze the provided news articles and create a comprehensive summary with the following structure:
+SYSTEM_PROMPT = """You are a news analyst. Analyze the provided news articles and create a comprehensive summary with the following structure:
 
 **FORMAT REQUIREMENTS:**
 - Use HTML formatting for better presentation
@@ -65,24 +40,277 @@ class AISummarizer:
 </ul>
 <h3>Key Insights:</h3>
 <p>Analysis and implications...</p>"""
+
+MAP_PROMPT = """You are a news analyst preparing notes for a larger report. Condense the news articles below into 4-8 plain-text bullet points. Merge articles covering the same story, keep concrete names, numbers and dates, and mention the sources. Do not use HTML."""
+
+
+class AISummarizer:
+    """Handles AI-powered news summarization using Google Gemini"""
+    
+    MODEL_NAME = "gemini-flash-latest"
+    # Bump whenever the prompts change so cached summaries are not reused
+    PROMPT_VERSION = 1
+    
+    def __init__(self, google_api_key: str, cache: Optional[ResponseCache] = None,
+                 map_reduce_threshold: int = 6000, chunk_tokens: int = 2500, max_workers: int = 4,
+                 llm: Optional[Any] = None, metrics: Optional[Metrics] = None):
+        """
+        Args:
+            google_api_key: Gemini API key
+            cache: Optional cache for summaries and per-chunk digests
+            map_reduce_threshold: Estimated prompt tokens above which the
+                articles are summarized in chunks and then merged
+            chunk_tokens: Token budget of the articles in one chunk
+            max_workers: Chunks summarized concurrently
+            llm: Chat model to use instead of Gemini; anything whose
+                ``invoke(prompt)`` returns an object with ``content``
+            metrics: Records model call latency, prompt size and tokens
+        """
+        self.google_api_key = google_api_key
+        self._llm = llm
+        self._llm_lock = threading.Lock()
+        self.cache = cache
+        self.metrics = metrics or Metrics(enabled=False)
+        self.map_reduce_threshold = map_reduce_threshold
+        self.chunk_tokens = max(200, chunk_tokens)
+        self.max_workers = max(1, max_workers)
+    
+    @property
+    def llm(self):
+        """
+        Gemini chat model, created on first use
+        
+        LangChain is imported here rather than at module load, so runs that
+        never call the model (no articles, cached summaries, --help) skip
+        its import and client setup.
+        """
+        if self._llm is None:
+            with self._llm_lock:
+                if self._llm is None:
+                    from langchain_google_genai import ChatGoogleGenerativeAI
+                    
+                    self._llm = ChatGoogleGenerativeAI(
+                        model=self.MODEL_NAME,
+                        google_api_key=self.google_api_key,
+                        temperature=0.7
+                    )
+        return self._llm
+    
+    def _invoke(self, prompt: str, stage: str):
+        """Call the model, recording latency and prompt/response sizes under ``stage``"""
+        self.metrics.incr('llm_calls', stage=stage)
+        self.metrics.incr('llm_prompt_chars', len(prompt), stage=stage)
+        self.metrics.incr('llm_prompt_tokens', self.estimate_tokens(prompt), stage=stage)
+        with self.metrics.span('llm.invoke', stage=stage):
+            response = self.llm.invoke(prompt)
+        self.metrics.incr('llm_response_chars', len(response.content or ''), stage=stage)
+        return response
+    
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        """Rough token count of a prompt (about four characters per token)"""
+        return len(text) // 4 + 1
+    
+    def summary_cache_params(self, topic: str, news_articles: List[Article]) -> Dict[str, Any]:
+        """
+        Cache parameters identifying a summary request
+        
+        The article set is reduced to a digest of its sorted, whitespace-
+        normalized (title, source, snippet) tuples, so the same articles in
+        a different order map to the same summary.
+        
+        Args:
+            topic: The news topic
+            news_articles: List of news articles
+            
+        Returns:
+            Parameters for ResponseCache lookups of kind 'summary'
+        """
+        normalized = sorted(
+            tuple(" ".join(article.text(field).split()) for field in ('title', 'source', 'snippet'))
+            for article in as_articles(news_articles)
+        )
+        digest = hashlib.sha256(json.dumps(normalized, ensure_ascii=False).encode('utf-8')).hexdigest()
+        return {
+            'topic': topic.strip().lower(),
+            'model': self.MODEL_NAME,
+            'prompt_version': self.PROMPT_VERSION,
+            'articles': digest,
+        }
+    
+    def generate_news_summary(self, topic: str, news_articles: List[Article]) -> str:
+        """
+        Generate a summary of the news using AI
+        
+        Args:
+            topic: The news topic
+            news_articles: List of news articles (article dicts are accepted too)
+            
+        Returns:
+            AI-generated summary of the news
+        """
+        if not news_articles:
+            return f"No recent news found about {topic}."
+        news_articles = as_articles(news_articles)
+        
+        cache_params = self.summary_cache_params(topic, news_articles)
+        if self.cache:
+            cached = self.cache.get('summary', cache_params)
+            if cached is not None:
+                print(f"💾 Reusing cached summary for {len(news_articles)} unchanged articles")
+                return cached
+        
+        # Prepare news content for AI processing
+        news_content = self._format_articles(topic, news_articles)
+        
+        # Large article sets are summarized in chunks and merged
+        if self.estimate_tokens(news_content) > self.map_reduce_threshold:
+            return self._map_reduce_summary(topic, news_articles, cache_params)
         
         try:
             # Create a single prompt with system and user content
-            full_prompt = f"{system_prompt}\n\n{news_content}"
+            full_prompt = f"{SYSTEM_PROMPT}\n\n{news_content}"
             
             print(f"🤖 Calling Gemini API with prompt length: {len(full_prompt)} characters")
-            response = self.llm.invoke(full_prompt)
+            response = self._invoke(full_prompt, 'summary')
             print(f"✅ Received response from Gemini API")
+            if self.cache and response.content:
+                self.cache.set('summary', cache_params, response.content)
             return response.content
             
         except Exception as e:
             print(f"❌ Error generating summary: {e}")
             print(f"   Error type: {type(e).__name__}")
-            # Try alternative approach with simple prompt
+            # Try alternative approach with simple prompt; its degraded
+            # result is never cached, so a good summary is not displaced
             try:
                 simple_prompt = f"Analyze these news articles about {topic} and provide a 200-word summary:\n\n{news_content}"
-                response = self.llm.invoke(simple_prompt)
+                response = self._invoke(simple_prompt, 'fallback')
                 return response.content
             except Exception as e2:
                 print(f"❌ Alternative approach also failed: {e2}")
                 return f"Summary generation failed. Found {len(news_articles)} articles about {topic}. Error: {str(e)}"
+    
+    @staticmethod
+    def _format_articles(topic: str, news_articles: List[Article]) -> str:
+        """Render articles as the numbered list fed to the model"""
+        parts = [f"Topic: {topic}\n\nRecent News Articles:\n\n"]
+        for i, article in enumerate(news_articles, 1):
+            parts.append(
+                f"{i}. {article.text('title')}\n"
+                f"   Source: {article.text('source')}\n"
+                f"   Summary: {article.text('snippet')}\n"
+                f"   Date: {article.text('date')}\n\n"
+            )
+        return "".join(parts)
+    
+    def _chunk_articles(self, topic: str, news_articles: List[Article]) -> List[List[Article]]:
+        """
+        Split articles into chunks that fit the token budget
+        
+        Articles are ordered by a hash of their content and chunk boundaries
+        are placed at content-defined points, so a run that adds or drops a
+        few articles leaves most chunks, and their cached digests, unchanged.
+        """
+        keyed = sorted(
+            ((self.summary_cache_params(topic, [article])['articles'], article) for article in news_articles),
+            key=lambda pair: pair[0]
+        )
+        boundary_every = max(2, self.chunk_tokens // 200)
+        
+        chunks: List[List[Article]] = []
+        current: List[Article] = []
+        tokens = 0
+        for key, article in keyed:
+            article_tokens = self.estimate_tokens(self._format_articles(topic, [article]))
+            at_boundary = int(key[:8], 16) % boundary_every == 0
+            if current and (tokens + article_tokens > self.chunk_tokens or at_boundary):
+                chunks.append(current)
+                current, tokens = [], 0
+            current.append(article)
+            tokens += article_tokens
+        if current:
+            chunks.append(current)
+        return chunks
+    
+    def _map_reduce_summary(self, topic: str, news_articles: List[Article],
+                            cache_params: Dict[str, Any]) -> str:
+        """Summarize chunks of articles in parallel, then merge the digests"""
+        chunks = self._chunk_articles(topic, news_articles)
+        print(f"🤖 Summarizing {len(news_articles)} articles in {len(chunks)} chunks...")
+        
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(chunks)),
+                                thread_name_prefix='news-summary') as pool:
+            results = list(pool.map(lambda chunk: self._summarize_chunk(topic, chunk), chunks))
+        
+        digests = [digest for digest, _ in results]
+        degraded = not all(ok for _, ok in results)
+        reduce_prompt = (
+            f"{SYSTEM_PROMPT}\n\nTopic: {topic}\n\n"
+            f"The {len(news_articles)} recent news articles were condensed into "
+            f"{len(digests)} partial digests:\n\n"
+            + "\n\n".join(f"Digest {i}:\n{digest}" for i, digest in enumerate(digests, 1))
+        )
+        
+        try:
+            print(f"🤖 Calling Gemini API to merge {len(digests)} digests "
+                  f"(prompt length: {len(reduce_prompt)} characters)")
+            response = self._invoke(reduce_prompt, 'reduce')
+            print(f"✅ Received response from Gemini API")
+            if self.cache and response.content and not degraded:
+                self.cache.set('summary', cache_params, response.content)
+            return response.content
+        except Exception as e:
+            print(f"❌ Error merging summaries: {e}")
+            print("⚠️  Showing the partial digests instead")
+            return self._digests_html(digests)
+    
+    @staticmethod
+    def _digests_html(digests: List[str]) -> str:
+        """
+        Render plain-text partial digests as HTML, for when they cannot be merged
+        
+        Bullet lines become list items and other lines paragraphs; all text
+        is escaped, since digests are model output asked to be plain text.
+        """
+        parts = []
+        for digest in digests:
+            items = []
+            for line in digest.splitlines():
+                line = line.strip()
+                if not line:
+                    continue
+                if line[:2] in ('- ', '* ', '• '):
+                    items.append(f"<li>{html.escape(line[2:].strip())}</li>")
+                    continue
+                if items:
+                    parts.append(f"<ul>{''.join(items)}</ul>")
+                    items = []
+                parts.append(f"<p>{html.escape(line)}</p>")
+            if items:
+                parts.append(f"<ul>{''.join(items)}</ul>")
+        return "\n".join(parts)
+    
+    def _summarize_chunk(self, topic: str, chunk: List[Article]) -> Tuple[str, bool]:
+        """
+        Digest one chunk of articles, reusing a cached digest when possible
+        
+        Returns:
+            The digest and whether it came from the model (False when the
+            chunk's headlines had to stand in for a failed call)
+        """
+        params = dict(self.summary_cache_params(topic, chunk), stage='map')
+        if self.cache:
+            cached = self.cache.get('summary', params)
+            if cached is not None:
+                return cached, True
+        
+        try:
+            response = self._invoke(f"{MAP_PROMPT}\n\n{self._format_articles(topic, chunk)}", 'map')
+            if self.cache and response.content:
+                self.cache.set('summary', params, response.content)
+            return response.content, True
+        except Exception as e:
+            print(f"⚠️  Could not summarize a chunk of {len(chunk)} articles: {e}")
+            headlines = "\n".join(f"- {article.text('title')} ({article.text('source')})" for article in chunk)
+            return headlines, False
@@ -0,0 +1,591 @@
+"""
+Incremental archive manifest and sharded search index of published articles
+"""
+
+import os
+import re
+import json
+import time
+import tempfile
+import threading
+import unicodedata
+from collections import defaultdict
+from typing import List, Dict, Any, Iterator, Optional, Set
+
+from .article import Article, as_articles
+from ..utils.article_store import canonical_link
+
+FORMAT_VERSION = 1
+
+# Too common to narrow a search; skipping them keeps the hottest shards small
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or that the this to was were will with
+""".split())
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Search terms of a text, as the search page derives them from a query
+
+    Accents are stripped and case is folded; only ASCII letters and digits
+    form terms, so scripts without a Latin transliteration are not indexed.
+
+    Args:
+        text: Title, source or snippet
+
+    Returns:
+        Terms of at least two characters, stopwords removed, in text order
+    """
+    folded = unicodedata.normalize('NFKD', text or '')
+    # Every mark (category M), as the search page's /\p{M}/u strips them
+    folded = ''.join(char for char in folded if not unicodedata.category(char).startswith('M')).lower()
+    return [word for word in _WORD.findall(folded) if len(word) > 1 and word not in STOPWORDS]
+
+
+def _write_json(path: str, data: Any) -> None:
+    """Write compact JSON to a temporary file and atomically move it into place"""
+    directory = os.path.dirname(path)
+    fd, temp_path = tempfile.mkstemp(prefix='.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class ArchiveIndex:
+    """
+    Append-only archive of published articles with a client-side search index
+
+    Every run appends its articles to ``manifest.jsonl`` and folds their
+    terms into an inverted index. Articles already archived by an earlier
+    run (same canonical link) are skipped, so overlapping daily results are
+    stored and found once; ``links.txt`` keeps their keys. Article ids are split into segments of
+    ``segment_size`` articles, and each segment's index into shards by the
+    first characters of each term (``terms/<segment>/<prefix>.json``);
+    article records are stored in fixed-size chunks (``records/<n>.json``).
+    A run only rewrites shards of the newest segment and the last chunk,
+    so its cost stays flat however large the archive grows, and the search
+    page reads a query's shards newest segment first, stopping once it has
+    a page of results.
+
+    Postings are sorted article ids stored as gaps. ``meta.json`` is
+    written last and is the commit point: a run interrupted before it is
+    rolled back by the next one, using the shard list recorded up front.
+    """
+
+    def __init__(self, archive_dir: str, prefix_length: int = 2, segment_size: int = 5000,
+                 chunk_size: int = 500, snippet_chars: int = 200):
+        """
+        Args:
+            archive_dir: Directory holding the manifest, index and search page;
+                page links are stored relative to it
+            prefix_length: Term characters selecting a shard
+            segment_size: Articles per index segment (bounds the cost of a run)
+            chunk_size: Article records per chunk file
+            snippet_chars: Snippet characters kept per record
+        """
+        self.archive_dir = archive_dir
+        self.prefix_length = prefix_length
+        self.segment_size = segment_size
+        self.chunk_size = chunk_size
+        self.snippet_chars = snippet_chars
+        self.manifest_path = os.path.join(archive_dir, 'manifest.jsonl')
+        self.meta_path = os.path.join(archive_dir, 'meta.json')
+        self.links_path = os.path.join(archive_dir, 'links.txt')
+        self._lock = threading.Lock()
+        # Keys of links.txt as of its size in bytes, kept between runs of a daemon
+        self._keys: Optional[Set[str]] = None
+        self._keys_bytes = -1
+
+    def _load_meta(self) -> Dict[str, Any]:
+        meta = self._read_json(self.meta_path, None)
+        if not meta:
+            return {
+                'version': FORMAT_VERSION, 'prefix_length': self.prefix_length,
+                'segment_size': self.segment_size, 'chunk_size': self.chunk_size,
+                'docs': 0, 'manifest_bytes': 0, 'links_bytes': 0, 'updated_at': '',
+            }
+        if meta.get('version') != FORMAT_VERSION:
+            raise ValueError(f"unsupported archive index version {meta.get('version')}")
+        # The layout of an existing archive wins over the constructor arguments
+        self.prefix_length = meta['prefix_length']
+        self.segment_size = meta['segment_size']
+        self.chunk_size = meta['chunk_size']
+        return meta
+
+    def _shard_path(self, shard: str) -> str:
+        """Path of a shard named ``<segment>/<prefix>``"""
+        return os.path.join(self.archive_dir, 'terms', f"{shard}.json")
+
+    def _shard_name(self, doc_id: int, term: str) -> str:
+        return f"{doc_id // self.segment_size}/{term[:self.prefix_length]}"
+
+    def _chunk_path(self, chunk: int) -> str:
+        return os.path.join(self.archive_dir, 'records', f"{chunk}.json")
+
+    @staticmethod
+    def _read_json(path: str, default: Any) -> Any:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return default
+
+    @staticmethod
+    def _decode(gaps: List[int]) -> List[int]:
+        ids, total = [], 0
+        for gap in gaps:
+            total += gap
+            ids.append(total)
+        return ids
+
+    @staticmethod
+    def _encode(ids: List[int]) -> List[int]:
+        return [doc_id - previous for doc_id, previous in zip(ids, [0] + ids[:-1])]
+
+    def _rollback(self, meta: Dict[str, Any]) -> None:
+        """Undo a run that stopped before committing ``meta.json``"""
+        pending = meta.pop('pending', None)
+        if not pending:
+            return
+        print(f"🩹 Rolling back an interrupted archive update ({len(pending['shards'])} shards)")
+        for name in pending['shards']:
+            path = self._shard_path(name)
+            shard = self._read_json(path, None)
+            if shard is None:
+                continue
+            kept = {}
+            for term, gaps in shard.items():
+                ids = [doc_id for doc_id in self._decode(gaps) if doc_id < meta['docs']]
+                if ids:
+                    kept[term] = self._encode(ids)
+            _write_json(path, kept)
+        for path, size in ((self.manifest_path, meta['manifest_bytes']),
+                           (self.links_path, meta.get('links_bytes'))):
+            if size is not None and os.path.exists(path):
+                with open(path, 'r+b') as f:
+                    f.truncate(size)
+        _write_json(self.meta_path, meta)
+
+    @staticmethod
+    def _article_key(link: str, title: str) -> str:
+        """Key identifying an article across runs"""
+        return ' '.join((canonical_link(link) or title or '').split())
+
+    def _archived_keys(self, meta: Dict[str, Any]) -> Set[str]:
+        """Keys of the committed articles, rebuilt from the manifest for archives without ``links.txt``"""
+        if 'links_bytes' not in meta:
+            keys = [self._article_key(record['link'], record['title']) for record in self.iter_manifest()]
+            with open(self.links_path, 'w', encoding='utf-8') as f:
+                f.writelines(f"{key}\n" for key in keys)
+                meta['links_bytes'] = f.tell()
+            _write_json(self.meta_path, meta)
+            return set(keys)
+        if self._keys is None or self._keys_bytes != meta['links_bytes']:
+            data = b''
+            if meta['links_bytes']:
+                with open(self.links_path, 'rb') as f:
+                    data = f.read(meta['links_bytes'])
+            self._keys, self._keys_bytes = set(data.decode('utf-8').splitlines()), meta['links_bytes']
+        return self._keys
+
+    def add_run(self, topic: str, page_path: str, news_articles: List[Article],
+                run_at: Optional[float] = None) -> int:
+        """
+        Append a published page's articles to the archive and index them
+
+        Args:
+            topic: Topic of the run
+            page_path: Path of the published page
+            news_articles: Articles shown on the page
+            run_at: Time of the run (default: now)
+
+        Returns:
+            Number of articles added
+        """
+        records = []
+        seen: Set[str] = set()
+        run_date = time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(run_at or time.time()))
+        page = os.path.relpath(os.path.abspath(page_path), os.path.abspath(self.archive_dir))
+        keys = []
+        for article in as_articles(news_articles):
+            key = self._article_key(article.link or '', article.title or '')
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            keys.append(key)
+            snippet = article.snippet or ''
+            if len(snippet) > self.snippet_chars:
+                snippet = snippet[:self.snippet_chars].rsplit(' ', 1)[0] + '…'
+            records.append({
+                'title': article.title or '',
+                'source': article.source or '',
+                'link': article.link or '',
+                'date': article.date or '',
+                'snippet': snippet,
+                'topic': topic,
+                'page': page.replace(os.sep, '/'),
+                'run': run_date,
+            })
+        if not records:
+            return 0
+
+        with self._lock:
+            os.makedirs(os.path.join(self.archive_dir, 'records'), exist_ok=True)
+            meta = self._load_meta()
+            self._rollback(meta)
+
+            archived = self._archived_keys(meta)
+            new = [index for index, key in enumerate(keys) if key not in archived]
+            if len(new) < len(records):
+                print(f"🗃️  Skipping {len(records) - len(new)} articles already in the archive")
+            records, keys = [records[index] for index in new], [keys[index] for index in new]
+            if not records:
+                return 0
+
+            start = meta['docs']
+            postings: Dict[str, Dict[str, List[int]]] = defaultdict(lambda: defaultdict(list))
+            for offset, record in enumerate(records):
+                doc_id = start + offset
+                terms = dict.fromkeys(tokenize(f"{record['title']} {record['source']} {record['snippet']}"))
+                for term in terms:
+                    postings[self._shard_name(doc_id, term)][term].append(doc_id)
+
+            # Record what is about to change so an interrupted run can be undone
+            meta['pending'] = {'from': start, 'shards': sorted(postings)}
+            _write_json(self.meta_path, meta)
+
+            with open(self.manifest_path, 'a', encoding='utf-8') as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+                manifest_bytes = f.tell()
+            with open(self.links_path, 'a', encoding='utf-8') as f:
+                f.writelines(f"{key}\n" for key in keys)
+                links_bytes = f.tell()
+
+            self._write_records(start, records)
+            for name, terms in postings.items():
+                self._merge_shard(name, terms)
+
+            meta.pop('pending')
+            meta['docs'] = start + len(records)
+            meta['manifest_bytes'] = manifest_bytes
+            meta['links_bytes'] = links_bytes
+            archived.update(keys)
+            self._keys, self._keys_bytes = archived, links_bytes
+            meta['updated_at'] = run_date
+            _write_json(self.meta_path, meta)
+            self._write_search_page()
+
+        print(f"🗃️  Archived {len(records)} articles ({meta['docs']} total, {len(postings)} index shards updated)")
+        return len(records)
+
+    def _write_records(self, start: int, records: List[Dict[str, Any]]) -> None:
+        """Append records to their chunk files; only the last chunks are rewritten"""
+        by_chunk: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+        for offset, record in enumerate(records):
+            by_chunk[(start + offset) // self.chunk_size].append(record)
+        for chunk, chunk_records in by_chunk.items():
+            path = self._chunk_path(chunk)
+            # Drop records of an interrupted run that used the same ids
+            existing = self._read_json(path, [])[:max(0, start - chunk * self.chunk_size)]
+            _write_json(path, existing + chunk_records)
+
+    def _merge_shard(self, name: str, terms: Dict[str, List[int]]) -> None:
+        """Append new article ids to the postings of one shard"""
+        path = self._shard_path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        shard = self._read_json(path, {})
+        for term, ids in terms.items():
+            gaps = shard.get(term)
+            shard[term] = gaps + self._encode([sum(gaps)] + ids)[1:] if gaps else self._encode(ids)
+        _write_json(path, shard)
+
+    def _write_search_page(self) -> None:
+        path = os.path.join(self.archive_dir, 'index.html')
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                if f.read() == SEARCH_PAGE:
+                    return
+        except FileNotFoundError:
+            pass
+        fd, temp_path = tempfile.mkstemp(prefix='.', suffix='.tmp', dir=self.archive_dir)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(SEARCH_PAGE)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+
+    def search(self, query: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Search the archive the way the search page does
+
+        Every query term must match, the last one as a prefix so results
+        narrow while typing. Newest articles come first; older segments are
+        only read while fewer than ``limit`` results have been found.
+
+        Args:
+            query: Search text
+            limit: Maximum results
+
+        Returns:
+            Matching article records
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        meta = self._load_meta()
+        if not terms or not meta['docs']:
+            return []
+
+        hits: List[int] = []
+        for segment in range((meta['docs'] - 1) // self.segment_size, -1, -1):
+            matches: Optional[Set[int]] = None
+            for position, term in enumerate(terms):
+                shard = self._read_json(self._shard_path(f"{segment}/{term[:self.prefix_length]}"), {})
+                is_prefix = position == len(terms) - 1
+                ids: Set[int] = set()
+                for indexed_term, gaps in shard.items():
+                    if indexed_term == term or (is_prefix and indexed_term.startswith(term)):
+                        ids.update(self._decode(gaps))
+                matches = ids if matches is None else matches & ids
+                if not matches:
+                    break
+            hits.extend(sorted((doc_id for doc_id in matches or () if doc_id < meta['docs']), reverse=True))
+            if len(hits) >= limit:
+                break
+
+        results, chunks = [], {}
+        for doc_id in hits[:limit]:
+            chunk = doc_id // self.chunk_size
+            if chunk not in chunks:
+                chunks[chunk] = self._read_json(self._chunk_path(chunk), [])
+            results.append(dict(chunks[chunk][doc_id % self.chunk_size], id=doc_id))
+        return results
+
+    def iter_manifest(self) -> Iterator[Dict[str, Any]]:
+        """Committed article records in archive order"""
+        meta = self._load_meta()
+        if not os.path.exists(self.manifest_path):
+            return
+        with open(self.manifest_path, 'rb') as f:
+            data = f.read(meta['manifest_bytes'])
+        for line in data.decode('utf-8').splitlines():
+            if line.strip():
+                yield json.loads(line)
+
+
+SEARCH_PAGE = """\
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>News Archive Search</title>
+    <style>
+body {
+    font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+    line-height: 1.6;
+    margin: 0;
+    padding: 20px;
+    background-color: #f5f5f5;
+}
+.container {
+    max-width: 900px;
+    margin: 0 auto;
+    background-color: white;
+    padding: 30px;
+    border-radius: 10px;
+    box-shadow: 0 0 20px rgba(0,0,0,0.1);
+}
+h1 {
+    color: #2c3e50;
+    text-align: center;
+    border-bottom: 3px solid #3498db;
+    padding-bottom: 10px;
+}
+#query {
+    width: 100%;
+    box-sizing: border-box;
+    padding: 12px;
+    font-size: 1.1em;
+    border: 1px solid #ddd;
+    border-radius: 8px;
+}
+#status {
+    color: #7f8c8d;
+    font-size: 0.9em;
+    margin: 10px 0 20px;
+}
+.result {
+    border-bottom: 1px solid #eee;
+    padding: 12px 0;
+}
+.result a {
+    color: #2c3e50;
+    font-weight: bold;
+    text-decoration: none;
+}
+.result a:hover {
+    color: #3498db;
+}
+.meta {
+    color: #95a5a6;
+    font-size: 0.85em;
+}
+.snippet {
+    color: #34495e;
+}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>🗃️ News Archive</h1>
+        <input id="query" type="search" placeholder="Search titles, sources and snippets" autofocus>
+        <div id="status"></div>
+        <div id="results"></div>
+    </div>
+    <script>
+// Mirrors tokenize() in news_agent/core/archive.py
+const STOPWORDS = new Set('__STOPWORDS__'.split(' '));
+const LIMIT = 50;
+const cache = new Map();
+
+function fetchJson(path) {
+    if (!cache.has(path)) {
+        cache.set(path, fetch(path).then(function(response) {
+            if (response.status === 404) {
+                return null;
+            }
+            if (!response.ok) {
+                throw new Error(path + ': ' + response.status);
+            }
+            return response.json();
+        }));
+    }
+    return cache.get(path);
+}
+
+function tokenize(text) {
+    const words = text.normalize('NFKD').replace(/\\p{M}/gu, '').toLowerCase().match(/[a-z0-9]+/g) || [];
+    return Array.from(new Set(words.filter(function(word) {
+        return word.length > 1 && !STOPWORDS.has(word);
+    })));
+}
+
+function decode(gaps) {
+    let total = 0;
+    return gaps.map(function(gap) {
+        total += gap;
+        return total;
+    });
+}
+
+async function search(query) {
+    const meta = await fetchJson('meta.json');
+    const terms = tokenize(query);
+    if (!meta || !meta.docs || !terms.length) {
+        return {meta: meta, hits: []};
+    }
+    // Newest segment first; older ones are only read until a page is full
+    const ids = [];
+    let segment = Math.floor((meta.docs - 1) / meta.segment_size);
+    for (; segment >= 0 && ids.length < LIMIT; segment--) {
+        const shards = await Promise.all(terms.map(function(term) {
+            return fetchJson('terms/' + segment + '/' + term.slice(0, meta.prefix_length) + '.json');
+        }));
+        let matches = null;
+        for (let position = 0; position < terms.length; position++) {
+            const term = terms[position];
+            const shard = shards[position] || {};
+            const isPrefix = position === terms.length - 1;
+            const found = new Set();
+            for (const indexed in shard) {
+                if (indexed === term || (isPrefix && indexed.startsWith(term))) {
+                    decode(shard[indexed]).forEach(function(id) { found.add(id); });
+                }
+            }
+            matches = matches === null ? found : new Set(Array.from(matches).filter(function(id) { return found.has(id); }));
+            if (!matches.size) {
+                break;
+            }
+        }
+        const segmentIds = Array.from(matches).filter(function(id) { return id < meta.docs; });
+        segmentIds.sort(function(a, b) { return b - a; });
+        ids.push.apply(ids, segmentIds);
+    }
+    const hits = [];
+    for (const id of ids.slice(0, LIMIT)) {
+        const chunk = await fetchJson('records/' + Math.floor(id / meta.chunk_size) + '.json');
+        hits.push(chunk[id % meta.chunk_size]);
+    }
+    return {meta: meta, hits: hits, total: ids.length, more: segment >= 0};
+}
+
+function safeLink(link, fallback) {
+    // Archived links come from search results; only web URLs become hrefs
+    try {
+        const url = new URL(link, location.href);
+        if (url.protocol === 'http:' || url.protocol === 'https:') {
+            return url.href;
+        }
+    } catch (e) {}
+    return fallback;
+}
+
+function render(result) {
+    const results = document.getElementById('results');
+    const status = document.getElementById('status');
+    results.textContent = '';
+    if (!result.meta) {
+        status.textContent = 'The archive is empty.';
+        return;
+    }
+    status.textContent = result.total ? (result.total > LIMIT || result.more ? 'Newest ' + result.hits.length + ' matching articles' : result.total + ' matching articles')
+        : (document.getElementById('query').value.trim() ? 'No matching articles.' : result.meta.docs + ' archived articles');
+    result.hits.forEach(function(hit) {
+        const item = document.createElement('div');
+        item.className = 'result';
+        const title = document.createElement('a');
+        title.href = safeLink(hit.link, hit.page);
+        title.target = '_blank';
+        title.rel = 'noopener';
+        title.textContent = hit.title;
+        const meta = document.createElement('div');
+        meta.className = 'meta';
+        meta.textContent = hit.source + ' · ' + (hit.date || '') + ' · ';
+        const page = document.createElement('a');
+        page.href = hit.page;
+        page.textContent = hit.topic + ', ' + hit.run.slice(0, 10);
+        meta.appendChild(page);
+        const snippet = document.createElement('div');
+        snippet.className = 'snippet';
+        snippet.textContent = hit.snippet;
+        item.append(title, meta, snippet);
+        results.appendChild(item);
+    });
+}
+
+let latest = 0;
+async function update() {
+    const request = ++latest;
+    try {
+        const result = await search(document.getElementById('query').value);
+        if (request === latest) {
+            render(result);
+        }
+    } catch (error) {
+        document.getElementById('status').textContent = 'Search failed: ' + error.message;
+    }
+}
+
+document.getElementById('query').addEventListener('input', update);
+update();
+    </script>
+</body>
+</html>
+""".replace('__STOPWORDS__', ' '.join(sorted(STOPWORDS)))
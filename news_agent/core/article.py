@@ -0,0 +1,201 @@
+"""
+Compact article representation shared by every pipeline stage
+"""
+
+import sys
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+
+# What pages and prompts show for a missing field, and what the dict view
+# returns for it, matching the placeholders earlier versions stored
+PLACEHOLDERS = {
+    'title': 'No title',
+    'link': '',
+    'snippet': 'No description',
+    'date': 'No date',
+    'source': 'Unknown source',
+    'image': '',
+    'thumbnail': '',
+}
+
+
+def _text(value: Any) -> Optional[str]:
+    """A stripped string, or None for missing, empty and non-string values"""
+    if not isinstance(value, str):
+        return None
+    value = value.strip()
+    return value or None
+
+
+class Article:
+    """
+    One news article
+
+    Fields missing from the search result are None rather than placeholder
+    strings; ``text(field)`` supplies the placeholder for display. Source
+    names repeat across thousands of articles in batch and daemon runs, so
+    they are interned. ``__slots__`` keeps an article at a fraction of the
+    size of the dict it replaces.
+
+    For callers written against the earlier dict articles, an Article also
+    behaves like one: ``article['title']``, ``get``, ``in``, ``keys`` and
+    ``items`` see the same keys and placeholder values, and assigning an
+    unknown key keeps it in a side dict.
+    """
+
+    __slots__ = ('title', 'link', 'snippet', 'date', 'source', 'image', 'thumbnail',
+                 'related_sources', '_extra')
+
+    FIELDS = ('title', 'link', 'snippet', 'date', 'source', 'image', 'thumbnail')
+
+    def __init__(self, title: Optional[str] = None, link: Optional[str] = None,
+                 snippet: Optional[str] = None, date: Optional[str] = None,
+                 source: Optional[str] = None, image: Optional[str] = None,
+                 thumbnail: Optional[str] = None,
+                 related_sources: Optional[List[Dict[str, str]]] = None):
+        """
+        Args:
+            title: Headline
+            link: Article URL
+            snippet: Short description
+            date: Publication date as reported by the search (e.g. '3 hours ago')
+            source: Outlet name
+            image: Image URL supplied with the result
+            thumbnail: Thumbnail URL supplied with the result
+            related_sources: Other outlets that ran the same story
+                (dicts with title, source and link), set by deduplication
+        """
+        self.title = title
+        self.link = link
+        self.snippet = snippet
+        self.date = date
+        self.source = sys.intern(source) if source else None
+        self.image = image
+        self.thumbnail = thumbnail
+        self.related_sources = related_sources
+        self._extra: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Article':
+        """
+        Normalize a search result or legacy article dict
+
+        Strings are stripped and empty values and placeholders become None.
+        The image is taken from 'image', 'image_url' or 'media.image',
+        whichever is set, and a source given as an object uses its name.
+        Other keys are kept for the dict view.
+
+        Args:
+            data: SerpAPI news result or article dict
+
+        Returns:
+            The article
+        """
+        source = data.get('source')
+        if isinstance(source, dict):
+            source = source.get('name')
+        media = data.get('media')
+        image = (_text(data.get('image')) or _text(data.get('image_url'))
+                 or (_text(media.get('image')) if isinstance(media, dict) else None))
+
+        values = {field: _text(data.get(field)) for field in ('title', 'link', 'snippet', 'date')}
+        values['source'] = _text(source)
+        for field, value in values.items():
+            if value == PLACEHOLDERS[field]:
+                values[field] = None
+
+        article = cls(image=image, thumbnail=_text(data.get('thumbnail')),
+                      related_sources=data.get('related_sources') or None, **values)
+        for key, value in data.items():
+            if key not in PLACEHOLDERS and key not in ('related_sources', 'image_url', 'media'):
+                article[key] = value
+        return article
+
+    def text(self, field: str) -> str:
+        """A field's value, or its placeholder when missing"""
+        return getattr(self, field) or PLACEHOLDERS[field]
+
+    def copy(self) -> 'Article':
+        """Shallow copy, e.g. to attach related sources without changing the original"""
+        article = Article.__new__(Article)
+        for name in self.__slots__:
+            setattr(article, name, getattr(self, name))
+        if self._extra is not None:
+            article._extra = dict(self._extra)
+        return article
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The article as the dict earlier versions passed around"""
+        return dict(self.items())
+
+    # Dict view for callers written against dict articles
+
+    def keys(self) -> List[str]:
+        keys = list(self.FIELDS)
+        if self.related_sources is not None:
+            keys.append('related_sources')
+        if self._extra:
+            keys.extend(self._extra)
+        return keys
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        return ((key, self[key]) for key in self.keys())
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def __contains__(self, key: object) -> bool:
+        if key in PLACEHOLDERS:
+            return True
+        if key == 'related_sources':
+            return self.related_sources is not None
+        return bool(self._extra) and key in self._extra
+
+    def __getitem__(self, key: str) -> Any:
+        if key in PLACEHOLDERS:
+            return self.text(key)
+        if key == 'related_sources' and self.related_sources is not None:
+            return self.related_sources
+        if self._extra and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key == 'source':
+            self.source = sys.intern(value) if isinstance(value, str) and value else None
+        elif key in PLACEHOLDERS or key == 'related_sources':
+            setattr(self, key, value or None)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Article):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None  # Mutable, like the dicts it replaces
+
+    def __repr__(self) -> str:
+        return f"Article(title={self.title!r}, source={self.source!r}, link={self.link!r})"
+
+
+def as_article(article: Any) -> Article:
+    """An Article for an Article or article dict"""
+    return article if isinstance(article, Article) else Article.from_dict(article)
+
+
+def as_articles(news_articles: Iterable[Any]) -> List[Article]:
+    """Articles for a list of Articles and/or article dicts, in order"""
+    return [as_article(article) for article in news_articles]
@@ -0,0 +1,307 @@
+"""
+Static page assets (stylesheet and script) shared by generated pages
+"""
+
+import os
+import hashlib
+import tempfile
+from typing import List
+
+from ..utils.compression import write_precompressed
+from ..utils.minify import minify_css, minify_js
+
+PAGE_CSS = """\
+body {
+    font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+    line-height: 1.6;
+    margin: 0;
+    padding: 20px;
+    background-color: #f5f5f5;
+}
+.container {
+    max-width: 1200px;
+    margin: 0 auto;
+    background-color: white;
+    padding: 30px;
+    border-radius: 10px;
+    box-shadow: 0 0 20px rgba(0,0,0,0.1);
+}
+h1 {
+    color: #2c3e50;
+    text-align: center;
+    margin-bottom: 30px;
+    border-bottom: 3px solid #3498db;
+    padding-bottom: 10px;
+}
+.timestamp {
+    text-align: center;
+    color: #7f8c8d;
+    font-style: italic;
+    margin-bottom: 30px;
+}
+.summary {
+    background: linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%);
+    padding: 25px;
+    border-radius: 12px;
+    margin-bottom: 30px;
+    border-left: 5px solid #3498db;
+    box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+}
+.summary h2 {
+    color: #2c3e50;
+    margin-top: 0;
+    margin-bottom: 20px;
+    font-size: 1.4em;
+    display: flex;
+    align-items: center;
+}
+.summary h2::before {
+    content: "📊";
+    margin-right: 10px;
+    font-size: 1.2em;
+}
+.summary h3 {
+    color: #2980b9;
+    margin-top: 20px;
+    margin-bottom: 10px;
+    font-size: 1.1em;
+    border-bottom: 2px solid #3498db;
+    padding-bottom: 5px;
+}
+.summary ul {
+    margin: 10px 0;
+    padding-left: 20px;
+}
+.summary li {
+    margin-bottom: 8px;
+    line-height: 1.5;
+}
+.summary strong {
+    color: #2c3e50;
+    font-weight: 600;
+}
+.summary p {
+    margin-bottom: 15px;
+    line-height: 1.6;
+}
+.news-grid {
+    display: grid;
+    grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
+    gap: 20px;
+    margin-top: 30px;
+}
+.news-item {
+    background-color: #fff;
+    border: 1px solid #ddd;
+    border-radius: 8px;
+    padding: 20px;
+    transition: transform 0.2s, box-shadow 0.2s;
+    overflow: hidden;
+}
+.news-item:hover {
+    transform: translateY(-2px);
+    box-shadow: 0 4px 12px rgba(0,0,0,0.15);
+}
+.news-image {
+    width: 100%;
+    height: 250px;
+    object-fit: cover;
+    border-radius: 8px;
+    margin-bottom: 15px;
+    background-color: #f8f9fa;
+    /* Faded in by the page script once loaded */
+    opacity: 0;
+    transition: transform 0.3s ease, opacity 0.3s ease;
+    /* Image quality improvements */
+    -webkit-backface-visibility: hidden;
+    backface-visibility: hidden;
+    -webkit-transform: translateZ(0);
+    transform: translateZ(0);
+}
+.news-image:hover {
+    transform: scale(1.02);
+}
+.news-image-placeholder {
+    width: 100%;
+    height: 200px;
+    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+    border-radius: 6px;
+    margin-bottom: 15px;
+    display: flex;
+    align-items: center;
+    justify-content: center;
+    color: white;
+    font-size: 1.2em;
+    font-weight: bold;
+}
+.news-title {
+    color: #2c3e50;
+    font-size: 1.1em;
+    font-weight: bold;
+    margin-bottom: 10px;
+}
+.news-title a {
+    color: #2c3e50;
+    text-decoration: none;
+}
+.news-title a:hover {
+    color: #3498db;
+}
+.news-source {
+    color: #7f8c8d;
+    font-size: 0.9em;
+    margin-bottom: 8px;
+}
+.news-date {
+    color: #95a5a6;
+    font-size: 0.8em;
+    margin-bottom: 10px;
+}
+.news-related {
+    color: #7f8c8d;
+    font-size: 0.8em;
+    margin-bottom: 10px;
+}
+.news-related a {
+    color: #3498db;
+}
+.news-snippet {
+    color: #34495e;
+    line-height: 1.5;
+}
+.no-news {
+    text-align: center;
+    color: #7f8c8d;
+    font-style: italic;
+    padding: 40px;
+}
+"""
+
+PAGE_JS = """\
+// Image loading and fallback. load and error do not bubble, so they are
+// caught on the document in the capture phase: one pair of listeners covers
+// every image, including those added later.
+(function() {
+    function isNewsImage(target) {
+        return target.classList && target.classList.contains('news-image');
+    }
+
+    function showImage(img) {
+        img.style.opacity = '1';
+    }
+
+    function showPlaceholder(img) {
+        img.style.display = 'none';
+        const placeholder = img.nextElementSibling;
+        if (placeholder && placeholder.classList.contains('news-image-placeholder')) {
+            placeholder.style.display = 'flex';
+        }
+    }
+
+    document.addEventListener('load', function(event) {
+        if (isNewsImage(event.target)) {
+            showImage(event.target);
+        }
+    }, true);
+
+    document.addEventListener('error', function(event) {
+        if (isNewsImage(event.target)) {
+            showPlaceholder(event.target);
+        }
+    }, true);
+
+    // Images that finished before the listeners existed (deferred script)
+    document.addEventListener('DOMContentLoaded', function() {
+        document.querySelectorAll('.news-image').forEach(function(img) {
+            if (img.complete) {
+                if (img.naturalWidth) {
+                    showImage(img);
+                } else {
+                    showPlaceholder(img);
+                }
+            }
+        });
+    });
+})();
+"""
+
+
+def asset_filename(stem: str, ext: str, content: str) -> str:
+    """
+    Content-hashed asset file name, e.g. ``styles.3f2a9c1b0d.css``
+    
+    The name changes whenever the content does, so the files can be cached
+    by browsers indefinitely.
+    """
+    digest = hashlib.sha256(content.encode('utf-8')).hexdigest()[:10]
+    return f"{stem}.{digest}.{ext}"
+
+
+STYLES_FILENAME = asset_filename('styles', 'css', PAGE_CSS)
+SCRIPT_FILENAME = asset_filename('app', 'js', PAGE_JS)
+
+# Minified copies used by pages written in minify mode
+MIN_PAGE_CSS = minify_css(PAGE_CSS)
+MIN_PAGE_JS = minify_js(PAGE_JS)
+MIN_STYLES_FILENAME = asset_filename('styles', 'css', MIN_PAGE_CSS)
+MIN_SCRIPT_FILENAME = asset_filename('app', 'js', MIN_PAGE_JS)
+
+# Every asset file name a generated page can reference
+ASSET_FILENAMES = (STYLES_FILENAME, SCRIPT_FILENAME, MIN_STYLES_FILENAME, MIN_SCRIPT_FILENAME)
+
+
+def inline_assets_html(minified: bool = False) -> str:
+    """``<style>``/``<script>`` block embedding the assets in the page"""
+    if minified:
+        return f"<style>{MIN_PAGE_CSS}</style><script>{MIN_PAGE_JS}</script>"
+    return f"""    <style>
+{PAGE_CSS}    </style>
+    <script>
+{PAGE_JS}    </script>"""
+
+
+def linked_assets_html(minified: bool = False) -> str:
+    """``<link>``/``<script src>`` tags referencing the shared asset files"""
+    if minified:
+        return f'<link rel="stylesheet" href="{MIN_STYLES_FILENAME}"><script src="{MIN_SCRIPT_FILENAME}" defer></script>'
+    return f"""    <link rel="stylesheet" href="{STYLES_FILENAME}">
+    <script src="{SCRIPT_FILENAME}" defer></script>"""
+
+
+def write_assets(output_dir: str, minified: bool = False, precompress: bool = False) -> List[str]:
+    """
+    Write the shared asset files into a directory unless already present
+    
+    Args:
+        output_dir: Directory the pages referencing the assets are saved in
+        minified: Write the minified copies
+        precompress: Also write ``.gz``/``.br`` siblings for static hosts
+        
+    Returns:
+        Paths of the asset files
+    """
+    if minified:
+        assets = ((MIN_STYLES_FILENAME, MIN_PAGE_CSS), (MIN_SCRIPT_FILENAME, MIN_PAGE_JS))
+    else:
+        assets = ((STYLES_FILENAME, PAGE_CSS), (SCRIPT_FILENAME, PAGE_JS))
+    
+    paths = []
+    for filename, content in assets:
+        path = os.path.join(output_dir, filename)
+        paths.append(path)
+        if not os.path.exists(path):
+            os.makedirs(output_dir, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(prefix='.', suffix='.tmp', dir=output_dir)
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write(content)
+                os.chmod(temp_path, 0o644)
+                os.replace(temp_path, path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+        # The names are content hashes, so existing siblings are current
+        if precompress and not os.path.exists(path + '.gz'):
+            write_precompressed(path)
+    return paths
@@ -0,0 +1,195 @@
+"""
+Near-duplicate story detection for the News Agent
+"""
+
+import re
+import random
+import hashlib
+from collections import defaultdict
+from typing import List, Dict, FrozenSet, Tuple
+
+from .article import Article, as_articles
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def shingles(text: str, size: int = 2) -> FrozenSet[int]:
+    """
+    Hash the overlapping word n-grams of a text
+
+    Args:
+        text: Text to shingle; case and punctuation are ignored
+        size: Words per shingle
+
+    Returns:
+        Set of 64-bit shingle hashes (a single shingle for shorter texts)
+    """
+    words = _WORD.findall(text.lower())
+    if len(words) <= size:
+        grams = [' '.join(words)] if words else []
+    else:
+        grams = [' '.join(words[i:i + size]) for i in range(len(words) - size + 1)]
+    return frozenset(
+        int.from_bytes(hashlib.blake2b(gram.encode(), digest_size=8).digest(), 'little')
+        for gram in grams
+    )
+
+
+def jaccard(a: FrozenSet[int], b: FrozenSet[int]) -> float:
+    """Jaccard similarity of two shingle sets"""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def lsh_params(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """
+    Pick the LSH banding for a similarity threshold
+
+    Chooses the bands x rows split of the signature whose S-curve midpoint
+    (1/bands)^(1/rows) sits just below the threshold, favouring recall;
+    candidate pairs are verified exactly afterwards.
+
+    Args:
+        num_perm: Signature length
+        threshold: Jaccard similarity at which stories count as duplicates
+
+    Returns:
+        (bands, rows) with bands * rows == num_perm
+    """
+    target = threshold * 0.85
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        if (1 / bands) ** (1 / rows) <= target:
+            best = (bands, rows)
+    return best
+
+
+class StoryDeduplicator:
+    """
+    Clusters syndicated copies of the same story with MinHash and LSH
+
+    Each article's title and snippet are shingled into word n-grams and
+    summarized by a MinHash signature. Signatures are split into bands and
+    only articles sharing a band bucket are compared, so the stage stays
+    sub-quadratic; candidate pairs are confirmed with the exact Jaccard
+    similarity of their shingles.
+    """
+
+    def __init__(self, threshold: float = 0.5, num_perm: int = 32, shingle_size: int = 2,
+                 seed: int = 1):
+        """
+        Args:
+            threshold: Jaccard similarity of title+snippet shingles above which
+                two articles are the same story
+            num_perm: MinHash signature length (more is slower but more precise)
+            shingle_size: Words per shingle
+            seed: Seed of the hash permutations
+        """
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be in (0, 1]")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows = lsh_params(num_perm, threshold)
+        # Shingle hashes are already uniformly mixed, so XOR with a random
+        # mask is enough to derive each permutation and runs at C speed
+        rng = random.Random(seed)
+        self._masks = [rng.getrandbits(64) for _ in range(num_perm)]
+
+    def signature(self, shingle_set: FrozenSet[int]) -> Tuple[int, ...]:
+        """MinHash signature of a shingle set"""
+        if not shingle_set:
+            return ()
+        return tuple(min(map(mask.__xor__, shingle_set)) for mask in self._masks)
+
+    def clusters(self, news_articles: List[Article]) -> List[List[int]]:
+        """
+        Group near-duplicate articles
+
+        Args:
+            news_articles: Articles with 'title' and 'snippet'
+
+        Returns:
+            Clusters of article indexes, each sorted, ordered by their first index
+        """
+        shingle_sets = [
+            shingles(f"{article.title or ''} {article.snippet or ''}", self.shingle_size)
+            for article in as_articles(news_articles)
+        ]
+
+        buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = defaultdict(list)
+        for index, shingle_set in enumerate(shingle_sets):
+            signature = self.signature(shingle_set)
+            if not signature:
+                continue
+            for band in range(self.bands):
+                start = band * self.rows
+                buckets[(band, signature[start:start + self.rows])].append(index)
+
+        parent = list(range(len(news_articles)))
+
+        def find(index: int) -> int:
+            while parent[index] != index:
+                parent[index] = parent[parent[index]]
+                index = parent[index]
+            return index
+
+        checked = set()
+        for members in buckets.values():
+            for position, first in enumerate(members):
+                for second in members[position + 1:]:
+                    if (first, second) in checked:
+                        continue
+                    checked.add((first, second))
+                    root_first, root_second = find(first), find(second)
+                    if root_first == root_second:
+                        continue
+                    if jaccard(shingle_sets[first], shingle_sets[second]) >= self.threshold:
+                        parent[max(root_first, root_second)] = min(root_first, root_second)
+
+        groups: Dict[int, List[int]] = defaultdict(list)
+        for index in range(len(news_articles)):
+            groups[find(index)].append(index)
+        return sorted(groups.values(), key=lambda members: members[0])
+
+    def dedupe(self, news_articles: List[Article]) -> List[Article]:
+        """
+        Keep one representative per story
+
+        The highest-ranked article of each cluster is kept; the others are
+        listed in its 'related_sources' (title, source, link) so the page can
+        still credit them.
+
+        Args:
+            news_articles: Articles in search ranking order
+
+        Returns:
+            Representatives in their original order
+        """
+        if len(news_articles) < 2:
+            return news_articles
+
+        news_articles = as_articles(news_articles)
+        representatives = []
+        for members in self.clusters(news_articles):
+            article = news_articles[members[0]]
+            if len(members) > 1:
+                article = article.copy()
+                article.related_sources = [
+                    {
+                        'title': news_articles[index].title or '',
+                        'source': news_articles[index].source or '',
+                        'link': news_articles[index].link or '',
+                    }
+                    for index in members[1:]
+                ]
+            representatives.append(article)
+
+        merged = len(news_articles) - len(representatives)
+        if merged:
+            print(f"🧬 Merged {merged} near-duplicate articles into {len(representatives)} stories")
+        return representatives
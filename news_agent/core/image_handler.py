@@ -3,26 +3,58 @@ Image handling functionality for the News Agent
 """
 
 import os
-import hashlib
-import requests
-import mimetypes
-import time
-from urllib.parse import urlparse
-from typing import Dict, Any, Optional
+import itertools
+from contextlib import nullcontext
+from typing import List, Callable, Iterable, Iterator, Optional, Tuple
+
+from .article import Article, as_article
+from ..utils.concurrency import ByteBudget, HostLimiter
+from ..utils.response_cache import ResponseCache
+from ..utils.image_store import ImageStore
+from ..utils.http import HttpClient
+from ..utils.image_probe import EXTENSIONS, probe_dimensions, sniff_format
+from ..utils.metrics import Metrics
+
+
+class ImageRejected(Exception):
+    """Raised when a fetched image is unusable (not an image, too small)"""
 
 
 class ImageHandler:
     """Handles image search, download, and management"""
     
-    def __init__(self, serpapi_key: str, download_images: bool = True, high_res_images: bool = True):
+    # Header bytes read to identify an image before downloading the rest
+    PROBE_BYTES = 64 * 1024
+    # Content types some origins use for images; the body is sniffed anyway
+    GENERIC_CONTENT_TYPES = frozenset({'application/octet-stream', 'binary/octet-stream'})
+    
+    def __init__(self, serpapi_key: str, download_images: bool = True, high_res_images: bool = True,
+                 host_limiter: Optional[HostLimiter] = None, cache: Optional[ResponseCache] = None,
+                 image_store: Optional[ImageStore] = None, http: Optional[HttpClient] = None,
+                 min_width: int = 0, min_height: int = 0, max_candidates: int = 5,
+                 max_image_bytes: int = 10 * 1024 * 1024,
+                 serpapi_url: str = 'https://serpapi.com/search', metrics: Optional[Metrics] = None):
         self.serpapi_key = serpapi_key
         self.download_images = download_images
         self.high_res_images = high_res_images
-        self.images_dir = os.path.join(os.getcwd(), 'news_images')
+        self.host_limiter = host_limiter
+        self.cache = cache
+        self.http = http or HttpClient()
+        self.min_width = min_width
+        self.min_height = min_height
+        self.max_candidates = max(1, max_candidates)
+        self.max_image_bytes = max_image_bytes
+        self.serpapi_url = serpapi_url
+        self.metrics = metrics or Metrics(enabled=False)
+        self.images_dir = image_store.images_dir if image_store else os.path.join(os.getcwd(), 'news_images')
+        self.image_store = image_store
         
-        # Create images directory if it doesn't exist
-        if self.download_images:
-            os.makedirs(self.images_dir, exist_ok=True)
+        # Create the image store (and its directory) if it doesn't exist
+        if self.download_images and self.image_store is None:
+            self.image_store = ImageStore(
+                self.images_dir,
+                os.path.join(os.getcwd(), '.news_agent_cache', 'images.sqlite')
+            )
     
     def search_high_res_image(self, title: str, source: str) -> str:
         """
@@ -35,6 +67,21 @@ class ImageHandler:
         Returns:
             High resolution image URL or empty string
         """
+        candidates = self.search_high_res_images(title, source)
+        return candidates[0] if candidates else ''
+    
+    def search_high_res_images(self, title: str, source: str) -> List[str]:
+        """
+        Search for high resolution image candidates for an article
+        
+        Args:
+            title: Article title
+            source: News source
+            
+        Returns:
+            Up to ``max_candidates`` image URLs in ranking order, skipping
+            results whose reported size is below the minimum resolution
+        """
         try:
             # Create search query for images
             search_query = f"{title} {source}"
@@ -51,25 +98,38 @@ class ImageHandler:
                 'ijn': 0  # First page
             }
             
-            response = requests.get('https://serpapi.com/search', params=params)
-            response.raise_for_status()
+            with self.metrics.span('image.search'):
+                data = self.cache.get('images', params) if self.cache else None
+                if data is None:
+                    response = self.http.get(self.serpapi_url, params=params)
+                    response.raise_for_status()
+                    
+                    data = response.json()
+                    if self.cache and 'error' not in data:
+                        self.cache.set('images', params, data)
             
-            data = response.json()
             images = data.get('images_results', [])
             
-            # Look for high resolution images (prefer larger images)
+            # Keep results that are large enough; sizes reported by the search
+            # are checked here, the rest are probed when downloaded
+            candidates = []
             for img in images:
                 img_url = img.get('original', '') or img.get('link', '')
-                if img_url and isinstance(img_url, str) and img_url.startswith('http'):
-                    # Check if image seems to be high resolution (not a small thumbnail)
-                    if not any(size in img_url.lower() for size in ['92x92', '64x64', '48x48', '32x32']):
-                        return img_url
+                if not (img_url and isinstance(img_url, str) and img_url.startswith('http')):
+                    continue
+                width = img.get('original_width') or 0
+                height = img.get('original_height') or 0
+                if width and height and not self._large_enough(width, height):
+                    continue
+                candidates.append(img_url)
+                if len(candidates) >= self.max_candidates:
+                    break
             
-            return ''
+            return candidates
             
         except Exception as e:
             print(f"⚠️  Could not search for high-res image: {e}")
-            return ''
+            return []
     
     def download_image(self, image_url: str, article_title: str) -> str:
         """
@@ -77,126 +137,257 @@ class ImageHandler:
         
         Args:
             image_url: URL of the image to download
-            article_title: Title of the article (for filename)
+            article_title: Title of the article (for logging)
             
         Returns:
-            Local path to the downloaded image or empty string if failed
+            Local path to the downloaded image, or the original URL if the
+            download failed or the image was rejected
         """
         if not self.download_images:
             return image_url
         
         try:
-            # Create a safe filename from the article title
-            safe_title = "".join(c for c in article_title if c.isalnum() or c in (' ', '-', '_')).rstrip()
-            safe_title = safe_title[:50]  # Limit length
-            
-            # Get file extension from URL
-            parsed_url = urlparse(image_url)
-            path = parsed_url.path
-            ext = os.path.splitext(path)[1]
-            
-            # If no extension, try to determine from content type
-            if not ext:
-                try:
-                    response = requests.head(image_url, timeout=5)
-                    content_type = response.headers.get('content-type', '')
-                    ext = mimetypes.guess_extension(content_type) or '.jpg'
-                except:
-                    ext = '.jpg'
-            
-            # Create unique filename
-            url_hash = hashlib.md5(image_url.encode()).hexdigest()[:8]
-            filename = f"{safe_title}_{url_hash}{ext}"
-            local_path = os.path.join(self.images_dir, filename)
-            
-            # Download the image
-            print(f"📥 Downloading image: {filename}")
-            response = requests.get(image_url, timeout=10, stream=True)
-            response.raise_for_status()
-            
-            # Save the image
-            with open(local_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
-            
-            print(f"✅ Image saved: {filename}")
-            return local_path
-            
+            return self.fetch_image(image_url, article_title)
+        except ImageRejected as e:
+            print(f"⚠️  Skipping image: {e}")
+            return image_url
         except Exception as e:
             print(f"❌ Failed to download image: {e}")
             return image_url  # Return original URL as fallback
     
-    def get_best_image_url(self, article: Dict[str, Any]) -> str:
+    def fetch_image(self, image_url: str, article_title: str = '',
+                    budget: Optional[ByteBudget] = None) -> str:
+        """
+        Fetch an image into the store in a single request
+        
+        The format is sniffed from the first body bytes and the pixel size
+        read from the header before the rest of the body is transferred, so
+        non-images and thumbnails are abandoned early. The body is streamed
+        into a temporary file and aborted once it exceeds the byte limits.
+        
+        Args:
+            image_url: URL of the image to download
+            article_title: Title of the article (for logging)
+            budget: Bytes this run may still download, shared across workers
+            
+        Returns:
+            Local path to the stored image
+            
+        Raises:
+            ImageRejected: The response is not an image, is too small or too
+                large, or was truncated
+            requests.exceptions.RequestException: The download failed
+        """
+        # Download the image, holding a per-host slot so one slow origin
+        # cannot occupy every worker. Images already in the store are
+        # revalidated with the origin instead of fetched again.
+        with self.metrics.span('image.fetch'), self._host_slot(image_url):
+            headers = self.image_store.conditional_headers(image_url)
+            response = self.http.get(image_url, stream=True, headers=headers)
+            
+            if response.status_code == 304:
+                response.close()
+                local_path = self.image_store.revalidated(image_url)
+                if local_path:
+                    print(f"♻️  Image unchanged: {os.path.basename(local_path)}")
+                    self.metrics.incr('images', outcome='revalidated')
+                    return local_path
+                # Stored copy vanished since the lookup, fetch it again
+                response = self.http.get(image_url, stream=True)
+            
+            try:
+                response.raise_for_status()
+                
+                # Refuse obvious non-images and oversized files before reading
+                content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+                if content_type and not (content_type.startswith('image/')
+                                         or content_type in self.GENERIC_CONTENT_TYPES):
+                    raise ImageRejected(f"content type {content_type} is not an image: {image_url[:80]}")
+                expected = self._content_length(response)
+                if expected is not None and expected > self.max_image_bytes:
+                    raise ImageRejected(f"{expected} bytes exceeds the per-image limit: {image_url[:80]}")
+                if expected is not None and budget is not None and expected > budget.remaining():
+                    raise ImageRejected(f"download budget for this run is exhausted: {image_url[:80]}")
+                
+                # Read just enough of the body to identify the image
+                chunks = self._capped(self.http.iter_content(response), expected, budget, image_url)
+                head = bytearray()
+                probe_at = 0
+                for chunk in chunks:
+                    head += chunk
+                    if len(head) >= self.PROBE_BYTES:
+                        break
+                    # Probing parses the whole head again, so only once it has doubled
+                    if len(head) >= probe_at:
+                        if probe_dimensions(head):
+                            break
+                        probe_at = 2 * len(head)
+                head = bytes(head)
+
+                image_format = sniff_format(head)
+                if not image_format:
+                    raise ImageRejected(f"not a supported image: {image_url[:80]}")
+                size = probe_dimensions(head)
+                if size and not self._large_enough(*size):
+                    raise ImageRejected(f"{size[0]}x{size[1]} is below the minimum resolution: {image_url[:80]}")
+                
+                print(f"📥 Downloading image: {article_title[:50]}")
+                local_path = self.image_store.save(
+                    image_url,
+                    itertools.chain([head], chunks),
+                    EXTENSIONS[image_format],
+                    etag=response.headers.get('ETag', ''),
+                    last_modified=response.headers.get('Last-Modified', '')
+                )
+            finally:
+                response.close()
+        
+        print(f"✅ Image saved: {os.path.basename(local_path)}")
+        self.metrics.incr('images', outcome='stored')
+        return local_path
+    
+    @staticmethod
+    def _content_length(response) -> Optional[int]:
+        """Declared body size, if the body is sent unencoded"""
+        if response.headers.get('Content-Encoding', 'identity').lower() != 'identity':
+            return None
+        try:
+            return int(response.headers['Content-Length'])
+        except (KeyError, ValueError):
+            return None
+    
+    def _capped(self, chunks: Iterable[bytes], expected: Optional[int],
+                budget: Optional[ByteBudget], image_url: str) -> Iterator[bytes]:
+        """
+        Pass body chunks through while enforcing the byte limits
+        
+        Raises ImageRejected as soon as the image exceeds the per-image limit
+        or the run budget, or when the body ends short of its Content-Length.
+        """
+        received = 0
+        for chunk in chunks:
+            received += len(chunk)
+            if received > self.max_image_bytes:
+                raise ImageRejected(f"more than {self.max_image_bytes} bytes, download aborted: {image_url[:80]}")
+            if budget is not None and not budget.consume(len(chunk)):
+                raise ImageRejected(f"download budget for this run is exhausted: {image_url[:80]}")
+            yield chunk
+        if expected is not None and received < expected:
+            raise ImageRejected(f"truncated body ({received} of {expected} bytes): {image_url[:80]}")
+    
+    def _large_enough(self, width: int, height: int) -> bool:
+        return width >= self.min_width and height >= self.min_height
+    
+    def _host_slot(self, url: str):
+        """Per-host concurrency slot for requests to an image origin"""
+        if self.host_limiter is None:
+            return nullcontext()
+        return self.host_limiter.slot(url)
+    
+    def get_best_image_url(self, article: Article) -> str:
         """
         Get the best quality image URL from available sources
         
         Args:
-            article: News article dictionary
+            article: News article (an article dict is accepted too)
             
         Returns:
-            Best available image URL
+            Best available image URL (a local path when downloading)
+        """
+        return self.resolve_image(article)[1]
+    
+    def resolve_image(self, article: Article, known_url: str = '',
+                      budget: Optional[ByteBudget] = None) -> Tuple[str, str]:
+        """
+        Pick the article's image, moving on to the next candidate when one is rejected
+        
+        Args:
+            article: News article (an article dict is accepted too)
+            known_url: Image URL chosen by an earlier run, tried before searching
+            budget: Bytes the run may still download (see fetch_image)
+            
+        Returns:
+            (remote image URL, image to show), where the image to show is the
+            local path when downloading; ('', '') if there is no usable image
+        """
+        article = as_article(article)
+        candidates = [known_url] if known_url else self.image_candidates(article)
+        if not self.download_images:
+            image_url = candidates[0] if candidates else ''
+            return image_url, image_url
+        
+        fallback = ''
+        for image_url in candidates:
+            try:
+                return image_url, self.fetch_image(image_url, article.title or '', budget)
+            except ImageRejected as e:
+                print(f"⚠️  Skipping image: {e}")
+                self.metrics.incr('images', outcome='rejected')
+            except Exception as e:
+                print(f"❌ Failed to download image: {e}")
+                self.metrics.incr('images', outcome='failed')
+                # Link to the remote image rather than showing none
+                fallback = fallback or image_url
+        
+        if known_url and not fallback:
+            # The remembered image is no longer usable, search again
+            return self.resolve_image(article, budget=budget)
+        return fallback, fallback
+    
+    def image_candidates(self, article: Article) -> List[str]:
+        """
+        Candidate image URLs for an article, best first
+        
+        Args:
+            article: News article (an article dict is accepted too)
+            
+        Returns:
+            High-res search results followed by the article's own images
         """
         # First try to get high resolution image from image search
-        title = article.get('title', '')
-        source = article.get('source', '')
+        article = as_article(article)
+        title = article.title or ''
+        source = article.source or ''
         
-        # Get the best image URL (high-res or fallback)
-        image_url = ''
+        candidates = []
         
         if title and source and self.high_res_images:
             print(f"🔍 Searching for high-res image: {title[:50]}...")
-            high_res_image = self.search_high_res_image(title, source)
-            if high_res_image:
-                print(f"✅ Found high-res image: {high_res_image[:80]}...")
-                image_url = high_res_image
+            candidates = self.search_high_res_images(title, source)
+            if candidates:
+                print(f"✅ Found {len(candidates)} high-res candidates: {candidates[0][:80]}...")
             else:
                 print(f"⚠️  No high-res image found, using fallback")
         
-        # Fallback to original sources if no high-res image found
-        if not image_url:
-            image_sources = [
-                article.get('image', ''),
-                article.get('thumbnail', ''),
-                article.get('image_url', ''),
-                article.get('media', {}).get('image', '') if isinstance(article.get('media'), dict) else ''
-            ]
-            
-            # Filter out empty strings and return the first valid URL
-            for url in image_sources:
-                if url and isinstance(url, str) and url.startswith('http'):
-                    image_url = url
-                    break
-        
-        # Download the image locally if we have a URL and download is enabled
-        if image_url and self.download_images:
-            return self.download_image(image_url, title)
+        # Fallback to the article's original images ('image_url' and
+        # 'media.image' are folded into 'image' when the article is built)
+        for url in (article.image, article.thumbnail):
+            if url and url.startswith('http') and url not in candidates:
+                candidates.append(url)
         
-        return image_url
+        return candidates
     
-    def cleanup_old_images(self, keep_days: int = 7):
+    def cleanup_old_images(self, keep_days: int = 7, max_bytes: Optional[int] = None,
+                           on_evict: Optional[Callable[[str], None]] = None):
         """
         Clean up old images to save disk space
         
+        Images referenced by a page that still exists are always kept; the
+        others are evicted least recently used first once they have not been
+        used for ``keep_days`` or the store exceeds ``max_bytes``.
+        
         Args:
-            keep_days: Number of days to keep images
+            keep_days: Number of days to keep unreferenced images
+            max_bytes: Disk quota of the image store (no quota if None)
+            on_evict: Called with the path of every removed image
         """
-        if not os.path.exists(self.images_dir):
+        if self.image_store is None:
             return
         
-        current_time = time.time()
-        cutoff_time = current_time - (keep_days * 24 * 60 * 60)
-        
-        cleaned_count = 0
-        for filename in os.listdir(self.images_dir):
-            file_path = os.path.join(self.images_dir, filename)
-            if os.path.isfile(file_path):
-                file_time = os.path.getmtime(file_path)
-                if file_time < cutoff_time:
-                    try:
-                        os.remove(file_path)
-                        cleaned_count += 1
-                    except Exception as e:
-                        print(f"⚠️  Could not remove old image {filename}: {e}")
-        
-        if cleaned_count > 0:
-            print(f"🧹 Cleaned up {cleaned_count} old images")
+        evicted = self.image_store.evict(
+            max_bytes=max_bytes,
+            max_age=keep_days * 24 * 60 * 60,
+            on_evict=on_evict
+        )
+        if evicted:
+            print(f"🧹 Cleaned up {len(evicted)} old images")
@@ -0,0 +1,143 @@
+"""
+Concurrent image resolution stage for the News Agent
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Optional, Tuple
+
+from .article import Article, as_articles
+from .image_handler import ImageHandler
+from ..utils.article_store import ArticleStore, canonical_link
+from ..utils.concurrency import ByteBudget
+
+
+class ImagePipeline:
+    """Resolves the best image for every article on a bounded worker pool"""
+
+    def __init__(self, image_handler: ImageHandler, max_workers: int = 8,
+                 article_store: Optional[ArticleStore] = None, max_run_bytes: Optional[int] = None,
+                 retry_hours: float = 6):
+        """
+        Args:
+            image_handler: Handler used to search and download images
+            max_workers: Articles resolved concurrently
+            article_store: History used to skip articles seen by earlier runs
+            max_run_bytes: Total image bytes one resolve() call may download
+            retry_hours: Hours before an article whose search found no image
+                (or failed) is searched again
+        """
+        self.image_handler = image_handler
+        self.max_workers = max(1, max_workers)
+        self.article_store = article_store
+        self.max_run_bytes = max_run_bytes
+        self.retry_seconds = retry_hours * 3600
+
+    def resolve(self, news_articles: List[Article]) -> List[str]:
+        """
+        Resolve (and optionally download) the image of each article
+
+        Articles already present in the article store reuse their stored
+        image; only new articles go through image search and download.
+        Articles whose search found no image are recorded too and not
+        searched again until their retry time has passed.
+
+        Args:
+            news_articles: List of news articles
+
+        Returns:
+            Image URL or local path per article, in article order ('' if none)
+        """
+        if not news_articles:
+            return []
+
+        news_articles = as_articles(news_articles)
+        links = [canonical_link(article.link or '') for article in news_articles]
+        known = self.article_store.get_many(links) if self.article_store else {}
+        now = time.time()
+
+        resolved = [''] * len(news_articles)
+        image_urls = [''] * len(news_articles)
+        pending: Dict[int, str] = {}
+        failed = set()
+        for index, link in enumerate(links):
+            entry = known.get(link)
+            reused = self._reuse(entry, now) if entry else None
+            if reused is None:
+                # Known articles whose local copy is gone skip the search
+                pending[index] = entry['image_url'] if entry else ''
+            else:
+                resolved[index] = reused
+                image_urls[index] = entry['image_url']
+
+        if len(pending) < len(news_articles):
+            waiting = sum(1 for index, image in enumerate(resolved) if not image and index not in pending)
+            print(f"♻️  Reusing stored images for {len(news_articles) - len(pending)} known articles"
+                  + (f" ({waiting} without an image until their retry time)" if waiting else ""))
+
+        if pending:
+            budget = ByteBudget(self.max_run_bytes) if self.max_run_bytes else None
+            workers = min(self.max_workers, len(pending))
+            print(f"🖼️  Resolving images for {len(pending)} articles ({workers} workers)...")
+
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='news-image') as pool:
+                futures = {
+                    pool.submit(self._resolve_one, news_articles[index], known_url, budget): index
+                    for index, known_url in pending.items()
+                }
+                for future in as_completed(futures):
+                    index = futures[future]
+                    result = future.result()
+                    if result is None:
+                        failed.add(index)
+                    else:
+                        image_urls[index], resolved[index] = result
+
+        if self.article_store:
+            records = []
+            for index, (article, link, image_url, image) in enumerate(zip(news_articles, links, image_urls, resolved)):
+                data = {
+                    'title': article.title or '',
+                    'source': article.source or '',
+                    'date': article.date or '',
+                }
+                if index in failed:
+                    # Keep a known URL so the next run retries only the download
+                    image_url = pending[index]
+                if not image_url:
+                    # A search that found nothing may have been rate limited,
+                    # so it is retried, but not on every run
+                    entry = known.get(link)
+                    data['retry_after'] = (now + self.retry_seconds if index in pending
+                                           else entry['data'].get('retry_after', 0))
+                records.append({
+                    'link': link,
+                    'image_url': image_url,
+                    'image_path': image if image and image != image_url else '',
+                    'data': data,
+                })
+            self.article_store.record_many(records)
+
+        found = sum(1 for image in resolved if image)
+        print(f"✅ Resolved {found}/{len(news_articles)} images")
+        return resolved
+
+    def _reuse(self, entry: Dict[str, Any], now: float) -> Optional[str]:
+        """Image to use for a known article ('' for none yet), or None if it must be fetched again"""
+        if not entry['image_url']:
+            return '' if entry['data'].get('retry_after', 0) > now else None
+        if not self.image_handler.download_images:
+            return entry['image_url']
+        if entry['image_path'] and os.path.isfile(entry['image_path']):
+            return entry['image_path']
+        return None
+
+    def _resolve_one(self, article: Article, known_url: str = '',
+                     budget: Optional[ByteBudget] = None) -> Optional[Tuple[str, str]]:
+        """Find and download one article's image, returning (remote URL, image) or None on error"""
+        try:
+            return self.image_handler.resolve_image(article, known_url, budget)
+        except Exception as e:
+            print(f"⚠️  Could not resolve image for '{(article.title or '')[:50]}': {e}")
+            return None
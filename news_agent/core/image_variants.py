@@ -0,0 +1,238 @@
+"""
+Responsive image variant generation for the News Agent
+"""
+
+import os
+import json
+import tempfile
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Any, Iterable, Optional, Sequence
+
+FORMATS = {'webp': ('WEBP', '.webp'), 'jpeg': ('JPEG', '.jpg')}
+
+
+def pillow_available() -> bool:
+    """Whether Pillow, which variant generation needs, is installed"""
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def default_workers() -> int:
+    """
+    Resizing processes used when none are configured
+
+    One per CPU, at most four: each spawned worker imports Pillow and
+    competes with the rest of the run for the CPUs.
+    """
+    return max(1, min(4, os.cpu_count() or 1))
+
+
+def _atomic_save(image, path: str, pil_format: str, quality: int) -> None:
+    fd, temp_path = tempfile.mkstemp(prefix='.partial-', dir=os.path.dirname(path))
+    os.close(fd)
+    try:
+        image.save(temp_path, pil_format, quality=quality, optimize=True)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def build_variants(source_path: str, output_dir: str, widths: Sequence[int],
+                   fmt: str = 'webp', quality: int = 80) -> Dict[str, Any]:
+    """
+    Decode an image once and write width-bucketed variants of it
+
+    Runs inside worker processes, so it only takes and returns plain data.
+
+    Args:
+        source_path: Stored image, named by its content hash
+        output_dir: Directory receiving the variants and their manifest
+        widths: Target widths in pixels; widths above the original are skipped
+        fmt: 'webp' or 'jpeg'
+        quality: Encoder quality
+
+    Returns:
+        Manifest with the original 'width'/'height', the 'widths' and
+        'quality' it was built with and a 'variants' list of
+        {'path', 'width', 'height'} sorted by width
+    """
+    from PIL import Image, ImageOps
+
+    pil_format, ext = FORMATS[fmt]
+    blob = os.path.splitext(os.path.basename(source_path))[0]
+    manifest_path = os.path.join(output_dir, f"{blob}.{fmt}.json")
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+    except (OSError, ValueError):
+        previous = None
+    # Variant files of another quality have the same names and are rewritten
+    rewrite = previous is not None and previous.get('quality') != quality
+
+    with Image.open(source_path) as opened:
+        image = ImageOps.exif_transpose(opened)
+        image.load()
+    has_alpha = 'A' in image.getbands() or 'transparency' in image.info
+    mode = 'RGBA' if pil_format == 'WEBP' and has_alpha else 'RGB'
+    if image.mode != mode:
+        image = image.convert('RGBA' if has_alpha else 'RGB').convert(mode)
+
+    width, height = image.size
+    targets = sorted({w for w in widths if w < width} | {min(width, max(widths))})
+
+    variants = []
+    for target in targets:
+        target_height = max(1, round(height * target / width))
+        path = os.path.join(output_dir, f"{blob}_w{target}{ext}")
+        if rewrite or not os.path.exists(path):
+            resized = image if target == width else image.resize((target, target_height), Image.LANCZOS)
+            _atomic_save(resized, path, pil_format, quality)
+        variants.append({'path': path, 'width': target, 'height': target_height})
+
+    manifest = {'width': width, 'height': height, 'widths': sorted(set(widths)), 'quality': quality,
+                'variants': variants}
+    fd, temp_path = tempfile.mkstemp(prefix='.partial-', dir=output_dir)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    os.replace(temp_path, manifest_path)
+
+    # Buckets of a previous width set are no longer referenced
+    if previous is not None:
+        current = {variant['path'] for variant in variants}
+        for variant in previous.get('variants', []):
+            if variant['path'] not in current:
+                try:
+                    os.remove(variant['path'])
+                except OSError:
+                    pass
+    return manifest
+
+
+class ImageVariantProcessor:
+    """
+    Produces resized variants of downloaded images on a process pool
+
+    Variants are keyed by the source file's content hash (its name in the
+    image store) and recorded in a small JSON manifest together with the
+    widths and quality they were built with, so an image is decoded and
+    resized once per configuration.
+    """
+
+    def __init__(self, output_dir: str, widths: Iterable[int] = (320, 640, 960, 1280),
+                 fmt: str = 'webp', quality: int = 80, max_workers: Optional[int] = None):
+        if fmt not in FORMATS:
+            raise ValueError(f"fmt must be one of {', '.join(FORMATS)}")
+        self.output_dir = output_dir
+        self.widths = sorted({int(w) for w in widths if int(w) > 0})
+        self.fmt = fmt
+        self.quality = quality
+        self.max_workers = max_workers or default_workers()
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _manifest_path(self, source_path: str) -> str:
+        blob = os.path.splitext(os.path.basename(source_path))[0]
+        return os.path.join(self.output_dir, f"{blob}.{self.fmt}.json")
+
+    def _cached(self, source_path: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._manifest_path(source_path), 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get('widths') != self.widths or manifest.get('quality') != self.quality:
+            return None
+        if all(os.path.exists(variant['path']) for variant in manifest['variants']):
+            return manifest
+        return None
+
+    def process(self, image_paths: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Ensure variants exist for every local image
+
+        Args:
+            image_paths: Resolved images; remote URLs and empty entries are ignored
+
+        Returns:
+            Mapping of local image path to its variant manifest (images that
+            could not be decoded are omitted)
+        """
+        local = sorted({path for path in image_paths if path and os.path.isfile(path)})
+        if not local or not self.widths:
+            return {}
+
+        manifests: Dict[str, Dict[str, Any]] = {}
+        missing: List[str] = []
+        for path in local:
+            cached = self._cached(path)
+            if cached:
+                manifests[path] = cached
+            else:
+                missing.append(path)
+
+        if missing:
+            print(f"🖼️  Generating {self.fmt} variants for {len(missing)} images...")
+            os.makedirs(self.output_dir, exist_ok=True)
+            futures: Dict[str, Future] = {}
+            try:
+                pool = self._get_pool()
+                futures = {
+                    path: pool.submit(build_variants, path, self.output_dir, self.widths, self.fmt, self.quality)
+                    for path in missing
+                }
+                for path, future in futures.items():
+                    try:
+                        manifests[path] = future.result()
+                    except BrokenProcessPool:
+                        raise
+                    except Exception as e:
+                        print(f"⚠️  Could not create variants for {os.path.basename(path)}: {e}")
+            except BrokenProcessPool as e:
+                # A crashed worker poisons the pool; start a fresh one next time
+                print(f"⚠️  Image variant workers failed: {e}")
+                for future in futures.values():
+                    future.cancel()
+                self.close()
+
+        return manifests
+
+    def remove(self, source_path: str) -> None:
+        """
+        Delete the variants and manifest derived from an image
+
+        Args:
+            source_path: Stored image whose variants are no longer needed
+        """
+        manifest_path = self._manifest_path(source_path)
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                variants = json.load(f)['variants']
+        except (OSError, ValueError, KeyError):
+            variants = []
+        for path in [variant['path'] for variant in variants] + [manifest_path]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        # Spawned workers are safe to start from a process running threads
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._pool
+
+    def close(self) -> None:
+        """Shut down the worker processes"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
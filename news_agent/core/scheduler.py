@@ -0,0 +1,253 @@
+"""
+Long-running scheduler that keeps topic pages fresh
+"""
+
+import os
+import json
+import time
+import heapq
+import random
+import signal
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .agent import NewsAgent
+
+
+def load_schedule(path: str, default_interval: float = 900, default_articles: int = 10,
+                  output_dir: str = '.') -> List[Dict[str, Any]]:
+    """
+    Read a JSON schedule of topics
+
+    The file is either a list of topics or an object whose ``topics`` list
+    may override the file-wide ``interval`` (seconds), ``articles`` and
+    ``output_dir`` per topic, and name an explicit ``output`` page::
+
+        {"interval": 900, "output_dir": "pages",
+         "topics": ["artificial intelligence",
+                    {"topic": "climate change", "interval": 3600, "articles": 20}]}
+
+    Args:
+        path: Path to the schedule file
+        default_interval: Refresh interval of topics that set none
+        default_articles: Articles fetched for topics that set none
+        output_dir: Page directory of topics that set none
+
+    Returns:
+        One dict per topic with topic, interval, articles and output
+
+    Raises:
+        ValueError: If the schedule is malformed
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return build_schedule(data, default_interval, default_articles, output_dir)
+
+
+def build_schedule(data: Any, default_interval: float = 900, default_articles: int = 10,
+                   output_dir: str = '.') -> List[Dict[str, Any]]:
+    """
+    Validate a schedule and fill in its defaults
+
+    Args:
+        data: Parsed schedule in the ``load_schedule`` format, e.g. a list of topics
+        default_interval: Refresh interval of topics that set none
+        default_articles: Articles fetched for topics that set none
+        output_dir: Page directory of topics that set none
+
+    Returns:
+        One dict per topic with topic, interval, articles and output
+
+    Raises:
+        ValueError: If the schedule is malformed
+    """
+    if isinstance(data, list):
+        data = {'topics': data}
+    if not isinstance(data, dict) or not isinstance(data.get('topics'), list) or not data['topics']:
+        raise ValueError("schedule needs a non-empty 'topics' list")
+
+    defaults = {
+        'interval': float(data.get('interval', default_interval)),
+        'articles': int(data.get('articles', default_articles)),
+        'output_dir': data.get('output_dir', output_dir),
+    }
+    entries = []
+    for item in data['topics']:
+        entry = dict(defaults, topic=item) if isinstance(item, str) else dict(defaults, **item)
+        if not isinstance(entry.get('topic'), str) or not entry['topic'].strip():
+            raise ValueError(f"schedule entry without a topic: {item!r}")
+        entry['interval'] = float(entry['interval'])
+        entry['articles'] = int(entry['articles'])
+        if entry['interval'] <= 0:
+            raise ValueError(f"interval of '{entry['topic']}' must be positive")
+        entries.append(entry)
+
+    # Topics without an explicit page get the same names as in batch mode
+    from .agent import NewsAgent
+    for entry in entries:
+        if not entry.get('output'):
+            entry['output'] = NewsAgent._batch_output_files([entry['topic']], entry['output_dir'])[0]
+        entry.pop('output_dir', None)
+    outputs = [entry['output'] for entry in entries]
+    duplicates = sorted({output for output in outputs if outputs.count(output) > 1})
+    if duplicates:
+        raise ValueError(f"several topics write to {', '.join(duplicates)}")
+    return entries
+
+
+class TopicScheduler:
+    """
+    Refreshes each topic of a schedule on its own interval with one agent
+
+    A single NewsAgent, with its HTTP pools, caches and loaded model client,
+    serves every refresh, so only the first one pays for start-up. First
+    runs are spread over a fraction of each interval and every later
+    interval is jittered, so topics drift apart instead of firing together.
+    A refresh that comes due while the previous one of the same topic is
+    still running or queued is skipped.
+    """
+
+    def __init__(self, agent: 'NewsAgent', schedule: List[Dict[str, Any]],
+                 max_workers: Optional[int] = None, jitter: float = 0.1,
+                 cleanup_interval: float = 3600, seed: Optional[int] = None):
+        """
+        Args:
+            agent: Agent performing the refreshes
+            schedule: Entries from ``load_schedule``
+            max_workers: Topics refreshed at once (default from the agent's settings)
+            jitter: Fraction of an interval by which runs are randomly shifted
+            cleanup_interval: Seconds between image cache cleanups
+            seed: Seed of the jitter, for reproducible schedules
+        """
+        if not 0 <= jitter < 1:
+            raise ValueError("jitter must be in [0, 1)")
+        self.agent = agent
+        self.schedule = schedule
+        self.max_workers = max(1, max_workers or agent.settings.batch_parallelism)
+        self.jitter = jitter
+        self.cleanup_interval = cleanup_interval
+        self._random = random.Random(seed)
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._running = set()
+        self._metrics_lock = threading.Lock()
+        # Last outcome per topic: status, filepath, error, duration, finished_at
+        self.status: Dict[str, Dict[str, Any]] = {}
+
+    def stop(self) -> None:
+        """Stop scheduling; in-flight refreshes are allowed to finish"""
+        self._stop.set()
+
+    def run(self, install_signal_handlers: bool = True) -> None:
+        """
+        Refresh topics until ``stop`` is called or SIGTERM/SIGINT arrives
+
+        Args:
+            install_signal_handlers: Stop gracefully on SIGTERM and SIGINT
+                (only possible from the main thread)
+        """
+        previous_handlers = {}
+        if install_signal_handlers and threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                previous_handlers[signum] = signal.signal(signum, self._handle_signal)
+
+        for entry in self.schedule:
+            directory = os.path.dirname(entry['output'])
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+        now = time.monotonic()
+        queue = [
+            (now + self._random.uniform(0, entry['interval'] * self.jitter), index)
+            for index, entry in enumerate(self.schedule)
+        ]
+        heapq.heapify(queue)
+        next_cleanup = now
+
+        print(f"⏰ Scheduling {len(self.schedule)} topics ({self.max_workers} at a time); "
+              f"SIGTERM or Ctrl+C stops after running refreshes finish")
+        pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='news-schedule')
+        # Submitted refreshes that have not finished, by schedule index
+        submitted: Dict[Future, int] = {}
+        try:
+            while not self._stop.is_set():
+                due, index = queue[0]
+                now = time.monotonic()
+                if due > now:
+                    self._stop.wait(due - now)
+                    continue
+
+                entry = self.schedule[index]
+                interval = entry['interval']
+                next_due = due + interval * (1 + self._random.uniform(-self.jitter, self.jitter))
+                # A daemon that fell behind (e.g. a suspended machine) skips the missed slots
+                if next_due < now:
+                    next_due = now + interval
+                heapq.heapreplace(queue, (next_due, index))
+
+                with self._lock:
+                    busy = index in self._running
+                    if not busy:
+                        self._running.add(index)
+                if busy:
+                    print(f"⏭️  Skipping '{entry['topic']}': previous refresh still running")
+                    self.agent.metrics.incr('schedule_skipped', topic=entry['topic'])
+                    continue
+
+                # Evict images between refreshes, while no run has unrecorded downloads
+                if now >= next_cleanup and len(self._running) == 1:
+                    self.agent.cleanup_images()
+                    next_cleanup = now + self.cleanup_interval
+
+                future = pool.submit(self._refresh, index)
+                submitted[future] = index
+                future.add_done_callback(lambda done: submitted.pop(done, None))
+        finally:
+            # Refreshes queued behind busy workers never start
+            for future, index in list(submitted.items()):
+                if future.cancel():
+                    with self._lock:
+                        self._running.discard(index)
+            with self._lock:
+                in_flight = len(self._running)
+            if in_flight:
+                print(f"🛑 Stopping: waiting for {in_flight} running refreshes")
+            pool.shutdown(wait=True)
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+            print("👋 Scheduler stopped")
+
+    def _handle_signal(self, signum: int, frame: Any) -> None:
+        print(f"\n🛑 Received {signal.Signals(signum).name}, shutting down")
+        self.stop()
+
+    def _refresh(self, index: int) -> None:
+        """Run one topic, recording its outcome instead of raising"""
+        entry = self.schedule[index]
+        topic = entry['topic']
+        start = time.monotonic()
+        status: Dict[str, Any] = {'status': 'failed', 'filepath': '', 'error': ''}
+        try:
+            if self._stop.is_set():
+                status['error'] = 'cancelled'
+                return
+            filepath = self.agent.run(topic, entry['articles'], entry['output'], cleanup_images=False)
+            if filepath:
+                status.update(status='success', filepath=filepath)
+            else:
+                status['error'] = 'page could not be saved'
+        except Exception as e:
+            print(f"❌ Refresh of '{topic}' failed: {e}")
+            status['error'] = f"{type(e).__name__}: {e}"
+        finally:
+            status['duration'] = round(time.monotonic() - start, 3)
+            status['finished_at'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+            self.status[topic] = status
+            self.agent.metrics.incr('schedule_refreshes', topic=topic, status=status['status'])
+            with self._lock:
+                self._running.discard(index)
+            # Export after every refresh so scrapers see a live daemon's counters
+            with self._metrics_lock:
+                self.agent.write_metrics(topics=[entry['topic'] for entry in self.schedule])
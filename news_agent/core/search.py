@@ -3,16 +3,43 @@ News search functionality for the News Agent
 """
 
 import requests
-from typing import List, Dict, Any
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Iterator, Optional
+
+from .article import Article
+from ..utils.response_cache import ResponseCache
+from ..utils.http import HttpClient
+from ..utils.article_store import canonical_link
+from ..utils.metrics import Metrics
 
 
 class NewsSearcher:
     """Handles news search using SerpAPI"""
     
-    def __init__(self, serpapi_key: str):
+    def __init__(self, serpapi_key: str, cache: Optional[ResponseCache] = None,
+                 http: Optional[HttpClient] = None, page_size: int = 100,
+                 max_concurrent_pages: int = 3, serpapi_url: str = 'https://serpapi.com/search',
+                 metrics: Optional[Metrics] = None):
+        """
+        Args:
+            serpapi_key: SerpAPI key
+            cache: Response cache for search results
+            http: Shared HTTP client
+            page_size: Results requested per page (SerpAPI caps ``num`` at 100)
+            max_concurrent_pages: Result pages requested at once
+            serpapi_url: SerpAPI search endpoint
+            metrics: Records page fetch spans and article counts
+        """
         self.serpapi_key = serpapi_key
+        self.cache = cache
+        self.http = http or HttpClient()
+        self.page_size = max(1, page_size)
+        self.max_concurrent_pages = max(1, max_concurrent_pages)
+        self.serpapi_url = serpapi_url
+        self.metrics = metrics or Metrics(enabled=False)
     
-    def fetch_news(self, topic: str, num_results: int = 10) -> List[Dict[str, Any]]:
+    def fetch_news(self, topic: str, num_results: int = 10) -> List[Article]:
         """
         Fetch latest news about a specific topic using SerpAPI
         
@@ -21,50 +48,143 @@ class NewsSearcher:
             num_results: Number of news articles to fetch
             
         Returns:
-            List of news articles with title, link, snippet, and date
+            News articles, normalized once here for every later stage
         """
         print(f"🔍 Fetching latest news about: {topic}")
         
+        processed_news = []
+        try:
+            for article in self.iter_news(topic, num_results):
+                processed_news.append(article)
+            
+            print(f"✅ Found {len(processed_news)} news articles")
+            return processed_news
+            
+        except requests.exceptions.RequestException as e:
+            print(f"❌ Error fetching news: {e}")
+        except Exception as e:
+            print(f"❌ Unexpected error: {e}")
+        
+        # Keep the pages that arrived before the failure
+        if processed_news:
+            print(f"⚠️  Returning the {len(processed_news)} articles fetched before the error")
+        return processed_news
+    
+    def iter_news(self, topic: str, num_results: int = 10) -> Iterator[Article]:
+        """
+        Yield news articles page by page as the result pages arrive
+        
+        Pages are requested concurrently (up to ``max_concurrent_pages`` in
+        flight) but yielded in ranking order, so a consumer can start on the
+        first page while later ones are still loading. Each page starts where
+        the previous one actually ended: SerpAPI may return fewer results
+        than requested, and pages requested ahead at the requested size are
+        then discarded and requested again at the right offset. Articles
+        repeated on several pages are yielded once. Fetching stops as soon as
+        enough articles were yielded or a page brings nothing new.
+        
+        The agent itself collects every page through ``fetch_news``:
+        near-duplicate detection compares each story against all the others,
+        so no later stage can start on a partial set. Streaming is for
+        callers that use the articles as they arrive.
+        
+        Args:
+            topic: The news topic to search for
+            num_results: Number of news articles wanted
+            
+        Yields:
+            News articles with title, link, snippet, date, source and images
+            
+        Raises:
+            requests.exceptions.RequestException: A page request failed
+        """
+        if num_results <= 0:
+            return
+        
+        page_size = min(num_results, self.page_size)
+        # Results a page is expected to bring; the offsets of pages requested
+        # ahead assume it, until a page shows otherwise
+        stride = page_size
+        pool = ThreadPoolExecutor(max_workers=self.max_concurrent_pages, thread_name_prefix='news-page')
+        in_flight = deque()
+        next_start = 0
+        seen = set()
+        yielded = 0
+        try:
+            while yielded < num_results:
+                # Keep a window of pages loading ahead of the consumer
+                while (len(in_flight) < self.max_concurrent_pages
+                       and yielded + len(in_flight) * stride < num_results):
+                    in_flight.append((next_start, pool.submit(self._fetch_page, topic, next_start, page_size)))
+                    next_start += stride
+                
+                start, future = in_flight.popleft()
+                page = future.result()
+                new_articles = 0
+                for article in page:
+                    key = canonical_link(article.link or '') or article.title
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    new_articles += 1
+                    yielded += 1
+                    yield article
+                    if yielded >= num_results:
+                        break
+                
+                if new_articles == 0:
+                    break
+                if len(page) != stride:
+                    # The pages requested ahead start at the wrong offset
+                    for _, pending in in_flight:
+                        pending.cancel()
+                    in_flight.clear()
+                    stride = len(page)
+                    next_start = start + len(page)
+        finally:
+            for _, future in in_flight:
+                future.cancel()
+            pool.shutdown(wait=False)
+    
+    def _fetch_page(self, topic: str, start: int, page_size: int) -> List[Article]:
+        """
+        Fetch one page of news results
+        
+        Args:
+            topic: The news topic to search for
+            start: Offset of the first result
+            page_size: Results per page
+            
+        Returns:
+            Processed articles of the page (empty past the last result)
+        """
         # SerpAPI parameters for news search with better image support
         params = {
             'q': f"{topic} news",
             'tbm': 'nws',  # News search
             'api_key': self.serpapi_key,
-            'num': num_results,
+            'num': page_size,
             'sort': 'date',  # Sort by date
             'tbs': 'qdr:d',  # Past day
             'safe': 'active',  # Safe search
             'gl': 'us',  # Country
             'hl': 'en'  # Language
         }
+        if start:
+            params['start'] = start
         
-        try:
-            response = requests.get('https://serpapi.com/search', params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            news_results = data.get('news_results', [])
-            
-            # Process and clean the news results
-            processed_news = []
-            for article in news_results:
-                processed_article = {
-                    'title': article.get('title', 'No title'),
-                    'link': article.get('link', ''),
-                    'snippet': article.get('snippet', 'No description'),
-                    'date': article.get('date', 'No date'),
-                    'source': article.get('source', 'Unknown source'),
-                    'image': article.get('image', ''),
-                    'thumbnail': article.get('thumbnail', '')
-                }
-                processed_news.append(processed_article)
-            
-            print(f"✅ Found {len(processed_news)} news articles")
-            return processed_news
-            
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Error fetching news: {e}")
-            return []
-        except Exception as e:
-            print(f"❌ Unexpected error: {e}")
-            return []
+        with self.metrics.span('search.page'):
+            data = self.cache.get('news', params) if self.cache else None
+            if data is None:
+                response = self.http.get(self.serpapi_url, params=params)
+                response.raise_for_status()
+                
+                data = response.json()
+                if self.cache and 'error' not in data:
+                    self.cache.set('news', params, data)
+        
+        news_results = data.get('news_results', [])
+        self.metrics.incr('news_results', len(news_results))
+        
+        # Normalize once; later stages read the typed fields
+        return [Article.from_dict(article) for article in news_results]
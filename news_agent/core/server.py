@@ -0,0 +1,484 @@
+"""
+Local HTTP server for generated pages with background regeneration
+"""
+
+import os
+import html
+import time
+import signal
+import hashlib
+import mimetypes
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from email.utils import formatdate, parsedate_to_datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+from typing import List, Dict, Any, Optional, Tuple, TYPE_CHECKING
+
+from .assets import ASSET_FILENAMES
+from ..utils.compression import compress
+
+if TYPE_CHECKING:
+    from .agent import NewsAgent
+
+# Content-hashed files never change under the same URL
+IMMUTABLE = 'public, max-age=31536000, immutable'
+# Pages are always revalidated, which costs a 304 while they are unchanged
+REVALIDATE = 'no-cache'
+
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+MIN_COMPRESS_BYTES = 256
+
+
+def accepted_encodings(header: str) -> List[str]:
+    """
+    Content codings of an Accept-Encoding header, most preferred first
+
+    Args:
+        header: Header value, e.g. 'gzip, br;q=0.9, *;q=0'
+
+    Returns:
+        Codings with a non-zero quality; ties keep the preference br, gzip
+    """
+    qualities = {}
+    for part in header.split(','):
+        name, _, params = part.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name.strip():
+            qualities[name.strip().lower()] = quality
+    preference = {'br': 0, 'gzip': 1}
+    return sorted(
+        (name for name, quality in qualities.items() if quality > 0),
+        key=lambda name: (-qualities[name], preference.get(name, 2))
+    )
+
+
+class FileCache:
+    """
+    In-memory LRU of file bodies with their ETags and compressed encodings
+
+    Entries are keyed by path and revalidated against the file's mtime and
+    size on every lookup, so a regenerated page is picked up immediately.
+    Each encoding is compressed once per file version.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Args:
+            max_bytes: Memory budget for bodies and encodings; larger files
+                are read per request instead
+        """
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._bytes = 0
+
+    def get(self, path: str) -> Optional[Dict[str, Any]]:
+        """
+        Current version of a file
+
+        Args:
+            path: File path
+
+        Returns:
+            Dict with body, etag (hex digest), mtime and encodings, or None if
+            the file does not exist
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry and entry['version'] == (stat.st_mtime_ns, stat.st_size):
+                self._entries.move_to_end(path)
+                return entry
+
+        try:
+            with open(path, 'rb') as f:
+                # Key by the opened file so a concurrent replace cannot pair
+                # the new body with the old version
+                stat = os.fstat(f.fileno())
+                body = f.read()
+        except OSError:
+            return None
+        entry = {
+            'version': (stat.st_mtime_ns, stat.st_size),
+            'mtime': stat.st_mtime,
+            'body': body,
+            'etag': hashlib.sha256(body).hexdigest()[:32],
+            'encodings': {},
+        }
+        self._store(path, entry)
+        return entry
+
+    def encoded(self, path: str, entry: Dict[str, Any], encoding: str) -> Optional[bytes]:
+        """
+        Body of an entry in a content coding
+
+        Args:
+            path: Path the entry belongs to
+            entry: Entry returned by ``get``
+            encoding: 'br' or 'gzip'
+
+        Returns:
+            Compressed body, or None if the coding is unavailable or does not
+            make the body smaller
+        """
+        if encoding in entry['encodings']:
+            return entry['encodings'][encoding]
+        # Fast levels: responses are compressed on the request path
+        data = compress(entry['body'], encoding, level={'gzip': 6, 'br': 5}.get(encoding))
+        if data is None:
+            return None
+        if len(data) >= len(entry['body']):
+            data = None
+        with self._lock:
+            entry['encodings'][encoding] = data
+            if self._entries.get(path) is entry:
+                self._bytes += len(data or b'')
+                self._evict()
+        return data
+
+    def _store(self, path: str, entry: Dict[str, Any]) -> None:
+        size = len(entry['body'])
+        if size > self.max_bytes // 8:
+            return
+        with self._lock:
+            previous = self._entries.pop(path, None)
+            if previous:
+                self._bytes -= self._size(previous)
+            self._entries[path] = entry
+            self._bytes += size
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= self._size(entry)
+
+    @staticmethod
+    def _size(entry: Dict[str, Any]) -> int:
+        return len(entry['body']) + sum(len(data or b'') for data in entry['encodings'].values())
+
+
+class RegenerationError(Exception):
+    """A page that did not exist yet could not be generated"""
+
+
+class NewsServer:
+    """
+    Serves topic pages, their assets and news_images/ over HTTP
+
+    Responses carry strong ETags and Last-Modified, answer conditional
+    requests with 304, and are compressed with brotli (if installed) or
+    gzip. Content-hashed assets and images are cacheable forever; pages
+    are revalidated on every load. A page older than its topic's interval
+    is served as is while one background ``NewsAgent.run`` regenerates it,
+    however many requests arrive for it meanwhile (stale-while-revalidate).
+    """
+
+    def __init__(self, agent: 'NewsAgent', schedule: List[Dict[str, Any]],
+                 host: str = '127.0.0.1', port: int = 8000, max_workers: Optional[int] = None,
+                 cache_max_bytes: int = 64 * 1024 * 1024, cleanup_interval: float = 3600):
+        """
+        Args:
+            agent: Agent regenerating the pages
+            schedule: Entries from ``load_schedule``/``build_schedule``; each
+                topic's interval is its page's freshness window
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free one)
+            max_workers: Pages regenerated at once (default from the agent's settings)
+            cache_max_bytes: Memory budget of the file cache
+            cleanup_interval: Seconds between image cache cleanups
+        """
+        self.agent = agent
+        self.pages: Dict[str, Dict[str, Any]] = {}
+        for entry in schedule:
+            name = os.path.basename(entry['output'])
+            if name in self.pages:
+                raise ValueError(f"several topics are served as /{name}")
+            self.pages[name] = entry
+        self.asset_dirs = sorted({os.path.dirname(os.path.abspath(entry['output'])) for entry in schedule})
+        self.images_dir = os.path.realpath(agent.image_handler.images_dir)
+        self.files = FileCache(cache_max_bytes)
+        self.cleanup_interval = cleanup_interval
+        self._next_cleanup = 0.0
+        self._lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._regenerating: Dict[str, Future] = {}
+        self._pool = ThreadPoolExecutor(
+            max_workers=max(1, max_workers or agent.settings.batch_parallelism),
+            thread_name_prefix='news-regenerate'
+        )
+        self.httpd = ThreadingHTTPServer((host, port), _RequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.app = self
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def serve_forever(self, install_signal_handlers: bool = True) -> None:
+        """
+        Serve until ``shutdown`` is called or SIGTERM/SIGINT arrives
+
+        Args:
+            install_signal_handlers: Stop gracefully on SIGTERM and SIGINT
+                (only possible from the main thread)
+        """
+        previous_handlers = {}
+        if install_signal_handlers and threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                previous_handlers[signum] = signal.signal(signum, self._handle_signal)
+
+        print(f"🌍 Serving {len(self.pages)} topics at {self.url}")
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.httpd.server_close()
+            with self._lock:
+                in_flight = len(self._regenerating)
+            if in_flight:
+                print(f"🛑 Stopping: waiting for {in_flight} page regenerations")
+            with self._lock:
+                pending = list(self._regenerating.values())
+            # Regenerations queued behind busy workers never start
+            for future in pending:
+                future.cancel()
+            self._pool.shutdown(wait=True)
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+            print("👋 Server stopped")
+
+    def shutdown(self) -> None:
+        """Stop serving; must not be called from the serving thread"""
+        self.httpd.shutdown()
+
+    def _handle_signal(self, signum: int, frame: Any) -> None:
+        print(f"\n🛑 Received {signal.Signals(signum).name}, shutting down")
+        # serve_forever runs in this thread, so it must be stopped from another
+        threading.Thread(target=self.shutdown, daemon=True).start()
+
+    def regenerate(self, entry: Dict[str, Any]) -> Future:
+        """
+        Regenerate a topic's page in the background
+
+        Args:
+            entry: Schedule entry of the topic
+
+        Returns:
+            Future of the page path, shared by every caller while the
+            regeneration is running
+        """
+        topic = entry['topic']
+        with self._lock:
+            future = self._regenerating.get(topic)
+            if future is not None:
+                return future
+            future = self._pool.submit(self._regenerate, entry)
+            self._regenerating[topic] = future
+        future.add_done_callback(lambda done: self._forget(topic, done))
+        return future
+
+    def _forget(self, topic: str, future: Future) -> None:
+        with self._lock:
+            if self._regenerating.get(topic) is future:
+                del self._regenerating[topic]
+        if not future.cancelled() and future.exception() is not None:
+            print(f"❌ Regenerating '{topic}' failed: {future.exception()}")
+
+    def _regenerate(self, entry: Dict[str, Any]) -> str:
+        now = time.time()
+        with self._lock:
+            # Evict images between runs, while no other run has unrecorded downloads
+            cleanup = now >= self._next_cleanup and len(self._regenerating) <= 1
+            if cleanup:
+                self._next_cleanup = now + self.cleanup_interval
+        if cleanup:
+            self.agent.cleanup_images()
+
+        self.agent.metrics.incr('page_regenerations', topic=entry['topic'])
+        filepath = self.agent.run(entry['topic'], entry['articles'], entry['output'], cleanup_images=False)
+        with self._metrics_lock:
+            self.agent.write_metrics(topics=[entry['topic'] for entry in self.pages.values()])
+        if not filepath:
+            raise RegenerationError(f"page for '{entry['topic']}' could not be saved")
+        return filepath
+
+    def page_path(self, name: str) -> Optional[str]:
+        """
+        Path of a topic page, starting its regeneration if it is stale
+
+        A missing page is generated before returning; requests arriving
+        meanwhile wait for the same run.
+
+        Args:
+            name: Page file name, e.g. 'news_climate-change.html'
+
+        Returns:
+            Page path, or None if no topic is served under that name
+
+        Raises:
+            RegenerationError: If a missing page could not be generated
+        """
+        entry = self.pages.get(name)
+        if entry is None:
+            return None
+        path = entry['output']
+        try:
+            age = time.time() - os.stat(path).st_mtime
+        except OSError:
+            try:
+                return self.regenerate(entry).result()
+            except Exception as e:
+                raise RegenerationError(str(e)) from e
+        if age > entry['interval']:
+            self.regenerate(entry)
+        return path
+
+    def resolve(self, url_path: str) -> Tuple[Optional[str], str]:
+        """
+        Map a request path to a file
+
+        Args:
+            url_path: Decoded path of the request URL
+
+        Returns:
+            (file path or None, Cache-Control value)
+        """
+        if url_path.startswith('/news_images/'):
+            path = os.path.realpath(os.path.join(self.images_dir, url_path[len('/news_images/'):]))
+            if path.startswith(self.images_dir + os.sep) and os.path.isfile(path):
+                # Images and their variants are named after a hash of their content
+                return path, IMMUTABLE
+            return None, REVALIDATE
+
+        name = url_path.lstrip('/')
+        if '/' in name:
+            return None, REVALIDATE
+        if name in ASSET_FILENAMES:
+            for directory in self.asset_dirs:
+                path = os.path.join(directory, name)
+                if os.path.isfile(path):
+                    return path, IMMUTABLE
+            return None, REVALIDATE
+        return self.page_path(name), REVALIDATE
+
+    def index_html(self) -> str:
+        """Listing of the served topics with their page ages"""
+        rows = []
+        for name, entry in sorted(self.pages.items(), key=lambda item: item[1]['topic'].lower()):
+            try:
+                age = f"updated {int((time.time() - os.stat(entry['output']).st_mtime) // 60)} min ago"
+            except OSError:
+                age = "not generated yet"
+            rows.append(f'<li><a href="{html.escape(name)}">{html.escape(entry["topic"])}</a> '
+                        f'<small>({age})</small></li>')
+        return ("<!DOCTYPE html>\n<html lang=\"en\">\n<head><meta charset=\"UTF-8\">"
+                "<title>News Agent</title></head>\n<body>\n<h1>News Agent</h1>\n<ul>\n"
+                + "\n".join(rows) + "\n</ul>\n</body>\n</html>\n")
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """Answers GET/HEAD requests from a NewsServer"""
+
+    server_version = 'NewsAgent'
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self) -> None:
+        self._serve(head=False)
+
+    def do_HEAD(self) -> None:
+        self._serve(head=True)
+
+    def _serve(self, head: bool) -> None:
+        app: NewsServer = self.server.app
+        url_path = unquote(urlsplit(self.path).path)
+
+        if url_path == '/':
+            body = app.index_html().encode('utf-8')
+            self._respond(HTTPStatus.OK, {'Content-Type': 'text/html; charset=utf-8',
+                                          'Cache-Control': REVALIDATE}, body, head)
+            return
+
+        try:
+            path, cache_control = app.resolve(url_path)
+        except RegenerationError as e:
+            self._respond(HTTPStatus.SERVICE_UNAVAILABLE, {'Content-Type': 'text/plain; charset=utf-8',
+                                                           'Retry-After': '60'},
+                          f"Page could not be generated: {e}\n".encode('utf-8'), head)
+            return
+        entry = app.files.get(path) if path else None
+        if entry is None:
+            self._respond(HTTPStatus.NOT_FOUND, {'Content-Type': 'text/plain; charset=utf-8'},
+                          b"Not found\n", head)
+            return
+
+        content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        compressible = content_type.startswith(COMPRESSIBLE_TYPES)
+        if content_type.startswith('text/') or content_type == 'application/javascript':
+            content_type += '; charset=utf-8'
+
+        body, encoding = entry['body'], None
+        if compressible and len(body) >= MIN_COMPRESS_BYTES:
+            for candidate in accepted_encodings(self.headers.get('Accept-Encoding', '')):
+                encoded = app.files.encoded(path, entry, candidate)
+                if encoded is not None:
+                    body, encoding = encoded, candidate
+                    break
+
+        # Each representation needs its own strong validator
+        etag = f'"{entry["etag"]}-{encoding}"' if encoding else f'"{entry["etag"]}"'
+        headers = {
+            'ETag': etag,
+            'Last-Modified': formatdate(entry['mtime'], usegmt=True),
+            'Cache-Control': cache_control,
+        }
+        if compressible:
+            headers['Vary'] = 'Accept-Encoding'
+
+        if self._not_modified(etag, entry['mtime']):
+            self._respond(HTTPStatus.NOT_MODIFIED, headers, b'', head=True)
+            return
+        headers['Content-Type'] = content_type
+        if encoding:
+            headers['Content-Encoding'] = encoding
+        self._respond(HTTPStatus.OK, headers, body, head)
+
+    def _not_modified(self, etag: str, mtime: float) -> bool:
+        """Evaluate If-None-Match, falling back to If-Modified-Since"""
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(',')]
+            # Weak comparison, as RFC 9110 requires for If-None-Match
+            return '*' in tags or etag in (tag[2:] if tag.startswith('W/') else tag for tag in tags)
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def _respond(self, status: HTTPStatus, headers: Dict[str, str], body: bytes, head: bool) -> None:
+        app: NewsServer = self.server.app
+        app.agent.metrics.incr('served_requests', status=int(status))
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+            app.agent.metrics.incr('served_bytes', len(body))
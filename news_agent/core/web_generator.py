@@ -3,231 +3,155 @@ Web page generation functionality for the News Agent
 """
 
 import os
+import html
+import tempfile
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Optional
+
+from .article import Article, as_articles
+from .image_pipeline import ImagePipeline
+from .assets import inline_assets_html, linked_assets_html, write_assets
+from ..utils.compression import remove_precompressed, write_precompressed
+from ..utils.metrics import Metrics
+from ..utils.minify import minify_html
+
+
+def default_page_name() -> str:
+    """Filename of a single-topic page written without an explicit name"""
+    return f"news_page_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
 
 
 class WebGenerator:
     """Handles HTML page generation"""
     
-    def __init__(self, image_handler):
+    ASSET_MODES = ('inline', 'external')
+    # Rendered card width at the grid's breakpoints (one, two, three columns)
+    IMAGE_SIZES = "(max-width: 700px) 100vw, (max-width: 1100px) 50vw, 380px"
+    
+    def __init__(self, image_handler, asset_mode: str = 'inline', metrics: Optional[Metrics] = None,
+                 minify: bool = False, precompress: bool = False):
+        """
+        Args:
+            image_handler: ImageHandler used to resolve images when none are given
+            asset_mode: 'inline' embeds the stylesheet and script in every page
+                (single-file output); 'external' links to shared content-hashed
+                ``styles.<hash>.css`` / ``app.<hash>.js`` files next to the page
+            metrics: Records page write time and size
+            minify: Minify pages and assets and leave image load/error
+                handling to the page script instead of per-image attributes
+            precompress: Write ``.gz``/``.br`` siblings of saved pages and assets
+        """
+        if asset_mode not in self.ASSET_MODES:
+            raise ValueError(f"asset_mode must be one of {', '.join(self.ASSET_MODES)}")
         self.image_handler = image_handler
+        self.asset_mode = asset_mode
+        self.metrics = metrics or Metrics(enabled=False)
+        self.minify = minify
+        self.precompress = precompress
     
-    def generate_html_page(self, topic: str, news_articles: List[Dict[str, Any]], summary: str) -> str:
+    def generate_html_page(self, topic: str, news_articles: List[Article], summary: str,
+                           image_urls: Optional[List[str]] = None,
+                           image_variants: Optional[Dict[str, Dict[str, Any]]] = None) -> str:
         """
         Generate an HTML page with the news content
         
         Args:
             topic: The news topic
-            news_articles: List of news articles
+            news_articles: List of news articles (article dicts are accepted too)
             summary: AI-generated summary
+            image_urls: Images already resolved by ImagePipeline, one per article
+                in article order; resolved here first when omitted
+            image_variants: Resized variants per local image path, as returned
+                by ImageVariantProcessor.process; used for srcset/sizes
             
         Returns:
             HTML content as string
         """
+        return "".join(self.iter_html_page(topic, news_articles, summary, image_urls, image_variants))
+    
+    def write_html_page(self, topic: str, news_articles: List[Article], summary: str,
+                        image_urls: Optional[List[str]] = None, filename: Optional[str] = None,
+                        image_variants: Optional[Dict[str, Dict[str, Any]]] = None) -> str:
+        """
+        Render the page straight to disk without building it in memory
+        
+        The page is streamed into a temporary file next to the target and
+        atomically renamed into place, so readers never see a partial page.
+        
+        Args:
+            topic: The news topic
+            news_articles: List of news articles
+            summary: AI-generated summary
+            image_urls: Resolved images, one per article (see generate_html_page)
+            filename: Optional custom filename
+            image_variants: Resized image variants (see generate_html_page)
+            
+        Returns:
+            Path to the saved file or empty string if saving failed
+        """
+        chunks = self.iter_html_page(topic, news_articles, summary, image_urls, image_variants)
+        return self._write_page(chunks, filename)
+    
+    def write_assets(self, output_dir: str) -> List[str]:
+        """
+        Write the shared stylesheet and script used by 'external' asset mode
+        
+        Pages saved through this generator get them automatically; callers of
+        generate_html_page must write them next to the page themselves.
+        
+        Args:
+            output_dir: Directory the page is saved in
+            
+        Returns:
+            Paths of the asset files
+        """
+        return write_assets(output_dir, self.minify, self.precompress)
+    
+    def iter_html_page(self, topic: str, news_articles: List[Article], summary: str,
+                       image_urls: Optional[List[str]] = None,
+                       image_variants: Optional[Dict[str, Dict[str, Any]]] = None) -> Iterator[str]:
+        """
+        Render the page incrementally: header, summary, one chunk per article, footer
+        
+        Args:
+            topic: The news topic
+            news_articles: List of news articles
+            summary: AI-generated summary
+            image_urls: Resolved images, one per article (see generate_html_page)
+            image_variants: Resized image variants (see generate_html_page)
+            
+        Returns:
+            Iterator over consecutive fragments of the HTML document, minified
+            in minify mode
+        """
+        chunks = self._render_page(topic, news_articles, summary, image_urls, image_variants)
+        if self.minify:
+            return (minify_html(chunk) for chunk in chunks)
+        return chunks
+    
+    def _render_page(self, topic: str, news_articles: List[Article], summary: str,
+                     image_urls: Optional[List[str]],
+                     image_variants: Optional[Dict[str, Dict[str, Any]]]) -> Iterator[str]:
+        """Yield the page fragments of iter_html_page"""
+        news_articles = as_articles(news_articles)
+        if image_urls is None:
+            image_urls = ImagePipeline(self.image_handler).resolve(news_articles)
+        image_variants = image_variants or {}
+        
         current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        if self.asset_mode == 'external':
+            assets_html = linked_assets_html(self.minify)
+        else:
+            assets_html = inline_assets_html(self.minify)
         
-        html_content = f"""
+        yield f"""
 <!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Latest News: {topic}</title>
-    <style>
-        body {{
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            line-height: 1.6;
-            margin: 0;
-            padding: 20px;
-            background-color: #f5f5f5;
-        }}
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-            background-color: white;
-            padding: 30px;
-            border-radius: 10px;
-            box-shadow: 0 0 20px rgba(0,0,0,0.1);
-        }}
-        h1 {{
-            color: #2c3e50;
-            text-align: center;
-            margin-bottom: 30px;
-            border-bottom: 3px solid #3498db;
-            padding-bottom: 10px;
-        }}
-        .timestamp {{
-            text-align: center;
-            color: #7f8c8d;
-            font-style: italic;
-            margin-bottom: 30px;
-        }}
-        .summary {{
-            background: linear-gradient(135deg, #f8f9fa 0%, #e9ecef 100%);
-            padding: 25px;
-            border-radius: 12px;
-            margin-bottom: 30px;
-            border-left: 5px solid #3498db;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-        .summary h2 {{
-            color: #2c3e50;
-            margin-top: 0;
-            margin-bottom: 20px;
-            font-size: 1.4em;
-            display: flex;
-            align-items: center;
-        }}
-        .summary h2::before {{
-            content: "📊";
-            margin-right: 10px;
-            font-size: 1.2em;
-        }}
-        .summary h3 {{
-            color: #2980b9;
-            margin-top: 20px;
-            margin-bottom: 10px;
-            font-size: 1.1em;
-            border-bottom: 2px solid #3498db;
-            padding-bottom: 5px;
-        }}
-        .summary ul {{
-            margin: 10px 0;
-            padding-left: 20px;
-        }}
-        .summary li {{
-            margin-bottom: 8px;
-            line-height: 1.5;
-        }}
-        .summary strong {{
-            color: #2c3e50;
-            font-weight: 600;
-        }}
-        .summary p {{
-            margin-bottom: 15px;
-            line-height: 1.6;
-        }}
-        .news-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
-            gap: 20px;
-            margin-top: 30px;
-        }}
-        .news-item {{
-            background-color: #fff;
-            border: 1px solid #ddd;
-            border-radius: 8px;
-            padding: 20px;
-            transition: transform 0.2s, box-shadow 0.2s;
-            overflow: hidden;
-        }}
-        .news-item:hover {{
-            transform: translateY(-2px);
-            box-shadow: 0 4px 12px rgba(0,0,0,0.15);
-        }}
-        .news-image {{
-            width: 100%;
-            height: 250px;
-            object-fit: cover;
-            border-radius: 8px;
-            margin-bottom: 15px;
-            background-color: #f8f9fa;
-            image-rendering: -webkit-optimize-contrast;
-            image-rendering: crisp-edges;
-            image-rendering: high-quality;
-            filter: contrast(1.1) saturate(1.1);
-            transition: transform 0.3s ease;
-        }}
-        .news-image:hover {{
-            transform: scale(1.02);
-        }}
-        .news-image-placeholder {{
-            width: 100%;
-            height: 200px;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            border-radius: 6px;
-            margin-bottom: 15px;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            color: white;
-            font-size: 1.2em;
-            font-weight: bold;
-        }}
-        .news-title {{
-            color: #2c3e50;
-            font-size: 1.1em;
-            font-weight: bold;
-            margin-bottom: 10px;
-        }}
-        .news-title a {{
-            color: #2c3e50;
-            text-decoration: none;
-        }}
-        .news-title a:hover {{
-            color: #3498db;
-        }}
-        .news-source {{
-            color: #7f8c8d;
-            font-size: 0.9em;
-            margin-bottom: 8px;
-        }}
-        .news-date {{
-            color: #95a5a6;
-            font-size: 0.8em;
-            margin-bottom: 10px;
-        }}
-        .news-snippet {{
-            color: #34495e;
-            line-height: 1.5;
-        }}
-        .no-news {{
-            text-align: center;
-            color: #7f8c8d;
-            font-style: italic;
-            padding: 40px;
-        }}
-        /* Image quality improvements */
-        .news-image {{
-            -webkit-backface-visibility: hidden;
-            backface-visibility: hidden;
-            -webkit-transform: translateZ(0);
-            transform: translateZ(0);
-        }}
-        /* Better image rendering for high DPI displays */
-        @media (-webkit-min-device-pixel-ratio: 2), (min-resolution: 192dpi) {{
-            .news-image {{
-                image-rendering: -webkit-optimize-contrast;
-                image-rendering: crisp-edges;
-            }}
-        }}
-    </style>
-    <script>
-        // Image quality enhancement script
-        document.addEventListener('DOMContentLoaded', function() {{
-            const images = document.querySelectorAll('.news-image');
-            images.forEach(img => {{
-                // Force high quality rendering
-                img.style.imageRendering = 'high-quality';
-                img.style.imageRendering = '-webkit-optimize-contrast';
-                
-                // Add error handling for better fallback
-                img.addEventListener('error', function() {{
-                    this.style.display = 'none';
-                    const placeholder = this.nextElementSibling;
-                    if (placeholder && placeholder.classList.contains('news-image-placeholder')) {{
-                        placeholder.style.display = 'flex';
-                    }}
-                }});
-                
-                // Add load event for smooth transition
-                img.addEventListener('load', function() {{
-                    this.style.opacity = '1';
-                }});
-            }});
-        }});
-    </script>
+{assets_html}
 </head>
 <body>
     <div class="container">
@@ -236,7 +160,9 @@ class WebGenerator:
         
         <div class="summary">
             <h2>News Analysis</h2>
-            {summary}
+"""
+        yield summary
+        yield """
         </div>
         
         <h2>📋 Recent Articles</h2>
@@ -244,62 +170,93 @@ class WebGenerator:
 """
         
         if news_articles:
-            for article in news_articles:
-                # Get the best quality image URL
-                image_url = self.image_handler.get_best_image_url(article)
-                
+            for article, image_url in zip(news_articles, image_urls):
+                title, source = article.text('title'), article.text('source')
+                alt = html.escape(title, quote=True)
                 # Create image HTML with better error handling and quality optimization
                 if image_url:
-                    # Convert absolute path to relative path for local images
-                    if os.path.isabs(image_url) and self.image_handler.download_images:
-                        # Get relative path from current directory
-                        rel_path = os.path.relpath(image_url, os.getcwd())
-                        image_src = rel_path
-                    else:
-                        image_src = image_url
+                    image_src = self._image_src(image_url)
+                    
+                    # Let the browser pick the smallest variant that fills the card
+                    responsive_attrs = ''
+                    variants = image_variants.get(image_url)
+                    if variants and variants['variants']:
+                        srcset = ", ".join(
+                            f"{self._image_src(variant['path'])} {variant['width']}w"
+                            for variant in variants['variants']
+                        )
+                        largest = variants['variants'][-1]
+                        responsive_attrs = (
+                            f'\n                        srcset="{srcset}"'
+                            f'\n                        sizes="{self.IMAGE_SIZES}"'
+                            f'\n                        width="{largest["width"]}" height="{largest["height"]}"'
+                        )
                     
                     # Add loading="lazy" for better performance and srcset for responsive images
-                    image_html = f'''<img src="{image_src}" 
-                        alt="{article["title"]}" 
+                    if self.minify:
+                        # The page script fades images in and swaps failed ones
+                        # for their placeholder, so no per-image handlers are needed
+                        image_html = (f'<img src="{image_src}"{responsive_attrs} alt="{alt}" '
+                                      f'class="news-image" loading="lazy">')
+                    else:
+                        image_html = f'''<img src="{image_src}"{responsive_attrs}
+                        alt="{alt}" 
                         class="news-image" 
                         loading="lazy"
                         onerror="this.style.display='none'; this.nextElementSibling.style.display='flex';"
                         onload="this.style.opacity='1';"
                         style="opacity:0; transition: opacity 0.3s ease;">'''
-                    placeholder_html = f'<div class="news-image-placeholder" style="display:none;">📰 {article["source"]}</div>'
+                    placeholder_html = f'<div class="news-image-placeholder" style="display:none;">📰 {source}</div>'
                 else:
                     image_html = ''
-                    placeholder_html = f'<div class="news-image-placeholder">📰 {article["source"]}</div>'
+                    placeholder_html = f'<div class="news-image-placeholder">📰 {source}</div>'
+                
+                # Other outlets that ran the same story
+                related_html = ''
+                if article.related_sources:
+                    # Raw search strings: headlines often contain quotes
+                    related_links = ", ".join(
+                        '<a href="{}" target="_blank" title="{}">{}</a>'.format(
+                            *(html.escape(related[key], quote=True) for key in ('link', 'title', 'source'))
+                        )
+                        for related in article.related_sources
+                    )
+                    related_html = f'\n                <div class="news-related">Also reported by: {related_links}</div>'
                 
-                html_content += f"""
+                yield f"""
             <div class="news-item">
                 {image_html}
                 {placeholder_html}
                 <div class="news-title">
-                    <a href="{article['link']}" target="_blank">{article['title']}</a>
+                    <a href="{article.link or ''}" target="_blank">{title}</a>
                 </div>
-                <div class="news-source">Source: {article['source']}</div>
-                <div class="news-date">Date: {article['date']}</div>
-                <div class="news-snippet">{article['snippet']}</div>
+                <div class="news-source">Source: {source}</div>
+                <div class="news-date">Date: {article.text('date')}</div>{related_html}
+                <div class="news-snippet">{article.text('snippet')}</div>
             </div>
 """
         else:
-            html_content += """
+            yield """
             <div class="no-news">
                 <p>No recent news articles found for this topic.</p>
             </div>
 """
         
-        html_content += """
+        yield """
         </div>
     </div>
 </body>
 </html>
 """
-        
-        return html_content
     
-    def save_web_page(self, html_content: str, filename: str = None) -> str:
+    def _image_src(self, image: str) -> str:
+        """Image reference usable from the page: local files become relative paths"""
+        if os.path.isabs(image) and self.image_handler.download_images:
+            # Get relative path from current directory
+            return os.path.relpath(image, os.getcwd())
+        return image
+    
+    def save_web_page(self, html_content: str, filename: Optional[str] = None) -> str:
         """
         Save the HTML content to a file
         
@@ -310,17 +267,38 @@ class WebGenerator:
         Returns:
             Path to the saved file
         """
+        return self._write_page([html_content], filename)
+    
+    def _write_page(self, chunks: Iterable[str], filename: Optional[str] = None) -> str:
+        """Stream chunks into a temporary file and atomically move it into place"""
         if not filename:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"news_page_{timestamp}.html"
+            filename = default_page_name()
         
         filepath = os.path.join(os.getcwd(), filename)
+        directory = os.path.dirname(filepath)
+        temp_path = ''
         
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(html_content)
+            if self.asset_mode == 'external':
+                self.write_assets(directory)
+            fd, temp_path = tempfile.mkstemp(prefix='.', suffix='.html.tmp', dir=directory)
+            with self.metrics.span('page.write'):
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    for chunk in chunks:
+                        f.write(chunk)
+                os.chmod(temp_path, 0o644)
+                # Siblings of an earlier version must never be served with
+                # the new page, so they are replaced (or removed) first
+                if self.precompress:
+                    write_precompressed(temp_path, filepath)
+                else:
+                    remove_precompressed(filepath)
+                os.replace(temp_path, filepath)
+            self.metrics.incr('page_bytes', os.path.getsize(filepath))
             print(f"✅ Web page saved to: {filepath}")
             return filepath
         except Exception as e:
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
             print(f"❌ Error saving web page: {e}")
             return ""
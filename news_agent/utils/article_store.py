@@ -0,0 +1,158 @@
+"""
+Local history of articles seen by previous runs
+"""
+
+import os
+import json
+import time
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from typing import Dict, Any, Iterable, List, Optional
+
+from .db import connect, transaction
+
+# Query parameters that only track the click and never change the article
+TRACKING_PARAMS = frozenset({
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'ocid', 'cmpid', 'mc_cid', 'mc_eid',
+    'ref', 'ref_src', 'smid', 'guccounter', 'taid', 'ito',
+})
+
+
+def canonical_link(url: str) -> str:
+    """
+    Normalize an article URL so the same story maps to the same key
+
+    Lowercases scheme and host, drops the fragment, tracking parameters
+    (``utm_*`` and friends) and trailing slashes, and sorts the remaining
+    query parameters.
+
+    Args:
+        url: Article URL as returned by the search
+
+    Returns:
+        Canonical form of the URL ('' for an empty URL)
+    """
+    url = (url or '').strip()
+    if not url:
+        return ''
+
+    parts = urlsplit(url)
+    query = sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not name.lower().startswith('utm_') and name.lower() not in TRACKING_PARAMS
+    )
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme.lower(), host, path, urlencode(query), ''))
+
+
+class ArticleStore:
+    """
+    SQLite-backed record of every article a run has processed
+
+    Keyed by canonical link, each entry keeps when the article was first and
+    last seen, the image it resolved to (remote URL and local path) and any
+    derived data, so later runs can skip work for articles they already know.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with connect(self.path) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS articles ('
+                ' link TEXT PRIMARY KEY,'
+                ' first_seen REAL NOT NULL,'
+                ' last_seen REAL NOT NULL,'
+                ' image_url TEXT NOT NULL,'
+                ' image_path TEXT NOT NULL,'
+                ' data TEXT NOT NULL)'
+            )
+
+    def get_many(self, links: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch stored entries for a set of canonical links
+
+        Args:
+            links: Canonical links (see ``canonical_link``)
+
+        Returns:
+            Mapping of link to entry dict with first_seen, last_seen,
+            image_url, image_path and data; unknown links are omitted
+        """
+        links = [link for link in set(links) if link]
+        entries: Dict[str, Dict[str, Any]] = {}
+        with connect(self.path) as conn:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(links), 500):
+                chunk = links[start:start + 500]
+                rows = conn.execute(
+                    'SELECT link, first_seen, last_seen, image_url, image_path, data FROM articles'
+                    f" WHERE link IN ({', '.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                for link, first_seen, last_seen, image_url, image_path, data in rows:
+                    entries[link] = {
+                        'first_seen': first_seen,
+                        'last_seen': last_seen,
+                        'image_url': image_url,
+                        'image_path': image_path,
+                        'data': json.loads(data),
+                    }
+        return entries
+
+    def record_many(self, records: List[Dict[str, Any]]) -> None:
+        """
+        Insert or update entries, keeping the original first-seen time
+
+        Args:
+            records: Dicts with 'link' (canonical) and optionally 'image_url',
+                'image_path' and 'data' (JSON-serializable derived data)
+        """
+        records = [record for record in records if record.get('link')]
+        if not records:
+            return
+
+        now = time.time()
+        with connect(self.path) as conn, transaction(conn):
+            conn.executemany(
+                'INSERT INTO articles (link, first_seen, last_seen, image_url, image_path, data)'
+                ' VALUES (?, ?, ?, ?, ?, ?)'
+                ' ON CONFLICT(link) DO UPDATE SET'
+                '  last_seen = excluded.last_seen,'
+                '  image_url = excluded.image_url,'
+                '  image_path = excluded.image_path,'
+                '  data = excluded.data',
+                [
+                    (
+                        record['link'], now, now,
+                        record.get('image_url') or '',
+                        record.get('image_path') or '',
+                        json.dumps(record.get('data') or {}, ensure_ascii=False),
+                    )
+                    for record in records
+                ]
+            )
+
+    def prune(self, max_age_days: float) -> int:
+        """
+        Forget articles no run has seen for a while
+
+        Args:
+            max_age_days: Days since an article was last seen after which
+                its entry is deleted
+
+        Returns:
+            Number of entries deleted
+        """
+        cutoff = time.time() - max_age_days * 86400
+        with connect(self.path) as conn, transaction(conn):
+            deleted = conn.execute('DELETE FROM articles WHERE last_seen < ?', (cutoff,)).rowcount
+        return deleted
+
+    def get(self, link: str) -> Optional[Dict[str, Any]]:
+        """Stored entry for one canonical link, or None"""
+        return self.get_many([link]).get(link)
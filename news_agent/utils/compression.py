@@ -0,0 +1,98 @@
+"""
+gzip/brotli compression of generated files
+"""
+
+import os
+import gzip
+import tempfile
+from typing import List, Optional
+
+try:
+    import brotli
+except ImportError:  # Optional; only gzip is produced without it
+    brotli = None
+
+# File suffix of each content coding
+SUFFIXES = {'gzip': '.gz', 'br': '.br'}
+
+
+def brotli_available() -> bool:
+    """Whether the optional brotli package is installed"""
+    return brotli is not None
+
+
+def compress(data: bytes, encoding: str, level: Optional[int] = None) -> Optional[bytes]:
+    """
+    Compress bytes with a content coding
+
+    Args:
+        data: Bytes to compress
+        encoding: 'gzip' or 'br'
+        level: gzip level (default 9) or brotli quality (default 11)
+
+    Returns:
+        Compressed bytes, or None if the coding is unavailable
+    """
+    if encoding == 'gzip':
+        # A fixed mtime keeps the output identical for identical input
+        return gzip.compress(data, compresslevel=9 if level is None else level, mtime=0)
+    if encoding == 'br' and brotli is not None:
+        return brotli.compress(data, quality=11 if level is None else level)
+    return None
+
+
+def write_precompressed(path: str, target: Optional[str] = None) -> List[str]:
+    """
+    Write ``.gz`` and ``.br`` siblings of a file for static hosts
+
+    Each sibling is written to a temporary file and renamed into place. A
+    sibling that cannot be produced (brotli missing) is removed instead, so
+    a host never serves bytes of an older version.
+
+    Args:
+        path: File to compress
+        target: File the siblings are named after (default: ``path``), e.g.
+            the final name of a file still being written under a temporary one
+
+    Returns:
+        Paths of the siblings written
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    target = target or path
+    written = []
+    directory = os.path.dirname(target) or '.'
+    for encoding, suffix in SUFFIXES.items():
+        sibling = target + suffix
+        compressed = compress(data, encoding)
+        if compressed is None:
+            remove_precompressed(target, [encoding])
+            continue
+        fd, temp_path = tempfile.mkstemp(prefix='.', suffix=suffix + '.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(compressed)
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, sibling)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        written.append(sibling)
+    return written
+
+
+def remove_precompressed(path: str, encodings: Optional[List[str]] = None) -> None:
+    """
+    Remove compressed siblings left by an earlier version of a file
+
+    Args:
+        path: File whose siblings are removed
+        encodings: Codings to remove (default: all)
+    """
+    for encoding in encodings or SUFFIXES:
+        try:
+            os.remove(path + SUFFIXES[encoding])
+        except FileNotFoundError:
+            pass
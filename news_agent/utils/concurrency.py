@@ -0,0 +1,135 @@
+"""
+Concurrency helpers for the News Agent
+"""
+
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from urllib.parse import urlparse
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+
+class HostLimiter:
+    """Caps the number of concurrent requests made to any single host"""
+
+    def __init__(self, per_host: int = 4):
+        self.per_host = max(1, per_host)
+        self._lock = threading.Lock()
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+
+    def _semaphore(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.per_host)
+                self._semaphores[host] = semaphore
+            return semaphore
+
+    @contextmanager
+    def slot(self, url: str) -> Iterator[None]:
+        """
+        Hold one of the host's request slots for the duration of the block
+
+        Args:
+            url: URL about to be requested; its host selects the slot pool
+        """
+        host = (urlparse(url).hostname or '').lower()
+        semaphore = self._semaphore(host)
+        with semaphore:
+            yield
+
+
+class ByteBudget:
+    """Thread-safe allowance of bytes shared by concurrent downloads"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def consume(self, amount: int) -> bool:
+        """
+        Take bytes from the budget
+
+        Args:
+            amount: Bytes about to be accepted
+
+        Returns:
+            False (and nothing is taken) if the budget cannot cover them
+        """
+        with self._lock:
+            if self.used + amount > self.limit:
+                return False
+            self.used += amount
+            return True
+
+    def remaining(self) -> int:
+        """Bytes still available"""
+        with self._lock:
+            return max(0, self.limit - self.used)
+
+
+class Stage(NamedTuple):
+    """One step of a pipeline run by run_stages"""
+
+    name: str
+    # Called with the results of ``deps``, in that order
+    func: Callable[..., Any]
+    deps: Tuple[str, ...] = ()
+
+
+def run_stages(stages: List[Stage], max_workers: Optional[int] = None,
+               thread_name_prefix: str = 'stage') -> Dict[str, Any]:
+    """
+    Run a dependency graph of stages, each as soon as its inputs are ready
+
+    Stages that do not depend on each other run at the same time, so the
+    graph takes as long as its slowest path rather than the sum of its
+    stages.
+
+    Args:
+        stages: Stages in any order; dependencies are referenced by name
+        max_workers: Stages running at once (default: all of them)
+        thread_name_prefix: Name prefix of the worker threads
+
+    Returns:
+        Result of each stage by name
+
+    Raises:
+        ValueError: A dependency is unknown or the stages form a cycle
+        Exception: The first exception raised by a stage, once the stages
+            already running have finished; stages that depend on it never start
+    """
+    names = {stage.name for stage in stages}
+    for stage in stages:
+        unknown = [dep for dep in stage.deps if dep not in names]
+        if unknown:
+            raise ValueError(f"stage {stage.name!r} depends on unknown stages {unknown}")
+
+    results: Dict[str, Any] = {}
+    waiting = list(stages)
+    running = {}
+    error: Optional[BaseException] = None
+    with ThreadPoolExecutor(max_workers=max_workers or len(stages) or 1,
+                            thread_name_prefix=thread_name_prefix) as pool:
+        while True:
+            if error is None:
+                ready = [stage for stage in waiting if all(dep in results for dep in stage.deps)]
+                for stage in ready:
+                    waiting.remove(stage)
+                    running[pool.submit(stage.func, *(results[dep] for dep in stage.deps))] = stage
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                try:
+                    results[stage.name] = future.result()
+                except Exception as e:
+                    error = error or e
+
+    if error is not None:
+        raise error
+    if waiting:
+        raise ValueError(f"stages {[stage.name for stage in waiting]} form a dependency cycle")
+    return results
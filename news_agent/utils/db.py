@@ -0,0 +1,43 @@
+"""
+SQLite helpers shared by the News Agent's on-disk stores
+"""
+
+import sqlite3
+from contextlib import contextmanager
+from typing import Iterator
+
+
+@contextmanager
+def connect(path: str) -> Iterator[sqlite3.Connection]:
+    """
+    Open an autocommit connection that is closed when the block exits
+
+    Writers that need atomic multi-statement updates should wrap them in
+    ``transaction``; the generous busy timeout lets several processes share
+    one database file.
+
+    Args:
+        path: Database file path
+    """
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+@contextmanager
+def transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """
+    Run the block inside a write transaction, rolling back on error
+
+    Args:
+        conn: Connection opened with ``connect``
+    """
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        yield conn
+    except BaseException:
+        conn.execute('ROLLBACK')
+        raise
+    conn.execute('COMMIT')
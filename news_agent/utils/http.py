@@ -0,0 +1,158 @@
+"""
+Shared HTTP client for the News Agent
+"""
+
+import time
+import random
+import threading
+from urllib.parse import urlparse
+from typing import Dict, Any, Iterator, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class HttpClient:
+    """
+    Pooled HTTP client used for every outbound request
+
+    One ``requests.Session`` keeps connections alive per host, requests get
+    default connect/read timeouts, and 429/5xx responses or connection
+    failures are retried with jittered exponential backoff. Request counts,
+    latency and transferred bytes are tracked per host.
+    """
+
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(self, pool_size: int = 10, connect_timeout: float = 5.0, read_timeout: float = 20.0,
+                 max_retries: int = 3, backoff_base: float = 0.5, backoff_max: float = 8.0):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = 'news-agent/1.0'
+        adapter = HTTPAdapter(pool_connections=max(10, pool_size), pool_maxsize=max(1, pool_size))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def get(self, url: str, **kwargs: Any) -> requests.Response:
+        """Send a GET request (see ``request``)"""
+        return self.request('GET', url, **kwargs)
+
+    def head(self, url: str, **kwargs: Any) -> requests.Response:
+        """Send a HEAD request (see ``request``)"""
+        return self.request('HEAD', url, **kwargs)
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        """
+        Send a request through the shared session, retrying transient failures
+
+        Args:
+            method: HTTP method
+            url: Request URL
+            **kwargs: Passed to ``requests.Session.request``; ``timeout``
+                defaults to the client's connect/read timeouts
+
+        Returns:
+            The response. Bodies of streamed responses should be read through
+            ``iter_content`` so their bytes are counted.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        host = (urlparse(url).hostname or '').lower()
+        stream = kwargs.get('stream', False)
+
+        attempt = 0
+        while True:
+            start = time.monotonic()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                self._record(host, time.monotonic() - start, error=True)
+                if attempt >= self.max_retries:
+                    raise
+                self._retry_wait(host, attempt)
+                attempt += 1
+                continue
+
+            latency = time.monotonic() - start
+            if response.status_code in self.RETRY_STATUSES and attempt < self.max_retries:
+                self._record(host, latency, error=True)
+                retry_after = response.headers.get('Retry-After', '')
+                response.close()
+                self._retry_wait(host, attempt, retry_after)
+                attempt += 1
+                continue
+
+            received = 0 if stream else len(response.content)
+            self._record(host, latency, received)
+            return response
+
+    def iter_content(self, response: requests.Response, chunk_size: int = 8192) -> Iterator[bytes]:
+        """
+        Iterate over a streamed response body, counting the bytes received
+
+        Args:
+            response: Response obtained with ``stream=True``
+            chunk_size: Read size in bytes
+        """
+        host = (urlparse(response.url).hostname or '').lower()
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            if chunk:
+                self._add(host, 'bytes', len(chunk))
+                yield chunk
+
+    def _retry_wait(self, host: str, attempt: int, retry_after: str = '') -> None:
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        # Full jitter spreads retries from concurrent workers apart
+        delay = random.uniform(0, delay)
+        if retry_after.isdigit():
+            delay = max(delay, min(float(retry_after), self.backoff_max))
+        self._add(host, 'retries', 1)
+        time.sleep(delay)
+
+    def _record(self, host: str, latency: float, received: int = 0, error: bool = False) -> None:
+        with self._stats_lock:
+            counters = self._counters(host)
+            counters['requests'] += 1
+            counters['errors'] += 1 if error else 0
+            counters['bytes'] += received
+            counters['latency'] += latency
+            counters['max_latency'] = max(counters['max_latency'], latency)
+
+    def _add(self, host: str, name: str, amount: float) -> None:
+        with self._stats_lock:
+            self._counters(host)[name] += amount
+
+    def _counters(self, host: str) -> Dict[str, float]:
+        counters = self._stats.get(host)
+        if counters is None:
+            counters = dict.fromkeys(('requests', 'errors', 'retries', 'bytes', 'latency', 'max_latency'), 0)
+            self._stats[host] = counters
+        return counters
+
+    def stats(self, host: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+        """
+        Request counters per host since the client was created
+
+        Args:
+            host: Only return the counters of this host
+
+        Returns:
+            Mapping of host to requests, errors, retries, bytes, total and
+            maximum latency in seconds
+        """
+        with self._stats_lock:
+            return {
+                name: dict(counters)
+                for name, counters in self._stats.items()
+                if host is None or name == host
+            }
+
+    def close(self) -> None:
+        """Close all pooled connections"""
+        self.session.close()
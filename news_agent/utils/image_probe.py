@@ -0,0 +1,112 @@
+"""
+Image format sniffing and dimension probing from header bytes
+"""
+
+import struct
+from typing import Optional, Tuple
+
+# File extension used for each sniffed format
+EXTENSIONS = {
+    'jpeg': '.jpg',
+    'png': '.png',
+    'gif': '.gif',
+    'webp': '.webp',
+}
+
+# JPEG start-of-frame markers carry the image size (DHT, JPG and DAC share the range)
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def sniff_format(data: bytes) -> str:
+    """
+    Identify an image format from its first bytes
+
+    Args:
+        data: Beginning of the file (at least 12 bytes)
+
+    Returns:
+        'jpeg', 'png', 'gif' or 'webp', or '' if the bytes are not one of them
+    """
+    if data.startswith(b'\xff\xd8\xff'):
+        return 'jpeg'
+    if data.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if data[:6] in (b'GIF87a', b'GIF89a'):
+        return 'gif'
+    if len(data) >= 12 and data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'webp'
+    return ''
+
+
+def probe_dimensions(data: bytes) -> Optional[Tuple[int, int]]:
+    """
+    Read the pixel size of an image from its header bytes
+
+    Args:
+        data: Beginning of the file; JPEG may need several kilobytes when
+            large metadata segments precede the frame header
+
+    Returns:
+        (width, height), or None if the format is unknown or more bytes
+        are needed
+    """
+    fmt = sniff_format(data)
+    try:
+        if fmt == 'png':
+            if len(data) >= 24 and data[12:16] == b'IHDR':
+                return struct.unpack('>II', data[16:24])
+        elif fmt == 'gif':
+            if len(data) >= 10:
+                return struct.unpack('<HH', data[6:10])
+        elif fmt == 'webp':
+            return _probe_webp(data)
+        elif fmt == 'jpeg':
+            return _probe_jpeg(data)
+    except struct.error:
+        pass
+    return None
+
+
+def _probe_webp(data: bytes) -> Optional[Tuple[int, int]]:
+    chunk = data[12:16]
+    if chunk == b'VP8 ' and len(data) >= 30:
+        # Lossy: 14-bit sizes after the frame tag and start code
+        width, height = struct.unpack('<HH', data[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b'VP8L' and len(data) >= 25:
+        # Lossless: 14-bit width-1 and height-1 packed after the signature byte
+        bits = int.from_bytes(data[21:25], 'little')
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b'VP8X' and len(data) >= 30:
+        # Extended: 24-bit canvas width-1 and height-1
+        width = int.from_bytes(data[24:27], 'little') + 1
+        height = int.from_bytes(data[27:30], 'little') + 1
+        return width, height
+    return None
+
+
+def _probe_jpeg(data: bytes) -> Optional[Tuple[int, int]]:
+    offset = 2
+    while offset + 4 <= len(data):
+        if data[offset] != 0xFF:
+            return None
+        marker = data[offset + 1]
+        if marker == 0xFF:
+            # Fill byte before a marker
+            offset += 1
+            continue
+        if marker in (0x01, 0xD8) or 0xD0 <= marker <= 0xD7:
+            # Standalone markers have no length field
+            offset += 2
+            continue
+        length = struct.unpack('>H', data[offset + 2:offset + 4])[0]
+        if marker in _JPEG_SOF_MARKERS:
+            if offset + 9 > len(data):
+                return None
+            height, width = struct.unpack('>HH', data[offset + 5:offset + 9])
+            return width, height
+        if marker == 0xDA:
+            # Start of scan without a frame header: not a usable JPEG
+            return None
+        offset += 2 + length
+    return None
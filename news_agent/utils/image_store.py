@@ -0,0 +1,332 @@
+"""
+Content-addressed storage for downloaded images
+"""
+
+import os
+import time
+import shutil
+import hashlib
+import tempfile
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .db import connect, transaction
+
+
+class ImageStore:
+    """
+    Stores image files under a hash of their bytes
+
+    A URL index remembers which blob each URL resolved to together with the
+    origin's ETag and Last-Modified validators, so repeat downloads can be
+    made conditional and identical images served under different URLs share
+    a single file.
+
+    A blob manifest records each file's size and last access, and the pages
+    that reference it. Eviction walks unreferenced blobs in least recently
+    used order, so it only touches the files it removes.
+    """
+
+    def __init__(self, images_dir: str, index_path: str, temp_dir: Optional[str] = None):
+        """
+        Args:
+            images_dir: Directory holding the image files
+            index_path: SQLite file of the URL index
+            temp_dir: Where downloads are written until complete (defaults to
+                a ``tmp`` directory next to the index, outside images_dir)
+        """
+        self.images_dir = images_dir
+        self.index_path = index_path
+        self.temp_dir = temp_dir or os.path.join(os.path.dirname(self.index_path), 'tmp')
+
+        os.makedirs(self.images_dir, exist_ok=True)
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        os.makedirs(self.temp_dir, exist_ok=True)
+        with connect(self.index_path) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS urls ('
+                ' url TEXT PRIMARY KEY,'
+                ' blob TEXT NOT NULL,'
+                ' etag TEXT,'
+                ' last_modified TEXT,'
+                ' fetched_at REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS urls_blob ON urls (blob)')
+            adopt = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'blobs'"
+            ).fetchone() is None
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS blobs ('
+                ' blob TEXT PRIMARY KEY,'
+                ' size INTEGER NOT NULL,'
+                ' accessed_at REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS blobs_accessed ON blobs (accessed_at)')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS page_refs ('
+                ' page TEXT NOT NULL,'
+                ' blob TEXT NOT NULL,'
+                ' PRIMARY KEY (page, blob))'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS page_refs_blob ON page_refs (blob)')
+        if adopt:
+            self._adopt_existing()
+
+    def _adopt_existing(self) -> None:
+        """Enter files stored before the manifest existed, once"""
+        rows = []
+        with os.scandir(self.images_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and not entry.name.startswith('.'):
+                    stat = entry.stat()
+                    rows.append((entry.name, stat.st_size, stat.st_mtime))
+        if rows:
+            with connect(self.index_path) as conn, transaction(conn):
+                conn.executemany(
+                    'INSERT OR IGNORE INTO blobs (blob, size, accessed_at) VALUES (?, ?, ?)', rows
+                )
+
+    def blob_path(self, blob: str) -> str:
+        """Absolute path of a stored blob"""
+        return os.path.join(self.images_dir, blob)
+
+    def lookup(self, url: str) -> Optional[Dict[str, str]]:
+        """
+        Find the stored blob for a URL
+
+        Args:
+            url: Image URL
+
+        Returns:
+            Dict with 'path', 'etag' and 'last_modified', or None when the URL
+            is unknown or its blob has been removed from disk
+        """
+        with connect(self.index_path) as conn:
+            row = conn.execute(
+                'SELECT blob, etag, last_modified FROM urls WHERE url = ?', (url,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        path = self.blob_path(row[0])
+        if not os.path.isfile(path):
+            return None
+        return {'path': path, 'etag': row[1] or '', 'last_modified': row[2] or ''}
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """
+        Request headers that let the origin answer 304 for an unchanged image
+
+        Args:
+            url: Image URL
+
+        Returns:
+            If-None-Match / If-Modified-Since headers (empty if nothing stored)
+        """
+        entry = self.lookup(url)
+        if not entry:
+            return {}
+
+        headers = {}
+        if entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def revalidated(self, url: str) -> Optional[str]:
+        """
+        Record that the origin confirmed the stored copy is still current
+
+        Args:
+            url: Image URL that returned 304 Not Modified
+
+        Returns:
+            Local path of the stored blob, or None if it is no longer on disk
+        """
+        entry = self.lookup(url)
+        if not entry:
+            return None
+
+        now = time.time()
+        with connect(self.index_path) as conn, transaction(conn):
+            conn.execute('UPDATE urls SET fetched_at = ? WHERE url = ?', (now, url))
+            self._touch(conn, [os.path.basename(entry['path'])], now)
+        return entry['path']
+
+    def save(self, url: str, chunks: Iterable[bytes], ext: str,
+             etag: str = '', last_modified: str = '') -> str:
+        """
+        Stream an image into the store
+
+        Args:
+            url: URL the bytes were fetched from
+            chunks: Body chunks
+            ext: File extension including the dot
+            etag: ETag response header, if any
+            last_modified: Last-Modified response header, if any
+
+        Returns:
+            Local path of the stored blob
+
+        Raises:
+            Whatever the chunk iterator raises; the partial file is removed
+            and never appears in images_dir
+        """
+        digest = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(prefix='partial-', dir=self.temp_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in chunks:
+                    if chunk:
+                        digest.update(chunk)
+                        f.write(chunk)
+
+            blob = f"{digest.hexdigest()[:32]}{ext}"
+            path = self.blob_path(blob)
+            size = os.path.getsize(temp_path)
+            if os.path.exists(path):
+                os.remove(temp_path)
+            else:
+                os.chmod(temp_path, 0o644)
+                # Atomic on one filesystem; copies then removes across devices
+                shutil.move(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        now = time.time()
+        with connect(self.index_path) as conn, transaction(conn):
+            conn.execute(
+                'INSERT OR REPLACE INTO urls (url, blob, etag, last_modified, fetched_at)'
+                ' VALUES (?, ?, ?, ?, ?)',
+                (url, blob, etag or None, last_modified or None, now)
+            )
+            conn.execute(
+                'INSERT INTO blobs (blob, size, accessed_at) VALUES (?, ?, ?)'
+                ' ON CONFLICT(blob) DO UPDATE SET accessed_at = excluded.accessed_at',
+                (blob, size, now)
+            )
+        return path
+
+    def _blob_of(self, path: str) -> Optional[str]:
+        """Blob name of a path inside images_dir, or None for anything else"""
+        if not path or '://' in path:
+            return None
+        path = os.path.abspath(path)
+        if os.path.dirname(path) != os.path.abspath(self.images_dir):
+            return None
+        return os.path.basename(path)
+
+    @staticmethod
+    def _touch(conn, blobs: List[str], now: float) -> None:
+        conn.executemany(
+            'UPDATE blobs SET accessed_at = ? WHERE blob = ?', [(now, blob) for blob in blobs]
+        )
+
+    def record_page(self, page: str, image_paths: Iterable[str]) -> None:
+        """
+        Record the images a written page references
+
+        Replaces the page's previous references and marks the images as
+        accessed. Referenced images are never evicted while the page exists.
+
+        Args:
+            page: Path of the generated page
+            image_paths: Images shown on the page; remote URLs and files
+                outside images_dir are ignored
+        """
+        page = os.path.abspath(page)
+        blobs = sorted({blob for blob in map(self._blob_of, image_paths) if blob})
+        now = time.time()
+        with connect(self.index_path) as conn, transaction(conn):
+            conn.execute('DELETE FROM page_refs WHERE page = ?', (page,))
+            conn.executemany(
+                'INSERT INTO page_refs (page, blob) VALUES (?, ?)', [(page, blob) for blob in blobs]
+            )
+            self._touch(conn, blobs, now)
+
+    def release_page(self, page: str) -> None:
+        """Drop a page's references, e.g. after deleting it"""
+        with connect(self.index_path) as conn, transaction(conn):
+            conn.execute('DELETE FROM page_refs WHERE page = ?', (os.path.abspath(page),))
+
+    def _prune_pages(self) -> None:
+        """Release pages whose files no longer exist"""
+        with connect(self.index_path) as conn:
+            pages = [row[0] for row in conn.execute('SELECT DISTINCT page FROM page_refs')]
+        for page in pages:
+            if not os.path.exists(page):
+                self.release_page(page)
+
+    def total_bytes(self) -> int:
+        """Size of all stored blobs according to the manifest"""
+        with connect(self.index_path) as conn:
+            return conn.execute('SELECT COALESCE(SUM(size), 0) FROM blobs').fetchone()[0]
+
+    def evict(self, max_bytes: Optional[int] = None, max_age: Optional[float] = None,
+              on_evict: Optional[Callable[[str], None]] = None) -> List[str]:
+        """
+        Remove unreferenced images, least recently used first
+
+        Args:
+            max_bytes: Disk quota; evicts until the store fits under it
+            max_age: Seconds since last access after which an unreferenced
+                image is evicted regardless of the quota
+            on_evict: Called with the path of every removed image (used to
+                drop derived files such as resized variants)
+
+        Returns:
+            Paths of the evicted images
+        """
+        self._prune_pages()
+        unreferenced = (
+            'SELECT blob, size FROM blobs WHERE {} NOT EXISTS'
+            ' (SELECT 1 FROM page_refs WHERE page_refs.blob = blobs.blob)'
+            ' ORDER BY accessed_at'
+        )
+        candidates: Dict[str, int] = {}
+        with connect(self.index_path) as conn:
+            if max_age is not None:
+                cutoff = time.time() - max_age
+                candidates.update(conn.execute(unreferenced.format('accessed_at < ? AND'), (cutoff,)))
+            if max_bytes is not None:
+                total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM blobs').fetchone()[0]
+                total -= sum(candidates.values())
+                if total > max_bytes:
+                    for blob, size in conn.execute(unreferenced.format('')):
+                        if total <= max_bytes:
+                            break
+                        if blob not in candidates:
+                            candidates[blob] = size
+                            total -= size
+        if not candidates:
+            return []
+
+        # Re-check references: a page written since the scan keeps its images
+        evicted = []
+        with connect(self.index_path) as conn, transaction(conn):
+            for blob in candidates:
+                deleted = conn.execute(
+                    'DELETE FROM blobs WHERE blob = ? AND NOT EXISTS'
+                    ' (SELECT 1 FROM page_refs WHERE page_refs.blob = ?)', (blob, blob)
+                ).rowcount
+                if deleted:
+                    conn.execute('DELETE FROM urls WHERE blob = ?', (blob,))
+                    evicted.append(blob)
+
+        paths = []
+        for blob in evicted:
+            path = self.blob_path(blob)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"⚠️  Could not remove image {blob}: {e}")
+                continue
+            if on_evict:
+                on_evict(path)
+            paths.append(path)
+        return paths
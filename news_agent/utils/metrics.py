@@ -0,0 +1,217 @@
+"""
+Lightweight spans and counters for the News Agent
+"""
+
+import json
+import time
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Sorted (label, value) pairs identifying one series of a metric
+Labels = Tuple[Tuple[str, str], ...]
+# Collectors report (metric name, labels, value) for counters kept elsewhere
+Sample = Tuple[str, Dict[str, Any], float]
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    """Escape a Prometheus label value"""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Metrics:
+    """
+    Records timed spans and counters and exports them as a run report
+
+    Spans are aggregated per name and labels (count, total and maximum
+    seconds) and also kept as a bounded list of events for a timeline.
+    Components that already keep their own counters register a collector
+    that is read at export time. A disabled instance records nothing, so
+    instrumented code costs a no-op call.
+    """
+
+    def __init__(self, enabled: bool = True, max_events: int = 10000):
+        """
+        Args:
+            enabled: Record anything at all
+            max_events: Span events kept for the timeline; aggregates are
+                always complete
+        """
+        self.enabled = enabled
+        self.max_events = max_events
+        self.started_at = time.time()
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._spans: Dict[Tuple[str, Labels], List[float]] = {}
+        self._events: List[Dict[str, Any]] = []
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+
+    @contextmanager
+    def span(self, name: str, **labels: Any) -> Iterator[None]:
+        """
+        Time the enclosed block
+
+        Args:
+            name: Span name, e.g. 'stage' or 'llm.invoke'
+            **labels: Dimensions such as stage='images'
+        """
+        if not self.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record_span(name, labels, start, time.perf_counter() - start)
+
+    def _record_span(self, name: str, labels: Dict[str, Any], start: float, duration: float) -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            aggregate = self._spans.get(key)
+            if aggregate is None:
+                self._spans[key] = [1, duration, duration]
+            else:
+                aggregate[0] += 1
+                aggregate[1] += duration
+                aggregate[2] = max(aggregate[2], duration)
+            if len(self._events) < self.max_events:
+                self._events.append({
+                    'name': name,
+                    'labels': dict(key[1]),
+                    'start_s': round(start - self._origin, 6),
+                    'duration_s': round(duration, 6),
+                    'thread': threading.current_thread().name,
+                })
+
+    def incr(self, name: str, amount: float = 1, **labels: Any) -> None:
+        """
+        Add to a counter
+
+        Args:
+            name: Counter name, e.g. 'llm_prompt_chars'
+            amount: Increment
+            **labels: Dimensions of the counter
+        """
+        if not self.enabled:
+            return
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def add_collector(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        """
+        Register a function reporting externally kept counters at export time
+
+        Args:
+            collector: Returns (name, labels, value) samples
+        """
+        if self.enabled:
+            self._collectors.append(collector)
+
+    def _collect(self) -> Dict[Tuple[str, Labels], float]:
+        with self._lock:
+            counters = dict(self._counters)
+        for collector in self._collectors:
+            for name, labels, value in collector():
+                key = (name, _labels(labels))
+                counters[key] = counters.get(key, 0) + value
+        return counters
+
+    def report(self, **extra: Any) -> Dict[str, Any]:
+        """
+        JSON-serializable run report
+
+        Args:
+            **extra: Additional top-level fields, e.g. the topic
+
+        Returns:
+            Dict with start time, duration, aggregated spans, counters and
+            span events
+        """
+        counters = self._collect()
+        with self._lock:
+            spans = {key: list(aggregate) for key, aggregate in self._spans.items()}
+            events = list(self._events)
+        report = {
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started_at)),
+            'duration_s': round(time.perf_counter() - self._origin, 6),
+            **extra,
+            'spans': [
+                {
+                    'name': name,
+                    'labels': dict(labels),
+                    'count': int(count),
+                    'total_s': round(total, 6),
+                    'max_s': round(longest, 6),
+                }
+                for (name, labels), (count, total, longest) in sorted(spans.items())
+            ],
+            'counters': [
+                {'name': name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in sorted(counters.items())
+            ],
+            'events': events,
+        }
+        return report
+
+    def prometheus(self, prefix: str = 'news_agent') -> str:
+        """
+        Counters and span aggregates in the Prometheus text exposition format
+
+        Args:
+            prefix: Prepended to every metric name
+
+        Returns:
+            Exposition text, suitable for a node-exporter textfile collector
+        """
+        def series(name: str, labels: Labels, value: float) -> str:
+            rendered = ','.join(f'{label}="{_escape(text)}"' for label, text in labels)
+            return f"{name}{{{rendered}}} {value:g}" if rendered else f"{name} {value:g}"
+
+        lines = []
+        by_name: Dict[str, List[Tuple[Labels, float]]] = {}
+        for (name, labels), value in sorted(self._collect().items()):
+            by_name.setdefault(name, []).append((labels, value))
+        for name, samples in by_name.items():
+            metric = f"{prefix}_{name.replace('.', '_')}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.extend(series(metric, labels, value) for labels, value in samples)
+
+        with self._lock:
+            spans = sorted((key, list(aggregate)) for key, aggregate in self._spans.items())
+        if spans:
+            metric = f"{prefix}_span_seconds"
+            lines.append(f"# TYPE {metric} summary")
+            for (name, labels), (count, total, _) in spans:
+                labels = (('span', name),) + labels
+                lines.append(series(f"{metric}_sum", labels, total))
+                lines.append(series(f"{metric}_count", labels, count))
+            lines.append(f"# TYPE {metric}_max gauge")
+            for (name, labels), (_, _, longest) in spans:
+                lines.append(series(f"{metric}_max", (('span', name),) + labels, longest))
+        return '\n'.join(lines) + '\n'
+
+    def write(self, json_path: Optional[str] = None, prometheus_path: Optional[str] = None,
+              **extra: Any) -> None:
+        """
+        Export the report to files
+
+        Args:
+            json_path: Destination of the JSON run report
+            prometheus_path: Destination of the Prometheus text export
+            **extra: Additional top-level fields of the JSON report
+        """
+        if not self.enabled:
+            return
+        if json_path:
+            with open(json_path, 'w', encoding='utf-8') as f:
+                json.dump(self.report(**extra), f, indent=2, ensure_ascii=False)
+        if prometheus_path:
+            with open(prometheus_path, 'w', encoding='utf-8') as f:
+                f.write(self.prometheus())
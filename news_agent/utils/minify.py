@@ -0,0 +1,139 @@
+"""
+Conservative HTML, CSS and JavaScript minification for generated pages
+"""
+
+import re
+
+# Elements whose surrounding whitespace never renders
+_BLOCK_TAGS = frozenset({
+    'html', 'head', 'body', 'meta', 'title', 'link', 'style', 'script', 'div', 'p',
+    'ul', 'ol', 'li', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'table', 'thead', 'tbody',
+    'tr', 'td', 'th', 'section', 'article', 'header', 'footer', 'main', 'nav', 'br', 'hr',
+    'blockquote', 'pre', 'figure', 'figcaption', '!doctype',
+})
+
+# Elements whose content is kept apart from the tag/text tokenizer
+# A tag starts with '<' followed by a letter, '/' or '!' (a bare '<' is
+# text, as in '<5%') and runs to the first '>' outside a quoted value
+_TAG = r'<[A-Za-z/!](?:"[^"]*"|\'[^\']*\'|[^\'">])*>'
+_RAW = re.compile(r'(<(script|style|pre|textarea)\b(?:"[^"]*"|\'[^\']*\'|[^\'">])*>)(.*?)(</\2\s*>)',
+                  re.IGNORECASE | re.DOTALL)
+_TOKEN = re.compile(r'(<!--.*?-->|' + _TAG + ')', re.DOTALL)
+_TAG_NAME = re.compile(r'<\s*/?\s*([!a-zA-Z][a-zA-Z0-9]*)')
+_TAG_SPACE = re.compile(r'("[^"]*"|\'[^\']*\')|\s+')
+_WHITESPACE = re.compile(r'\s+')
+
+_CSS_TOKEN = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')|/\*.*?\*/|\s+', re.DOTALL)
+_CSS_PUNCTUATION = re.compile(r'\s*([{};,>])\s*|(:)\s+')
+_CSS_STRING = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')')
+
+
+def minify_css(css: str) -> str:
+    """
+    Strip comments and insignificant whitespace from a stylesheet
+
+    Strings are preserved verbatim.
+
+    Args:
+        css: Stylesheet source
+
+    Returns:
+        Minified stylesheet
+    """
+    collapsed = _CSS_TOKEN.sub(lambda match: match.group(1) or ('' if match.group(0).startswith('/*') else ' '), css)
+    parts = _CSS_STRING.split(collapsed)
+    for index in range(0, len(parts), 2):
+        # Descendant selectors (including 'a :hover') need their space, so
+        # only punctuation is tightened and colons only on their right
+        parts[index] = _CSS_PUNCTUATION.sub(lambda match: match.group(1) or match.group(2),
+                                            parts[index]).replace(';}', '}')
+    return ''.join(parts).strip()
+
+
+def minify_js(js: str) -> str:
+    """
+    Strip indentation, blank lines and whole-line ``//`` comments from a script
+
+    Line breaks are kept so automatic semicolon insertion is unaffected;
+    this is meant for the page's own small script, not arbitrary code.
+
+    Args:
+        js: Script source
+
+    Returns:
+        Minified script
+    """
+    lines = []
+    for line in js.splitlines():
+        line = line.strip()
+        if line and not line.startswith('//'):
+            lines.append(line)
+    return '\n'.join(lines)
+
+
+def _tag_name(tag: str) -> str:
+    match = _TAG_NAME.match(tag)
+    return match.group(1).lower() if match else ''
+
+
+def _minify_markup(markup: str, before: str = '', after: str = '') -> str:
+    """Minify HTML without raw-text elements, between tags named ``before`` and ``after``"""
+    tokens = _TOKEN.split(markup)
+    output = []
+    for index, token in enumerate(tokens):
+        if index % 2:
+            if token.startswith('<!--'):
+                continue
+            tag = _TAG_SPACE.sub(lambda match: match.group(1) or ' ', token)
+            # Only the space before the tag's own closing '>' goes; quoted
+            # values are kept verbatim above
+            if tag.endswith(' >'):
+                tag = tag[:-2] + '>'
+            output.append(tag)
+            continue
+        if not token:
+            continue
+        text = _WHITESPACE.sub(' ', token)
+        if text == ' ':
+            # Whitespace next to a block element does not render; elsewhere
+            # (e.g. between two links) it is a visible space
+            previous = _tag_name(tokens[index - 1]) if index > 0 else before
+            following = _tag_name(tokens[index + 1]) if index + 1 < len(tokens) else after
+            if previous in _BLOCK_TAGS or following in _BLOCK_TAGS:
+                continue
+        output.append(text)
+    return ''.join(output)
+
+
+def minify_html(html: str) -> str:
+    """
+    Minify an HTML fragment without changing how it renders
+
+    Comments are dropped, runs of whitespace collapse to one space and
+    whitespace next to block-level elements is removed. Inline styles and
+    scripts are minified; ``pre`` and ``textarea`` content is left alone.
+    Works on the fragments ``WebGenerator`` streams, which always split
+    between elements.
+
+    Args:
+        html: HTML document or fragment
+
+    Returns:
+        Minified HTML
+    """
+    output = []
+    position = 0
+    previous = ''
+    for match in _RAW.finditer(html):
+        open_tag, name, content, close_tag = match.groups()
+        name = name.lower()
+        output.append(_minify_markup(html[position:match.start()], previous, name))
+        if name == 'style':
+            content = minify_css(content)
+        elif name == 'script':
+            content = minify_js(content)
+        output.append(_minify_markup(open_tag) + content + close_tag)
+        position = match.end()
+        previous = name
+    output.append(_minify_markup(html[position:], previous))
+    return ''.join(output)
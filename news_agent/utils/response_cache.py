@@ -0,0 +1,152 @@
+"""
+Persistent response cache for the News Agent
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, Any, Optional
+
+from .db import connect, transaction
+
+
+class ResponseCache:
+    """
+    On-disk TTL cache for API responses
+
+    Entries live in a SQLite database so several processes can share one
+    cache safely. Each entry belongs to a kind (e.g. 'news', 'images') with
+    its own time-to-live, and the least recently used entries are evicted
+    once the total payload size exceeds ``max_bytes``.
+    """
+
+    def __init__(self, cache_dir: str, ttls: Dict[str, int], max_bytes: int = 64 * 1024 * 1024):
+        self.path = os.path.join(cache_dir, 'responses.sqlite')
+        self.ttls = dict(ttls)
+        self.max_bytes = max_bytes
+
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+        os.makedirs(cache_dir, exist_ok=True)
+        with connect(self.path) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                ' key TEXT PRIMARY KEY,'
+                ' kind TEXT NOT NULL,'
+                ' created_at REAL NOT NULL,'
+                ' accessed_at REAL NOT NULL,'
+                ' size INTEGER NOT NULL,'
+                ' body TEXT NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS responses_lru ON responses (accessed_at)')
+
+    @staticmethod
+    def make_key(kind: str, params: Dict[str, Any]) -> str:
+        """
+        Build a stable cache key from request parameters
+
+        Args:
+            kind: Cache kind the entry belongs to
+            params: Request parameters; ``api_key`` is ignored
+
+        Returns:
+            Hex digest identifying the request
+        """
+        normalized = {
+            str(name): " ".join(str(value).split())
+            for name, value in params.items()
+            if name != 'api_key' and value is not None
+        }
+        payload = json.dumps([kind, normalized], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, kind: str, params: Dict[str, Any]) -> Optional[Any]:
+        """
+        Look up a cached response
+
+        Args:
+            kind: Cache kind, which selects the TTL
+            params: Request parameters
+
+        Returns:
+            Decoded response or None on a miss
+        """
+        key = self.make_key(kind, params)
+        ttl = self.ttls.get(kind, 0)
+        now = time.time()
+
+        try:
+            with connect(self.path) as conn:
+                row = conn.execute(
+                    'SELECT created_at, body FROM responses WHERE key = ?', (key,)
+                ).fetchone()
+                if row is not None and now - row[0] > ttl:
+                    conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                    row = None
+                if row is not None:
+                    conn.execute('UPDATE responses SET accessed_at = ? WHERE key = ?', (now, key))
+        except sqlite3.Error as e:
+            print(f"⚠️  Response cache unavailable: {e}")
+            row = None
+
+        self._count(kind, 'hits' if row is not None else 'misses')
+        return json.loads(row[1]) if row is not None else None
+
+    def set(self, kind: str, params: Dict[str, Any], value: Any) -> None:
+        """
+        Store a response and evict least recently used entries over the size cap
+
+        Args:
+            kind: Cache kind
+            params: Request parameters
+            value: JSON-serializable response
+        """
+        if self.ttls.get(kind, 0) <= 0:
+            return
+
+        key = self.make_key(kind, params)
+        body = json.dumps(value, ensure_ascii=False)
+        size = len(body.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+
+        now = time.time()
+        try:
+            with connect(self.path) as conn, transaction(conn):
+                conn.execute(
+                    'INSERT OR REPLACE INTO responses (key, kind, created_at, accessed_at, size, body)'
+                    ' VALUES (?, ?, ?, ?, ?, ?)',
+                    (key, kind, now, now, size, body)
+                )
+                self._evict(conn)
+        except sqlite3.Error as e:
+            print(f"⚠️  Could not write response cache: {e}")
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        while total > self.max_bytes:
+            rows = conn.execute(
+                'SELECT key, size FROM responses ORDER BY accessed_at LIMIT 32'
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                total -= size
+                if total <= self.max_bytes:
+                    break
+
+    def _count(self, kind: str, outcome: str) -> None:
+        with self._stats_lock:
+            counters = self._stats.setdefault(kind, {'hits': 0, 'misses': 0})
+            counters[outcome] += 1
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Hit and miss counters per cache kind since the cache was created"""
+        with self._stats_lock:
+            return {kind: dict(counters) for kind, counters in self._stats.items()}
@@ -0,0 +1,93 @@
+"""
+Tests for the archive index and its search page
+"""
+
+import os
+import re
+import sys
+import json
+import shutil
+import subprocess
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from news_agent.core.archive import SEARCH_PAGE, ArchiveIndex, tokenize  # noqa: E402
+
+SAMPLES = [
+    'Crème brûlée à la française',
+    'Ångström, Øresund and Łódź',
+    'Ǆemal Bijedić & ǈubljana',
+    'Tiếng Việt: Hà Nội công bố',
+    'नमस्ते दुनिया hindi 2024',
+    'Русский текст and English',
+    'ﬁnance ＡＩ ｍｏｄｅｌ ①②',
+    'a͑b҈c eःf q⃝',
+    'İstanbul STRASSE ſtraße',
+]
+
+
+def articles(day, count=3):
+    return [{
+        'title': f"Story {index} of day {day}",
+        'link': f"https://example.com/story/{index}?utm_source=feed",
+        'source': 'Reuters',
+        'snippet': 'Chip makers report record growth',
+    } for index in range(count)]
+
+
+def test_links_archived_by_an_earlier_run_are_skipped(tmp_path):
+    archive = ArchiveIndex(str(tmp_path / 'archive'))
+    page = str(tmp_path / 'page.html')
+    assert archive.add_run('chips', page, articles(1)) == 3
+    # Same stories (the tracking parameter differs) plus one new one
+    second = articles(2, 4)
+    second[0]['link'] = 'https://example.com/story/0'
+    assert archive.add_run('chips', page, second) == 1
+    titles = [record['title'] for record in archive.search('chip')]
+    assert len(titles) == len(set(titles)) == 4
+    assert len(list(archive.iter_manifest())) == 4
+
+
+def test_archives_without_links_file_are_migrated(tmp_path):
+    archive = ArchiveIndex(str(tmp_path / 'archive'))
+    page = str(tmp_path / 'page.html')
+    archive.add_run('chips', page, articles(1))
+    os.remove(archive.links_path)
+    with open(archive.meta_path, encoding='utf-8') as f:
+        meta = json.load(f)
+    del meta['links_bytes']
+    with open(archive.meta_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    assert ArchiveIndex(archive.archive_dir).add_run('chips', page, articles(2)) == 0
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason='node is not installed')
+def test_search_page_tokenizer_matches_python(tmp_path):
+    script = re.search(r'<script>(.*?)</script>', SEARCH_PAGE, re.DOTALL).group(1)
+    functions = script[script.index('const STOPWORDS'):script.index('const LIMIT')]
+    functions += script[script.index('function tokenize'):script.index('function decode')]
+    path = tmp_path / 'tokenize.js'
+    path.write_text(functions + 'console.log(JSON.stringify(JSON.parse(process.argv[2]).map(tokenize)));',
+                    encoding='utf-8')
+    output = subprocess.run(['node', str(path), json.dumps(SAMPLES)], capture_output=True,
+                            text=True, check=True).stdout
+    # The page deduplicates a query's terms; the order of first occurrence is kept
+    assert json.loads(output) == [list(dict.fromkeys(tokenize(sample))) for sample in SAMPLES]
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason='node is not installed')
+def test_search_page_links_only_web_urls(tmp_path):
+    script = re.search(r'<script>(.*?)</script>', SEARCH_PAGE, re.DOTALL).group(1)
+    function = script[script.index('function safeLink'):script.index('function render')]
+    path = tmp_path / 'safe_link.js'
+    path.write_text("const location = {href: 'file:///archive/search.html'};\n" + function
+                    + "console.log(JSON.stringify(JSON.parse(process.argv[2]).map(l => safeLink(l, 'page.html'))));",
+                    encoding='utf-8')
+    links = ['https://example.com/a?b=1', 'HTTP://Example.com/', 'javascript:alert(1)',
+             ' JavaScript:alert(1)', 'data:text/html,<b>x</b>', 'vbscript:x', '']
+    output = subprocess.run(['node', str(path), json.dumps(links)], capture_output=True,
+                            text=True, check=True).stdout
+    assert json.loads(output) == ['https://example.com/a?b=1', 'http://example.com/', 'page.html',
+                                  'page.html', 'page.html', 'page.html', 'page.html']
@@ -0,0 +1,32 @@
+"""
+Tests for the HTML minifier
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from news_agent.utils.minify import minify_html  # noqa: E402
+
+
+def test_greater_than_in_text_is_kept():
+    assert minify_html('<p>Growth of <5% and  x > 2</p>') == '<p>Growth of <5% and x > 2</p>'
+
+
+def test_less_than_in_text_is_not_a_tag():
+    assert minify_html('<p>a < b  and c</p>') == '<p>a < b and c</p>'
+
+
+def test_greater_than_in_attributes_is_kept():
+    assert minify_html('<a title="AI >  humans" href="x">y</a>') == '<a title="AI >  humans" href="x">y</a>'
+    assert minify_html("<img alt='a > b'  src=\"y\" >") == "<img alt='a > b' src=\"y\">"
+
+
+def test_raw_elements_with_greater_than_in_attributes():
+    assert minify_html('<script data-x="a>b">\n    var a = 1;\n</script>') == '<script data-x="a>b">var a = 1;</script>'
+
+
+def test_whitespace_around_block_tags_is_dropped():
+    assert minify_html('<div>\n    <p>x</p>\n</div>') == '<div><p>x</p></div>'
+    assert minify_html('<div>a <b>b</b> <i>c</i></div>') == '<div>a <b>b</b> <i>c</i></div>'